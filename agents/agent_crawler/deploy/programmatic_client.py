@@ -7,6 +7,10 @@ from datetime import datetime
 import httpx 
 import sys # ⬅️ ADDED: sys module for version check
 
+# Shared helpers (e.g. oidc_token) have a single source in agents/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from oidc_token import get_token_provider
+
 # --- Configuration (Dynamic) ---
 APP_URL = "https://crawler-agent-service-682143946483.us-central1.run.app"
 USER_ID = "user_123"
@@ -18,22 +22,10 @@ APP_NAME = "agent_crawler"
 
 async def get_auth_token() -> str:
     """
-    Executes 'gcloud auth print-identity-token' asynchronously to get the token.
+    Returns the 'gcloud auth print-identity-token' token, cached in memory and
+    refreshed shortly before it expires instead of forking gcloud per request.
     """
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            "gcloud", "auth", "print-identity-token",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
-        
-        if proc.returncode != 0:
-            raise RuntimeError(f"gcloud command failed: {stderr.decode().strip()}")
-            
-        return stdout.decode().strip()
-    except FileNotFoundError:
-        raise RuntimeError("gcloud command not found. Please ensure Google Cloud CLI is installed.")
+    return await get_token_provider(APP_URL, use_metadata_server=False).get_token()
 
 # --- API Interaction Functions (ASYNC) ---
 
@@ -6,11 +6,16 @@ from datetime import datetime
 import httpx 
 import sys
 
+# Shared helpers (e.g. sse_stream) have a single source in agents/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from sse_stream import stream_agent_run
+
 # --- Configuration (Local Codespace Loopback) ---
 APP_URL = "http://127.0.0.1:8000"  # Target the local running ADK engine directly
 USER_ID = "user"
 SESSION_ID = f"session_{datetime.now().strftime('%Y%m%d%H%M%S')}" 
 APP_NAME = "short_selling_agent"  # Matches your active agent profile
+FINAL_AGENT_NAME = "LeadQuantTrader"  # Last sub-agent of ShortSellingPipeline_V1
 
 # --- API Interaction Functions (ASYNC) ---
 
@@ -40,7 +45,7 @@ async def make_request(client: httpx.AsyncClient, method: str, endpoint: str, da
         raise
 
 async def run_agent_request(client: httpx.AsyncClient, session_id: str, message: str):
-    """Executes a single POST request to the /run_sse endpoint and processes the stream."""
+    """Streams the /run_sse endpoint, printing tool calls and partial text as they arrive."""
     
     print(f"\n[User] -> Querying LeadQuantTrader with prompt summary...")
     
@@ -49,40 +54,25 @@ async def run_agent_request(client: httpx.AsyncClient, session_id: str, message:
         "user_id": USER_ID,
         "session_id": session_id,
         "new_message": {"role": "user", "parts": [{"text": message}]},
-        "streaming": False 
+        "streaming": True 
     }
     
     try:
-        response = await make_request(client, "POST", "/run_sse", data=run_data)
-        raw_text = response.text.strip()
-        
-        # Multi-line SSE parsing logic
-        data_lines = [
-            line.strip() 
-            for line in raw_text.split('\n') 
-            if line.strip().startswith("data:")
-        ]
-        
-        if not data_lines:
-             raise json.JSONDecodeError("No 'data:' lines found in 200 response.", raw_text, 0)
-        
-        last_data_line = data_lines[-1]
-        json_payload = last_data_line[len("data:"):].strip()
-        agent_response = json.loads(json_payload)
+        # Stop reading as soon as the last agent of the pipeline has answered
+        final_text = await stream_agent_run(
+            client, f"{APP_URL}/run_sse", run_data,
+            headers={"Content-Type": "application/json"},
+            final_author=FINAL_AGENT_NAME
+        )
         
         # Extract the final text summary generated by the LeadQuantTrader
-        final_text = agent_response.get('content', {}).get('parts', [{}])[0].get('text', 'Agent response structure not recognized.')
-        
         print("\n📝 ================== LEAD QUANT TRADER RECOMMENDATION ==================")
-        print(final_text)
+        print(final_text or 'Agent response structure not recognized.')
         print("=========================================================================\n")
     
-    except json.JSONDecodeError as e:
-        print(f"\n🚨 **JSON PARSING FAILED**!")
-        print(f"   Error: {e}")
-        print("   --- RAW SERVER CONTENT ---")
-        print(raw_text)
-        print("   --------------------------")
+    except httpx.HTTPStatusError as errh:
+        print(f"\n❌ **HTTP ERROR:** Status {errh.response.status_code} for {errh.request.url}")
+        print(f"❌ **Server Response (Raw):**\n{errh.response.text}")
     except Exception as e:
         print(f"❌ Agent request failed: {e}")
 
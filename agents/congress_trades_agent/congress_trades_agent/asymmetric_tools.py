@@ -1,11 +1,12 @@
 # Add to src/tools.py imports
 import urllib.parse
-import yfinance as yf
 import json
 import pandas as pd
 import requests
 from datetime import date
 
+from congress_trades_agent.fundamentals_cache import get_fundamentals_cache
+
 # ==============================================================================
 # NEW TOOL: GOVERNMENT CONTRACT CHECKER
 # ==============================================================================
@@ -29,9 +30,8 @@ def check_gov_contracts_tool(ticker: str):
     print(f"💰 Checking Government Contracts for: {ticker}")
     try:
         # 1. Get Company Name from Ticker (USASpending needs names, not tickers)
-        # We use yfinance to get the official name (e.g. "Lockheed Martin Corp")
-        stock = yf.Ticker(ticker)
-        raw_name = stock.info.get('longName', '')
+        # We use the shared yfinance snapshot to get the official name (e.g. "Lockheed Martin Corp")
+        raw_name = get_fundamentals_cache().get(ticker).get('longName') or ''
         
         # 2. Clean Name for Search (Remove "Inc", "Corp", "PLC" to improve API hits)
         search_name = raw_name.replace(',', '').replace('.', '')
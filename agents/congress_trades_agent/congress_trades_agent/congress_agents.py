@@ -5,7 +5,7 @@ from google.adk.tools import FunctionTool
 # Import from our modules
 # Import from our modules
 from .tools import fetch_congress_signals_tool, check_fundamentals_tool
-from .extra_tools import fetch_form4_signals_tool, fetch_lobbying_signals_tool
+from .extra_tools import enrich_congress_signals_tool
 from .prompts import RESEARCHER_INSTRUCTION, TRADER_INSTRUCTION, INSIDER_ANALYST_INSTRUCTION
 
 # ==========================================
@@ -29,8 +29,7 @@ insider_analyst = LlmAgent(
     model='gemini-2.5-flash',
     instruction=INSIDER_ANALYST_INSTRUCTION,
     tools=[
-        FunctionTool(fetch_lobbying_signals_tool), # <-- Checks Lobbying on the tickers
-        FunctionTool(fetch_form4_signals_tool)     # <-- Checks Insiders on the tickers
+        FunctionTool(enrich_congress_signals_tool)  # <-- Lobbying + Insiders for ALL tickers in one call
     ],
     output_key="political_and_insider_context"
 )
@@ -1,27 +1,22 @@
-import json
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from google.cloud import bigquery
-from congress_trades_agent.schemas import LobbyingSignalResponse
-import json
-from google.cloud import bigquery
-from .schemas import Form4SignalResponse, FundamentalsResponse
+from .schemas import (
+    Form4SignalResponse,
+    LobbyingSignalResponse,
+    SignalEnrichmentResponse,
+    TickerEnrichment,
+)
+from .bq_client import get_bq_client
 
-# 2. Refactor tool signature and return type
-def fetch_form4_signals_tool(ticker: str, analysis_date: str) -> Form4SignalResponse:
-    """
-    Insider Alignment Validator: Retrieves recent Form 4 insider trading data for a specific ticker.
-    Checks `form4_master` table schema using boolean flags (is_officer, is_director) and officer_title.
-    """
-    print(f"🕵️ Fetching live Form 4 Insider trades for: {ticker} around {analysis_date}")
-    
-    client = bigquery.Client()
-    
-    query = """
-    SELECT 
+# Latest qualifying Form 4 filing per ticker. `ticker IN UNNEST(@tks)` keeps the
+# filter on the raw clustered column; callers pass upper-cased, trimmed symbols.
+FORM4_BULK_QUERY = """
+    SELECT
         ticker,
         COALESCE(
-            officer_title, 
+            officer_title,
             IF(is_director, 'Director', NULL),
             IF(is_officer, 'Officer', NULL),
             'Insider'
@@ -31,80 +26,226 @@ def fetch_form4_signals_tool(ticker: str, analysis_date: str) -> Form4SignalResp
         UPPER(TRIM(transaction_side)) AS transaction_type,
         CAST(shares AS INT64) AS shares,
         CAST(filing_date AS STRING) AS transaction_date
-    FROM 
+    FROM
         `datascience-projects.gcp_shareloader.form4_master`
-    WHERE 
-        UPPER(TRIM(ticker)) = UPPER(@ticker)
+    WHERE
+        ticker IN UNNEST(@tks)
         AND filing_date <= PARSE_DATE('%Y-%m-%d', @analysis_date)
         AND filing_date >= DATE_SUB(PARSE_DATE('%Y-%m-%d', @analysis_date), INTERVAL 90 DAY)
         AND UPPER(TRIM(transaction_side)) IN ('BUY', 'SELL', 'P', 'S')
-    ORDER BY 
-        filing_date DESC, shares DESC
-    LIMIT 1;
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY filing_date DESC, shares DESC) = 1
+"""
+
+# Trailing-12m lobbying per ticker, reported for its biggest-spending client.
+LOBBYING_BULK_QUERY = """
+    SELECT
+        ticker,
+        client_name,
+        SUM(amount) as total_spend,
+        MAX(filing_date) as latest_filing,
+        STRING_AGG(DISTINCT general_issues, ' | ') as raw_issues,
+        COUNT(*) as number_of_filings
+    FROM `datascience-projects.gcp_shareloader.lobbying_signals`
+    WHERE ticker IN UNNEST(@tks)
+      AND filing_date <= IFNULL(PARSE_DATE('%Y-%m-%d', @analysis_date), CURRENT_DATE())
+      AND filing_date >= DATE_SUB(IFNULL(PARSE_DATE('%Y-%m-%d', @analysis_date), CURRENT_DATE()), INTERVAL 365 DAY)
+    GROUP BY ticker, client_name
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY SUM(amount) DESC) = 1
+"""
+
+EXEC_KEYWORDS = ["CEO", "CFO", "CHIEF", "EXECUTIVE", "PRESIDENT", "VP", "OFFICER", "DIRECTOR"]
+
+
+def _clean_tickers(tickers: List[str]) -> List[str]:
+    return list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+
+
+def _rows_by_ticker(rows) -> Dict[str, dict]:
+    by_ticker = {}
+    for record in rows:
+        row = dict(record.items())
+        by_ticker.setdefault(str(row.get("ticker", "")).strip().upper(), row)
+    return by_ticker
+
+
+def _form4_response(ticker: str, row: Optional[dict]) -> Form4SignalResponse:
+    if row is None:
+        return Form4SignalResponse(
+            ticker=ticker,
+            error="No recent insider transactions found.",
+            signal_strength="Neutral"
+        )
+
+    # Normalize transaction side ('P' or 'BUY' -> Buy, 'S' or 'SELL' -> Sell)
+    side_raw = str(row.get("transaction_type", "")).upper()
+    if side_raw in ["BUY", "P"]:
+        tx_type = "Buy"
+    elif side_raw in ["SELL", "S"]:
+        tx_type = "Sell"
+    else:
+        tx_type = side_raw.capitalize()
+
+    title = str(row.get("insider_title", "")).upper()
+    is_officer = bool(row.get("is_officer", False))
+    is_director = bool(row.get("is_director", False))
+
+    # Robust executive role evaluation
+    is_key_executive = is_officer or is_director or any(kw in title for kw in EXEC_KEYWORDS)
+
+    if tx_type == "Buy" and is_key_executive:
+        signal = "Strong Buy Confluence"
+    elif tx_type == "Sell" and is_key_executive:
+        signal = "Warning - Insider Dumping"
+    else:
+        signal = "Neutral"
+
+    return Form4SignalResponse(
+        ticker=ticker,
+        insider_title=row.get("insider_title", "Insider"),
+        transaction_type=tx_type,
+        shares=row.get("shares", 0),
+        transaction_date=str(row.get("transaction_date", "N/A")),
+        is_officer=is_officer,
+        is_director=is_director,
+        signal_strength=signal
+    )
+
+
+def _lobbying_response(ticker: str, row: Optional[dict]) -> LobbyingSignalResponse:
+    if row is None:
+        return LobbyingSignalResponse(
+            ticker=ticker,
+            lobbying_status="No recent lobbying activity found."
+        )
+
+    # Parse aggregated issues into a clean Python list
+    raw_issues = row.get("raw_issues") or ""
+    issues_list = [issue.strip() for issue in raw_issues.split(" | ") if issue.strip()]
+
+    return LobbyingSignalResponse(
+        ticker=ticker,
+        company_name=row.get("client_name", "N/A"),
+        total_spend_last_12m=float(row.get("total_spend") or 0.0),
+        latest_filing_date=str(row.get("latest_filing", "N/A")),
+        number_of_filings=int(row.get("number_of_filings") or 0),
+        top_lobbied_issues=issues_list,
+        lobbying_status="Active Lobbying Detected"
+    )
+
+
+def fetch_form4_signals_bulk(tickers: List[str], analysis_date: str) -> Dict[str, Form4SignalResponse]:
+    """
+    Form 4 insider signal for every ticker with ONE BigQuery job.
+    Returns {ticker: Form4SignalResponse} for every requested ticker.
     """
-    
+    tickers = _clean_tickers(tickers)
+    if not tickers:
+        return {}
+
     job_config = bigquery.QueryJobConfig(
         query_parameters=[
-            bigquery.ScalarQueryParameter("ticker", "STRING", ticker.strip().upper()),
+            bigquery.ArrayQueryParameter("tks", "STRING", tickers),
             bigquery.ScalarQueryParameter("analysis_date", "STRING", analysis_date),
         ]
     )
-    
+
     try:
-        query_job = client.query(query, job_config=job_config)
-        results = list(query_job.result())
-        
-        if not results:
-            return Form4SignalResponse(
-                ticker=ticker.upper(),
-                error="No recent insider transactions found.",
+        client = get_bq_client()
+        rows = _rows_by_ticker(client.query(FORM4_BULK_QUERY, job_config=job_config).result())
+    except Exception as e:
+        print(f"❌ Error querying form4_master: {e}")
+        return {
+            t: Form4SignalResponse(
+                ticker=t,
+                error=f"Failed to execute query: {str(e)}",
                 signal_strength="Neutral"
             )
-            
-        row = dict(results[0].items())
-        
-        # Normalize transaction side ('P' or 'BUY' -> Buy, 'S' or 'SELL' -> Sell)
-        side_raw = str(row.get("transaction_type", "")).upper()
-        if side_raw in ["BUY", "P"]:
-            tx_type = "Buy"
-        elif side_raw in ["SELL", "S"]:
-            tx_type = "Sell"
-        else:
-            tx_type = side_raw.capitalize()
-
-        title = str(row.get("insider_title", "")).upper()
-        is_officer = bool(row.get("is_officer", False))
-        is_director = bool(row.get("is_director", False))
-        
-        # Robust executive role evaluation
-        EXEC_KEYWORDS = ["CEO", "CFO", "CHIEF", "EXECUTIVE", "PRESIDENT", "VP", "OFFICER", "DIRECTOR"]
-        is_key_executive = is_officer or is_director or any(kw in title for kw in EXEC_KEYWORDS)
-        
-        if tx_type == "Buy" and is_key_executive:
-            signal = "Strong Buy Confluence"
-        elif tx_type == "Sell" and is_key_executive:
-            signal = "Warning - Insider Dumping"
-        else:
-            signal = "Neutral"
-            
-        return Form4SignalResponse(
-            ticker=ticker.upper(),
-            insider_title=row.get("insider_title", "Insider"),
-            transaction_type=tx_type,
-            shares=row.get("shares", 0),
-            transaction_date=str(row.get("transaction_date", "N/A")),
-            is_officer=is_officer,
-            is_director=is_director,
-            signal_strength=signal
-        )
+            for t in tickers
+        }
+
+    return {t: _form4_response(t, rows.get(t)) for t in tickers}
+
+
+def fetch_lobbying_signals_bulk(
+    tickers: List[str], analysis_date: Optional[str] = None
+) -> Dict[str, LobbyingSignalResponse]:
+    """
+    Lobbying activity for every ticker with ONE BigQuery job.
+    Returns {ticker: LobbyingSignalResponse} for every requested ticker.
+    """
+    tickers = _clean_tickers(tickers)
+    if not tickers:
+        return {}
 
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ArrayQueryParameter("tks", "STRING", tickers),
+            bigquery.ScalarQueryParameter("analysis_date", "STRING", analysis_date),
+        ]
+    )
+
+    try:
+        project_id = os.environ.get("GOOGLE_CLOUD_PROJECT", "datascience-projects")
+        client = get_bq_client(project_id)
+        rows = _rows_by_ticker(client.query(LOBBYING_BULK_QUERY, job_config=job_config).result())
     except Exception as e:
-        print(f"❌ Error querying form4_master: {e}")
-        return Form4SignalResponse(
-            ticker=ticker.upper(),
-            error=f"Failed to execute query: {str(e)}",
-            signal_strength="Neutral"
-        )
+        print(f"❌ Error fetching lobbying signals: {e}")
+        return {
+            t: LobbyingSignalResponse(
+                ticker=t,
+                lobbying_status="Error",
+                error=f"Database error: {str(e)}"
+            )
+            for t in tickers
+        }
+
+    return {t: _lobbying_response(t, rows.get(t)) for t in tickers}
+
+
+def enrich_congress_signals_tool(tickers: List[str], analysis_date: str) -> SignalEnrichmentResponse:
+    """
+    Confluence Enricher: Lobbying and Form 4 insider signals for ALL Congress candidates at once.
+
+    Call this ONCE with every ticker returned by `fetch_congress_signals_tool`
+    instead of calling the per-ticker tools in a loop.
+
+    Args:
+        tickers (List[str]): Stock symbols to enrich (e.g., ['NVDA', 'LMT']).
+        analysis_date (str): Reference date in 'YYYY-MM-DD' format.
+
+    Returns:
+        SignalEnrichmentResponse: `enrichments` maps each ticker to its
+        Form4SignalResponse (`form4`) and LobbyingSignalResponse (`lobbying`).
+    """
+    clean = _clean_tickers(tickers)
+    print(f"🧩 Enriching {len(clean)} Congress candidates (Form 4 + lobbying) for {analysis_date}")
+
+    # The two sources are independent: run both jobs side by side.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        form4_job = pool.submit(fetch_form4_signals_bulk, clean, analysis_date)
+        lobbying_job = pool.submit(fetch_lobbying_signals_bulk, clean, analysis_date)
+        form4, lobbying = form4_job.result(), lobbying_job.result()
+
+    enrichments = {
+        t: TickerEnrichment(ticker=t, form4=form4[t], lobbying=lobbying[t])
+        for t in clean
+    }
+    return SignalEnrichmentResponse(
+        analysis_date=analysis_date,
+        enrichments=enrichments,
+        count=len(enrichments),
+    )
+
+
+# 2. Refactor tool signature and return type
+def fetch_form4_signals_tool(ticker: str, analysis_date: str) -> Form4SignalResponse:
+    """
+    Insider Alignment Validator: Retrieves recent Form 4 insider trading data for a specific ticker.
+    Checks `form4_master` table schema using boolean flags (is_officer, is_director) and officer_title.
+    """
+    print(f"🕵️ Fetching live Form 4 Insider trades for: {ticker} around {analysis_date}")
+    clean_ticker = ticker.strip().upper()
+    return fetch_form4_signals_bulk([clean_ticker], analysis_date)[clean_ticker]
 
 
 # congress_trades_agent/extra_tools.py
@@ -120,64 +261,4 @@ def fetch_lobbying_signals_tool(ticker: str, analysis_date: Optional[str] = None
     """
     clean_ticker = ticker.strip().upper()
     print(f"🏛️ Fetching corporate lobbying data for: {clean_ticker}")
-    
-    try:
-        project_id = os.environ.get("GOOGLE_CLOUD_PROJECT", "datascience-projects")
-        client = bigquery.Client(project=project_id)
-        
-        # SQL with parameterized analysis date logic
-        query = """
-            SELECT 
-                ticker,
-                client_name,
-                SUM(amount) as total_spend,
-                MAX(filing_date) as latest_filing,
-                STRING_AGG(DISTINCT general_issues, ' | ') as raw_issues,
-                COUNT(*) as number_of_filings
-            FROM `datascience-projects.gcp_shareloader.lobbying_signals`
-            WHERE UPPER(TRIM(ticker)) = UPPER(@ticker)
-              AND filing_date <= IFNULL(PARSE_DATE('%Y-%m-%d', @analysis_date), CURRENT_DATE())
-              AND filing_date >= DATE_SUB(IFNULL(PARSE_DATE('%Y-%m-%d', @analysis_date), CURRENT_DATE()), INTERVAL 365 DAY)
-            GROUP BY ticker, client_name
-            LIMIT 1;
-        """
-        
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("ticker", "STRING", clean_ticker),
-                bigquery.ScalarQueryParameter("analysis_date", "STRING", analysis_date),
-            ]
-        )
-        
-        query_job = client.query(query, job_config=job_config)
-        records = list(query_job.result())
-        
-        if not records:
-            return LobbyingSignalResponse(
-                ticker=clean_ticker,
-                lobbying_status="No recent lobbying activity found."
-            )
-            
-        row = dict(records[0].items())
-        
-        # Parse aggregated issues into a clean Python list
-        raw_issues = row.get("raw_issues") or ""
-        issues_list = [issue.strip() for issue in raw_issues.split(" | ") if issue.strip()]
-        
-        return LobbyingSignalResponse(
-            ticker=clean_ticker,
-            company_name=row.get("client_name", "N/A"),
-            total_spend_last_12m=float(row.get("total_spend") or 0.0),
-            latest_filing_date=str(row.get("latest_filing", "N/A")),
-            number_of_filings=int(row.get("number_of_filings") or 0),
-            top_lobbied_issues=issues_list,
-            lobbying_status="Active Lobbying Detected"
-        )
-
-    except Exception as e:
-        print(f"❌ Error fetching lobbying signals: {e}")
-        return LobbyingSignalResponse(
-            ticker=clean_ticker,
-            lobbying_status="Error",
-            error=f"Database error: {str(e)}"
-        )
\ No newline at end of file
+    return fetch_lobbying_signals_bulk([clean_ticker], analysis_date)[clean_ticker]
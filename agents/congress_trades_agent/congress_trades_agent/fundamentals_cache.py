@@ -0,0 +1,164 @@
+# congress_trades_agent/fundamentals_cache.py — daily yfinance profile snapshot shared by the tools
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import yfinance as yf
+
+# -----------------------------
+# CONFIGURATION
+# -----------------------------
+# Set FUNDAMENTALS_CACHE_PATH to override where the snapshots live.
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "congress_trades_agent", "fundamentals.sqlite"
+)
+# Concurrent `.info` lookups; yfinance is I/O bound, keep it polite towards Yahoo.
+DEFAULT_MAX_WORKERS = 8
+# The only `.info` keys any tool reads.
+PROFILE_FIELDS = (
+    "longName",
+    "sector",
+    "industry",
+    "marketCap",
+    "beta",
+    "forwardPE",
+    "debtToEquity",
+    "dividendYield",
+)
+
+
+def fetch_profile(ticker: str) -> Dict[str, Any]:
+    """One `yf.Ticker(t).info` call, trimmed to PROFILE_FIELDS. Raises on failure."""
+    info = yf.Ticker(ticker).info or {}
+    return {field: info.get(field) for field in PROFILE_FIELDS if info.get(field) is not None}
+
+
+class FundamentalsCache:
+    """
+    Per-ticker profile snapshots in a local SQLite file, valid for the day
+    they were fetched.
+
+    Misses are resolved on a shared thread pool, and a ticker that is already
+    being fetched is awaited rather than requested again. So each ticker hits
+    yfinance at most once per day, however many tools ask for it. Failed
+    lookups are not stored and are retried on the next request.
+    """
+
+    def __init__(self, path: str, fetch: Callable[[str], Dict[str, Any]] = fetch_profile,
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        self.path = path
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fundamentals")
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fundamentals (
+                    ticker      TEXT PRIMARY KEY,
+                    fetched_on  TEXT NOT NULL,
+                    profile     TEXT NOT NULL
+                )
+                """
+            )
+
+    def _cached(self, tickers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+        placeholders = ",".join("?" for _ in tickers)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT ticker, profile FROM fundamentals WHERE fetched_on = ? AND ticker IN ({placeholders})",
+                [date.today().isoformat(), *tickers],
+            ).fetchall()
+        return {ticker: json.loads(profile) for ticker, profile in rows}
+
+    def _resolve(self, ticker: str) -> Dict[str, Any]:
+        try:
+            profile = self._fetch(ticker)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO fundamentals (ticker, fetched_on, profile) VALUES (?, ?, ?)",
+                    (ticker, date.today().isoformat(), json.dumps(profile)),
+                )
+            return profile
+        finally:
+            with self._lock:
+                self._inflight.pop(ticker, None)
+
+    def _submit(self, tickers: Iterable[str]) -> Dict[str, Future]:
+        futures = {}
+        with self._lock:
+            for ticker in tickers:
+                future = self._inflight.get(ticker)
+                if future is None:
+                    future = self._executor.submit(self._resolve, ticker)
+                    self._inflight[ticker] = future
+                futures[ticker] = future
+        return futures
+
+    def prefetch(self, tickers: Iterable[str]) -> None:
+        """Starts fetching every uncached ticker in the background and returns immediately."""
+        tickers = _normalize(tickers)
+        cached = self._cached(tickers)
+        self._submit(t for t in tickers if t not in cached)
+
+    def get_many(self, tickers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Profiles for all tickers, fetching the misses concurrently. Tickers
+        whose lookup failed are left out of the result.
+        """
+        tickers = _normalize(tickers)
+        profiles = self._cached(tickers)
+        futures = self._submit(t for t in tickers if t not in profiles)
+        wait(futures.values())
+        for ticker, future in futures.items():
+            if future.exception() is not None:
+                logging.warning(f"⚠️ Fundamentals lookup failed for {ticker}: {future.exception()}")
+                continue
+            profiles[ticker] = future.result()
+        return profiles
+
+    def get(self, ticker: str) -> Dict[str, Any]:
+        """Profile for one ticker. Raises whatever the lookup raised."""
+        clean_ticker = ticker.strip().upper()
+        cached = self._cached([clean_ticker])
+        if clean_ticker in cached:
+            return cached[clean_ticker]
+        return self._submit([clean_ticker])[clean_ticker].result()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+
+def _normalize(tickers: Iterable[str]) -> list:
+    return list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+
+
+_CACHES: Dict[str, FundamentalsCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_fundamentals_cache() -> FundamentalsCache:
+    """Process-wide cache for the path in FUNDAMENTALS_CACHE_PATH."""
+    path = os.environ.get("FUNDAMENTALS_CACHE_PATH", DEFAULT_CACHE_PATH)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(path)
+        if cache is None:
+            max_workers = int(os.environ.get("FUNDAMENTALS_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+            cache = FundamentalsCache(path, max_workers=max_workers)
+            _CACHES[path] = cache
+        return cache
@@ -0,0 +1,48 @@
+# congress_trades_agent/market_regime.py — vectorized SPX > SMA200 regime lookup
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def uptrend_series(spy_data: pd.DataFrame) -> pd.Series:
+    """
+    Boolean regime per trading day: True when adjClose > SMA200.
+
+    Days without a full 200-day SMA count as uptrend, the same benefit of
+    the doubt the per-row check always gave. Expects the frame produced by
+    _get_spy_data (DatetimeIndex, `adjClose` and `SMA200` columns).
+    """
+    if spy_data is None or spy_data.empty:
+        return pd.Series(dtype=bool)
+
+    spy_data = spy_data.sort_index()
+    flags = (spy_data['adjClose'] > spy_data['SMA200']) | spy_data['SMA200'].isna()
+    return flags.astype(bool)
+
+
+def tag_market_regime(signal_dates: Iterable, regime: pd.Series) -> np.ndarray:
+    """
+    Regime flag for every signal date in one `searchsorted` pass.
+
+    Each date takes the regime of the last trading day on or before it
+    (a weekend signal reads Friday's close). Dates before the series starts,
+    unparseable dates and an empty series all default to True.
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(list(signal_dates), errors='coerce'))
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+
+    flags = np.ones(len(dates), dtype=bool)
+    if regime.empty or len(dates) == 0:
+        return flags
+
+    index = pd.DatetimeIndex(regime.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+
+    positions = index.searchsorted(dates, side='right') - 1
+    valid = (positions >= 0) & ~dates.isna()
+    flags[valid] = regime.to_numpy(dtype=bool)[positions[valid]]
+    return flags
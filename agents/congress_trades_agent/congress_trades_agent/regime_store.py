@@ -0,0 +1,183 @@
+# congress_trades_agent/regime_store.py — persistent SPX close / SMA200 series
+
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+import pandas as pd
+import requests
+
+from congress_trades_agent.rate_limiter import get_fmp_limiter, parse_retry_after
+
+# -----------------------------
+# CONFIGURATION
+# -----------------------------
+# Set REGIME_STORE_PATH to override where the series lives.
+DEFAULT_STORE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "congress_trades_agent", "spx_regime.sqlite"
+)
+HISTORY_START = "2022-01-01"
+SMA_WINDOW = 200
+SPX_URL = (
+    "https://financialmodelingprep.com/api/v3/historical-price-full/^SPX"
+    "?from={start}&to={end}&apikey={api_key}"
+)
+
+
+def fetch_spx_closes(start: str, end: str) -> Optional[pd.Series]:
+    """
+    Adjusted SPX closes between two dates (inclusive) from FMP, oldest first,
+    through the shared FMP rate limiter. Empty when FMP has no bars in the
+    window; None when the request failed or FMP answered with an error body,
+    so the window is retried later.
+    """
+    fmp_api_key = os.environ.get('FMP_API_KEY')
+    if not fmp_api_key:
+        return None
+
+    spx_url = SPX_URL.format(start=start, end=end, api_key=fmp_api_key)
+    limiter = get_fmp_limiter()
+    limiter.acquire()
+    response = requests.get(spx_url, timeout=10)
+
+    # Honour FMP's Retry-After once before giving up on the regime data
+    if response.status_code == 429:
+        headers = getattr(response, "headers", None) or {}
+        limiter.penalize(parse_retry_after(headers.get("Retry-After")))
+        limiter.acquire()
+        response = requests.get(spx_url, timeout=10)
+
+    if response.status_code != 200:
+        return None
+
+    body = response.json()
+    # FMP reports plan limits and bad keys as 200 + {"Error Message": ...}
+    if not isinstance(body, dict) or 'historical' not in body:
+        return None
+
+    history = body['historical']
+    if not history:
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+
+    frame = pd.DataFrame(history)
+    closes = pd.Series(frame['adjClose'].astype(float).values, index=pd.to_datetime(frame['date']))
+    closes.index = closes.index.tz_localize(None)
+    return closes.sort_index()
+
+
+class SpxRegimeStore:
+    """
+    SPX adjusted closes and their SMA200 in a local SQLite file.
+
+    The first request downloads the history from HISTORY_START. After that,
+    only the days after fetched_through (the last closed day fetched) are
+    requested, and only when an as-of date past it is asked for. Any as-of
+    date is answered by slicing the single stored series. Bars after
+    fetched_through, such as today's intraday bar, are provisional: the next
+    request re-fetches them and overwrites the stored values.
+    """
+
+    def __init__(self, path: str, fetch=fetch_spx_closes):
+        self.path = path
+        self._fetch = fetch
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS spx_daily (
+                    date       TEXT PRIMARY KEY,
+                    adj_close  REAL NOT NULL,
+                    sma200     REAL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _load(self) -> pd.DataFrame:
+        frame = pd.read_sql_query(
+            "SELECT date, adj_close AS adjClose, sma200 AS SMA200 FROM spx_daily ORDER BY date",
+            self._conn,
+        )
+        frame['date'] = pd.to_datetime(frame['date'])
+        return frame.set_index('date')
+
+    def _extend(self, end_date: str) -> None:
+        """
+        Fetches the days after fetched_through up to end_date. Stored bars in
+        that window are provisional (e.g. today's intraday bar) and are replaced.
+        """
+        settled = self._meta("fetched_through")
+        start = HISTORY_START if settled is None else (
+            (datetime.strptime(settled, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        )
+        if start <= end_date:
+            fresh = self._fetch(start, end_date)
+            if fresh is None:
+                return
+            if not fresh.empty:
+                fresh = fresh[fresh.index >= pd.Timestamp(start)]
+            self._conn.execute("DELETE FROM spx_daily WHERE date >= ?", (start,))
+            if not fresh.empty:
+                stored = self._load()['adjClose']
+                closes = fresh if stored.empty else pd.concat([stored, fresh])
+                sma = closes.rolling(window=SMA_WINDOW).mean()
+                new_rows = [
+                    (ts.strftime("%Y-%m-%d"), float(closes.iloc[i]),
+                     None if pd.isna(sma.iloc[i]) else float(sma.iloc[i]))
+                    for i, ts in enumerate(closes.index) if i >= len(stored)
+                ]
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO spx_daily (date, adj_close, sma200) VALUES (?, ?, ?)",
+                    new_rows,
+                )
+
+        # Only closed days count as fetched; today's bar may still be missing or change
+        yesterday = (date.today() - timedelta(days=1)).strftime("%Y-%m-%d")
+        fetched_through = min(end_date, yesterday)
+        if fetched_through > (self._meta("fetched_through") or ""):
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('fetched_through', ?)",
+                (fetched_through,),
+            )
+
+    def frame(self, end_date_str: str) -> pd.DataFrame:
+        """
+        SPX `adjClose` and `SMA200` up to and including end_date_str, indexed
+        by date, oldest first. Same shape the per-date download used to return.
+        """
+        with self._lock, self._conn:
+            if end_date_str > (self._meta("fetched_through") or ""):
+                self._extend(end_date_str)
+            full = self._load()
+        return full[full.index <= pd.Timestamp(end_date_str)]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_STORES: Dict[str, SpxRegimeStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_regime_store() -> SpxRegimeStore:
+    """Process-wide store for the path in REGIME_STORE_PATH."""
+    path = os.environ.get("REGIME_STORE_PATH", DEFAULT_STORE_PATH)
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = SpxRegimeStore(path)
+            _STORES[path] = store
+        return store
@@ -64,6 +64,17 @@ class LobbyingSignalResponse(BaseModel):
     lobbying_status: str = "Active"
     error: Optional[str] = None
 
+class TickerEnrichment(BaseModel):
+    ticker: str
+    form4: Form4SignalResponse
+    lobbying: LobbyingSignalResponse
+
+class SignalEnrichmentResponse(BaseModel):
+    analysis_date: str
+    enrichments: Dict[str, TickerEnrichment] = Field(default_factory=dict)
+    count: int = 0
+    error: Optional[str] = None
+
 # congress_trades_agent/schemas.py
 class CongressSignalItem(BaseModel):
     ticker: str
@@ -0,0 +1,35 @@
+-- skills/CongressResearcher/references/fetch_materialized_net_buy_signals.sql
+-- Reads one partition of the table kept by scripts/materialize_net_buy_signals.py.
+-- `materialized` is FALSE when the date is not covered yet; a covered date with
+-- no signals comes back as a single row with NULL signal columns.
+
+WITH coverage AS (
+    SELECT COUNT(*) > 0 AS materialized
+    FROM `datascience-projects.gcp_shareloader.congress_net_buy_coverage`
+    WHERE signal_date = PARSE_DATE('%Y-%m-%d', @analysis_date)
+),
+signals AS (
+    SELECT
+        signal_date,
+        ticker,
+        purchase_count,
+        sale_count,
+        net_buy_activity,
+        buying_days_count,
+        last_trade_date
+    FROM `datascience-projects.gcp_shareloader.congress_net_buy_daily`
+    WHERE
+        signal_date = PARSE_DATE('%Y-%m-%d', @analysis_date)
+        AND buying_days_count >= 2
+        AND net_buy_activity >= 5
+        AND (
+            sale_count = 0
+            OR (purchase_count * 1.0 / GREATEST(sale_count, 1)) >= 2.0
+        )
+    ORDER BY buying_days_count DESC, net_buy_activity DESC
+    LIMIT 10
+)
+SELECT coverage.materialized, signals.*
+FROM coverage
+LEFT JOIN signals ON TRUE
+ORDER BY signals.buying_days_count DESC, signals.net_buy_activity DESC;
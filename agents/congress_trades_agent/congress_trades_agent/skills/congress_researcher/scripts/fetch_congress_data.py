@@ -3,16 +3,16 @@
 from pathlib import Path
 import pandas as pd
 from google.cloud import bigquery
-from .market_regime import check_market_regime
+from .market_regime import market_regime_flags
 
 # Locate the SQL file relative to this script
 SKILL_DIR = Path(__file__).parent.parent
 SQL_PATH = SKILL_DIR / "references" / "fetch_net_buy_signals.sql"
+MATERIALIZED_SQL_PATH = SKILL_DIR / "references" / "fetch_materialized_net_buy_signals.sql"
 
 def get_bq_data(analysis_date: str) -> list:
     """Internal: Runs the Net Buy Activity SQL Algorithm with Parameterized Query."""
     bq_client = bigquery.Client()
-    qry = SQL_PATH.read_text(encoding="utf-8")
     
     job_config = bigquery.QueryJobConfig(
         query_parameters=[
@@ -20,7 +20,11 @@ def get_bq_data(analysis_date: str) -> list:
         ]
     )
     
-    df = bq_client.query(qry, job_config=job_config).to_dataframe()
+    # Materialized daily partition first; uncovered dates aggregate the raw disclosures
+    df = _read_materialized(bq_client, job_config)
+    if df is None:
+        qry = SQL_PATH.read_text(encoding="utf-8")
+        df = bq_client.query(qry, job_config=job_config).to_dataframe()
     
     if df.empty:
         return []
@@ -35,11 +39,22 @@ def get_bq_data(analysis_date: str) -> list:
         return []
 
     # Market regime enrichment
-    df_filtered['market_uptrend'] = df_filtered['signal_date'].apply(
-        lambda x: check_market_regime(x, analysis_date)
-    )
+    df_filtered['market_uptrend'] = market_regime_flags(df_filtered['signal_date'], analysis_date)
     
     df_filtered['signal_date'] = df_filtered['signal_date'].astype(str)
     df_filtered['last_trade_date'] = df_filtered['last_trade_date'].astype(str)
     
-    return df_filtered.to_dict(orient='records')
\ No newline at end of file
+    return df_filtered.to_dict(orient='records')
+
+
+def _read_materialized(bq_client, job_config):
+    """Signals from congress_net_buy_daily, None when the date is not materialized yet."""
+    try:
+        qry = MATERIALIZED_SQL_PATH.read_text(encoding="utf-8")
+        df = bq_client.query(qry, job_config=job_config).to_dataframe()
+        if df.empty or not bool(df['materialized'].iloc[0]):
+            return None
+        return df[df['ticker'].notna()].drop(columns='materialized')
+    except Exception as e:
+        print(f"⚠️ Materialized net-buy read failed: {e}")
+        return None
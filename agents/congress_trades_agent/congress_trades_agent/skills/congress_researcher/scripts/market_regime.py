@@ -1,65 +1,34 @@
 import os
-import requests
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from typing import Optional
-from functools import lru_cache
 from google.cloud import bigquery
 
+from ....market_regime import uptrend_series, tag_market_regime
+from ....regime_store import get_regime_store
 
-def check_market_regime(row_date, context_date_str) -> bool:
-    try:
-        spy_data = _get_spy_data(context_date_str)
-        if spy_data.empty:
-            return True
-
-        target_date = pd.to_datetime(row_date).tz_localize(None)
-        idx_loc = spy_data.index.get_indexer([target_date], method='pad')[0]
-
-        if idx_loc == -1: 
-            return True
-
-        price = spy_data.iloc[idx_loc]['adjClose']
-        sma = spy_data.iloc[idx_loc]['SMA200']
-
-        if pd.isna(sma):
-            return True
-
-        return bool(price > sma)
 
+def market_regime_flags(signal_dates, context_date_str) -> np.ndarray:
+    """
+    SPX-above-SMA200 flag for many signal dates at once: the SPX history is
+    fetched once per context date and every date is resolved in one
+    searchsorted lookup (see congress_trades_agent.market_regime).
+    """
+    try:
+        return tag_market_regime(signal_dates, uptrend_series(_get_spy_data(context_date_str)))
     except Exception as e:
         print(f"⚠️ Regime Check Warning: {e}")
-        return True
+        return np.ones(len(signal_dates), dtype=bool)
 
-@lru_cache(maxsize=32)
-def _get_spy_data(end_date_str: str) -> pd.DataFrame:
-    try:
-        fmp_api_key = os.environ.get('FMP_API_KEY')
-        if not fmp_api_key:
-            return pd.DataFrame()
 
-        spx_url = f"https://financialmodelingprep.com/api/v3/historical-price-full/^SPX?from=2022-01-01&to={end_date_str}&apikey={fmp_api_key}"
-        response = requests.get(spx_url, timeout=10)
-        
-        if response.status_code != 200:
-            return pd.DataFrame()
-            
-        spx_res = response.json().get('historical', [])
-        if not spx_res:
-            return pd.DataFrame()
+def check_market_regime(row_date, context_date_str) -> bool:
+    return bool(market_regime_flags([row_date], context_date_str)[0])
 
-        spx_res = spx_res[::-1]
-        spy_data = pd.DataFrame(data=spx_res)
-        
-        spy_data['date'] = pd.to_datetime(spy_data['date'])
-        spy_data.set_index('date', inplace=True)
-        spy_data.index = spy_data.index.tz_localize(None)
-        spy_data['SMA200'] = spy_data['adjClose'].rolling(window=200).mean()
-        
-        return spy_data
-        
+def _get_spy_data(end_date_str: str) -> pd.DataFrame:
+    """SPX adjClose/SMA200 up to end_date_str, served from the persistent regime store."""
+    try:
+        return get_regime_store().frame(end_date_str)
     except Exception as e:
         print(f"❌ SPY Data Fetch Error: {e}")
         return pd.DataFrame()
-
-    
\ No newline at end of file
@@ -1,22 +1,65 @@
 import os
-import requests
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from typing import Optional
-from functools import lru_cache
 from google.cloud import bigquery
 
 from congress_trades_agent.schemas import (
     CongressSignalItem,
     CongressSignalsResponse,
     FundamentalsResponse,
-    Form4SignalResponse,
-    LobbyingSignalResponse,
 )
+from congress_trades_agent.bq_client import get_bq_client
+# Form 4 / lobbying lookups live in extra_tools; re-exported for existing imports.
+from congress_trades_agent.extra_tools import fetch_form4_signals_tool, fetch_lobbying_signals_tool
+from congress_trades_agent.fundamentals_cache import get_fundamentals_cache
+from congress_trades_agent.market_regime import uptrend_series, tag_market_regime
+from congress_trades_agent.regime_store import get_regime_store
 
 # Set persistent writable directory across local containers, AWS, and Cloud environments
 yf.set_tz_cache_location("/tmp/py-yfinance")
 
+# Daily partitions written by scripts/materialize_net_buy_signals.py; the
+# coverage table has one row per materialized date, including dates with no trades.
+NET_BUY_TABLE = "datascience-projects.gcp_shareloader.congress_net_buy_daily"
+NET_BUY_COVERAGE_TABLE = "datascience-projects.gcp_shareloader.congress_net_buy_coverage"
+
+# One job: `materialized` tells a covered date with no signals (a single row
+# with NULL signal columns) from a date the materializer has not reached.
+NET_BUY_SIGNALS_QUERY = f"""
+    WITH coverage AS (
+        SELECT COUNT(*) > 0 AS materialized
+        FROM `{NET_BUY_COVERAGE_TABLE}`
+        WHERE signal_date = PARSE_DATE('%Y-%m-%d', @analysis_date)
+    ),
+    signals AS (
+        SELECT
+            signal_date,
+            ticker,
+            purchase_count,
+            sale_count,
+            net_buy_activity,
+            buying_days_count,
+            last_trade_date
+        FROM `{NET_BUY_TABLE}`
+        WHERE
+            signal_date = PARSE_DATE('%Y-%m-%d', @analysis_date)
+            AND buying_days_count >= 2
+            AND net_buy_activity >= 5
+            AND (
+                sale_count = 0
+                OR (purchase_count * 1.0 / GREATEST(sale_count, 1)) >= 2.0
+            )
+        ORDER BY buying_days_count DESC, net_buy_activity DESC
+        LIMIT 10
+    )
+    SELECT coverage.materialized, signals.*
+    FROM coverage
+    LEFT JOIN signals ON TRUE
+    ORDER BY signals.buying_days_count DESC, signals.net_buy_activity DESC
+"""
+
 
 # ==============================================================================
 # EXPOSED AGENT TOOLS
@@ -47,6 +90,7 @@ def fetch_congress_signals_tool(analysis_date: str) -> CongressSignalsResponse:
         print(f"🔍 Fetched {len(raw_signals)} high-conviction signals for {analysis_date}")
         
         signal_items = [CongressSignalItem(**item) for item in raw_signals]
+        _prefetch_fundamentals([item.ticker for item in signal_items])
         return CongressSignalsResponse(
             analysis_date=analysis_date,
             signals=signal_items,
@@ -87,8 +131,7 @@ def check_fundamentals_tool(ticker: str) -> FundamentalsResponse:
     print(f"🔍 Checking fundamentals for: {clean_ticker}")
     
     try:
-        stock = yf.Ticker(clean_ticker)
-        info = stock.info or {}
+        info = get_fundamentals_cache().get(clean_ticker)
         
         return FundamentalsResponse(
             ticker=clean_ticker,
@@ -110,194 +153,28 @@ def check_fundamentals_tool(ticker: str) -> FundamentalsResponse:
         )
 
 
-def fetch_form4_signals_tool(ticker: str, analysis_date: str) -> Form4SignalResponse:
-    """
-    Insider Alignment Validator: Retrieves recent Form 4 insider trading data for a specific ticker.
-    Checks `form4_master` table using boolean flags (is_officer, is_director) and officer_title.
-
-    Args:
-        ticker (str): Stock ticker symbol.
-        analysis_date (str): Reference date in 'YYYY-MM-DD' format.
+# ==============================================================================
+# INTERNAL HELPERS
+# ==============================================================================
 
-    Returns:
-        Form4SignalResponse: Structured insider signal evaluation.
-    """
-    clean_ticker = ticker.strip().upper()
-    print(f"🕵️ Fetching live Form 4 Insider trades for: {clean_ticker} around {analysis_date}")
-    
-    client = bigquery.Client()
-    
-    query = """
-    SELECT 
-        ticker,
-        COALESCE(
-            officer_title, 
-            IF(is_director, 'Director', NULL),
-            IF(is_officer, 'Officer', NULL),
-            'Insider'
-        ) AS insider_title,
-        COALESCE(is_officer, FALSE) AS is_officer,
-        COALESCE(is_director, FALSE) AS is_director,
-        UPPER(TRIM(transaction_side)) AS transaction_type,
-        CAST(shares AS INT64) AS shares,
-        CAST(filing_date AS STRING) AS transaction_date
-    FROM 
-        `datascience-projects.gcp_shareloader.form4_master`
-    WHERE 
-        UPPER(TRIM(ticker)) = UPPER(@ticker)
-        AND filing_date <= PARSE_DATE('%Y-%m-%d', @analysis_date)
-        AND filing_date >= DATE_SUB(PARSE_DATE('%Y-%m-%d', @analysis_date), INTERVAL 90 DAY)
-        AND UPPER(TRIM(transaction_side)) IN ('BUY', 'SELL', 'P', 'S')
-    ORDER BY 
-        filing_date DESC, shares DESC
-    LIMIT 1;
-    """
-    
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("ticker", "STRING", clean_ticker),
-            bigquery.ScalarQueryParameter("analysis_date", "STRING", analysis_date),
-        ]
-    )
-    
+def _prefetch_fundamentals(tickers) -> None:
+    """Warm the shared fundamentals cache for every candidate while the agent reasons."""
+    if os.environ.get("FUNDAMENTALS_PREFETCH", "1") == "0" or not tickers:
+        return
     try:
-        query_job = client.query(query, job_config=job_config)
-        results = list(query_job.result())
-        
-        if not results:
-            return Form4SignalResponse(
-                ticker=clean_ticker,
-                error="No recent insider transactions found.",
-                signal_strength="Neutral"
-            )
-            
-        row = dict(results[0].items())
-        
-        side_raw = str(row.get("transaction_type", "")).upper()
-        if side_raw in ["BUY", "P"]:
-            tx_type = "Buy"
-        elif side_raw in ["SELL", "S"]:
-            tx_type = "Sell"
-        else:
-            tx_type = side_raw.capitalize()
-
-        title = str(row.get("insider_title", "")).upper()
-        is_officer = bool(row.get("is_officer", False))
-        is_director = bool(row.get("is_director", False))
-        
-        EXEC_KEYWORDS = ["CEO", "CFO", "CHIEF", "EXECUTIVE", "PRESIDENT", "VP", "OFFICER", "DIRECTOR"]
-        is_key_executive = is_officer or is_director or any(kw in title for kw in EXEC_KEYWORDS)
-        
-        if tx_type == "Buy" and is_key_executive:
-            signal = "Strong Buy Confluence"
-        elif tx_type == "Sell" and is_key_executive:
-            signal = "Warning - Insider Dumping"
-        else:
-            signal = "Neutral"
-            
-        return Form4SignalResponse(
-            ticker=clean_ticker,
-            insider_title=row.get("insider_title", "Insider"),
-            transaction_type=tx_type,
-            shares=row.get("shares", 0),
-            transaction_date=str(row.get("transaction_date", "N/A")),
-            is_officer=is_officer,
-            is_director=is_director,
-            signal_strength=signal
-        )
-
+        get_fundamentals_cache().prefetch(tickers)
     except Exception as e:
-        print(f"❌ Error querying form4_master: {e}")
-        return Form4SignalResponse(
-            ticker=clean_ticker,
-            error=f"Failed to execute query: {str(e)}",
-            signal_strength="Neutral"
-        )
+        print(f"⚠️ Fundamentals prefetch skipped: {e}")
 
 
-def fetch_lobbying_signals_tool(ticker: str, analysis_date: Optional[str] = None) -> LobbyingSignalResponse:
+def _get_bq_data(analysis_date: str) -> list:
     """
-    Political Context Validator: Retrieves recent corporate lobbying activity for a specific ticker.
-    
-    Use this tool to find out if a company is actively spending money in Washington D.C., 
-    how much they are spending, and what specific issues they are lobbying for.
+    Internal: Net Buy Activity signals for analysis_date.
 
-    Args:
-        ticker (str): The stock symbol (e.g., 'NVDA', 'LMT').
-        analysis_date (Optional[str]): Reference date in 'YYYY-MM-DD' format. Defaults to current date if None.
-
-    Returns:
-        LobbyingSignalResponse: Structured lobbying metrics and top issues list.
+    Reads the materialized partition for the date (one job); dates the daily
+    job has not covered yet fall back to aggregating `senate_disclosures`.
     """
-    clean_ticker = ticker.strip().upper()
-    print(f"🏛️ Fetching corporate lobbying data for: {clean_ticker}")
-    
-    try:
-        project_id = os.environ.get("GOOGLE_CLOUD_PROJECT", "datascience-projects")
-        client = bigquery.Client(project=project_id)
-        
-        query = """
-            SELECT 
-                ticker,
-                client_name,
-                SUM(amount) as total_spend,
-                MAX(filing_date) as latest_filing,
-                STRING_AGG(DISTINCT general_issues, ' | ') as raw_issues,
-                COUNT(*) as number_of_filings
-            FROM `datascience-projects.gcp_shareloader.lobbying_signals`
-            WHERE UPPER(TRIM(ticker)) = UPPER(@ticker)
-              AND filing_date <= IFNULL(PARSE_DATE('%Y-%m-%d', @analysis_date), CURRENT_DATE())
-              AND filing_date >= DATE_SUB(IFNULL(PARSE_DATE('%Y-%m-%d', @analysis_date), CURRENT_DATE()), INTERVAL 365 DAY)
-            GROUP BY ticker, client_name
-            LIMIT 1;
-        """
-        
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("ticker", "STRING", clean_ticker),
-                bigquery.ScalarQueryParameter("analysis_date", "STRING", analysis_date),
-            ]
-        )
-        
-        query_job = client.query(query, job_config=job_config)
-        records = list(query_job.result())
-        
-        if not records:
-            return LobbyingSignalResponse(
-                ticker=clean_ticker,
-                lobbying_status="No recent lobbying activity found."
-            )
-            
-        row = dict(records[0].items())
-        raw_issues = row.get("raw_issues") or ""
-        issues_list = [issue.strip() for issue in raw_issues.split(" | ") if issue.strip()]
-        
-        return LobbyingSignalResponse(
-            ticker=clean_ticker,
-            company_name=row.get("client_name", "N/A"),
-            total_spend_last_12m=float(row.get("total_spend") or 0.0),
-            latest_filing_date=str(row.get("latest_filing", "N/A")),
-            number_of_filings=int(row.get("number_of_filings") or 0),
-            top_lobbied_issues=issues_list,
-            lobbying_status="Active Lobbying Detected"
-        )
-
-    except Exception as e:
-        print(f"❌ Error fetching lobbying signals: {e}")
-        return LobbyingSignalResponse(
-            ticker=clean_ticker,
-            lobbying_status="Error",
-            error=f"Database error: {str(e)}"
-        )
-
-
-# ==============================================================================
-# INTERNAL HELPERS
-# ==============================================================================
-
-def _get_bq_data(analysis_date: str) -> list:
-    """Internal: Runs the Net Buy Activity SQL Algorithm with Parameterized Query."""
-    bq_client = bigquery.Client()
+    bq_client = get_bq_client()
     
     qry = """
     DECLARE run_date DATE DEFAULT PARSE_DATE('%Y-%m-%d', @analysis_date);
@@ -356,7 +233,10 @@ def _get_bq_data(analysis_date: str) -> list:
         ]
     )
     
-    df = bq_client.query(qry, job_config=job_config).to_dataframe()
+    df = _read_net_buy_partition(bq_client, job_config)
+    if df is None:
+        print(f"⚠️ No materialized net-buy partition for {analysis_date}; aggregating senate_disclosures")
+        df = bq_client.query(qry, job_config=job_config).to_dataframe()
     
     if df.empty:
         return []
@@ -369,9 +249,7 @@ def _get_bq_data(analysis_date: str) -> list:
     if df_filtered.empty:
         return []
 
-    df_filtered['market_uptrend'] = df_filtered['signal_date'].apply(
-        lambda x: _check_market_regime(x, analysis_date)
-    )
+    df_filtered['market_uptrend'] = _market_regime_flags(df_filtered['signal_date'], analysis_date)
     
     df_filtered['signal_date'] = df_filtered['signal_date'].astype(str)
     df_filtered['last_trade_date'] = df_filtered['last_trade_date'].astype(str)
@@ -379,58 +257,36 @@ def _get_bq_data(analysis_date: str) -> list:
     return df_filtered.to_dict(orient='records')
 
 
-def _check_market_regime(row_date, context_date_str) -> bool:
+def _read_net_buy_partition(bq_client, job_config) -> Optional[pd.DataFrame]:
+    """Signals from the materialized table, None when the date is not materialized yet."""
     try:
-        spy_data = _get_spy_data(context_date_str)
-        if spy_data.empty:
-            return True
-
-        target_date = pd.to_datetime(row_date).tz_localize(None)
-        idx_loc = spy_data.index.get_indexer([target_date], method='pad')[0]
-
-        if idx_loc == -1: 
-            return True
-
-        price = spy_data.iloc[idx_loc]['adjClose']
-        sma = spy_data.iloc[idx_loc]['SMA200']
-
-        if pd.isna(sma):
-            return True
+        df = bq_client.query(NET_BUY_SIGNALS_QUERY, job_config=job_config).to_dataframe()
+        if df.empty or not bool(df['materialized'].iloc[0]):
+            return None
+        return df[df['ticker'].notna()].drop(columns='materialized')
+    except Exception as e:
+        print(f"⚠️ Materialized net-buy read failed: {e}")
+        return None
 
-        return bool(price > sma)
 
+def _market_regime_flags(signal_dates, context_date_str: str) -> np.ndarray:
+    """SPX-above-SMA200 flag for every signal date: one SPX fetch, one array lookup."""
+    try:
+        regime = uptrend_series(_get_spy_data(context_date_str))
+        return tag_market_regime(signal_dates, regime)
     except Exception as e:
         print(f"⚠️ Regime Check Warning: {e}")
-        return True
+        return np.ones(len(signal_dates), dtype=bool)
+
+
+def _check_market_regime(row_date, context_date_str) -> bool:
+    return bool(_market_regime_flags([row_date], context_date_str)[0])
 
 
-@lru_cache(maxsize=32)
 def _get_spy_data(end_date_str: str) -> pd.DataFrame:
+    """SPX adjClose/SMA200 up to end_date_str, served from the persistent regime store."""
     try:
-        fmp_api_key = os.environ.get('FMP_API_KEY')
-        if not fmp_api_key:
-            return pd.DataFrame()
-
-        spx_url = f"https://financialmodelingprep.com/api/v3/historical-price-full/^SPX?from=2022-01-01&to={end_date_str}&apikey={fmp_api_key}"
-        response = requests.get(spx_url, timeout=10)
-        
-        if response.status_code != 200:
-            return pd.DataFrame()
-            
-        spx_res = response.json().get('historical', [])
-        if not spx_res:
-            return pd.DataFrame()
-
-        spx_res = spx_res[::-1]
-        spy_data = pd.DataFrame(data=spx_res)
-        
-        spy_data['date'] = pd.to_datetime(spy_data['date'])
-        spy_data.set_index('date', inplace=True)
-        spy_data.index = spy_data.index.tz_localize(None)
-        spy_data['SMA200'] = spy_data['adjClose'].rolling(window=200).mean()
-        
-        return spy_data
-        
+        return get_regime_store().frame(end_date_str)
     except Exception as e:
         print(f"❌ SPY Data Fetch Error: {e}")
         return pd.DataFrame()
@@ -6,6 +6,10 @@ from datetime import datetime
 import httpx 
 import sys
 
+# Shared helpers (e.g. oidc_token) have a single source in agents/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from oidc_token import get_token_provider
+
 # --- Configuration ---
 APP_URL = "https://congress-trades-agent-682143946483.us-central1.run.app"
 USER_ID = "user_123"
@@ -14,21 +18,11 @@ SESSION_ID = f"session_{datetime.now().strftime('%Y%m%d%H%M%S')}"
 APP_NAME = "congress_trades_agent"
 
 async def get_auth_token() -> str:
-    """Executes 'gcloud auth print-identity-token' asynchronously to fetch credentials."""
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            "gcloud", "auth", "print-identity-token",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
-        
-        if proc.returncode != 0:
-            raise RuntimeError(f"gcloud command failed: {stderr.decode().strip()}")
-            
-        return stdout.decode().strip()
-    except FileNotFoundError:
-        raise RuntimeError("gcloud CLI not found. Please ensure Google Cloud CLI is installed and authenticated.")
+    """
+    Returns the 'gcloud auth print-identity-token' token, cached in memory and
+    refreshed shortly before it expires instead of forking gcloud per request.
+    """
+    return await get_token_provider(APP_URL, use_metadata_server=False).get_token()
 
 async def make_request(client: httpx.AsyncClient, method: str, endpoint: str, data: Dict[str, Any] = None) -> httpx.Response:
     """Helper function for authenticated asynchronous requests using httpx."""
@@ -0,0 +1,73 @@
+#!/bin/bash
+set -e
+
+# --- CONFIGURATION ---
+PROJECT_ID="datascience-projects"
+REGION="us-central1"
+JOB_NAME="net-buy-materializer-job"
+IMAGE_NAME="net-buy-materializer"
+SCHEDULER_NAME="net-buy-materializer-daily"
+# Daily, after the senate disclosures load has landed
+SCHEDULE="0 7 * * *"
+TIME_ZONE="America/New_York"
+
+# Target URL for the built image
+IMAGE_URL="gcr.io/${PROJECT_ID}/${IMAGE_NAME}:latest"
+
+echo "⏳ Backing up existing main Dockerfile if it exists..."
+if [ -f Dockerfile ]; then
+    mv Dockerfile Dockerfile.bak
+    HAD_BAK=true
+else
+    HAD_BAK=false
+fi
+
+# Set up clean exit handling to restore files if the build crashes midway
+cleanup() {
+    echo "🧹 Cleaning up temporary build states..."
+    rm -f Dockerfile
+    if [ "$HAD_BAK" = true ]; then
+        mv Dockerfile.bak Dockerfile
+        echo "🔄 Restored your original main Dockerfile."
+    fi
+}
+trap cleanup EXIT
+
+echo "📝 Preparing net-buy materializer context..."
+cp Dockerfile.net_buy Dockerfile
+
+echo "📦 1. Building container remotely with Cloud Build..."
+gcloud builds submit --project $PROJECT_ID --tag $IMAGE_URL .
+
+echo "☁️ 2. Deploying Cloud Run Job from the built image..."
+gcloud run jobs deploy $JOB_NAME \
+    --image $IMAGE_URL \
+    --region $REGION \
+    --project $PROJECT_ID \
+    --set-env-vars PROJECT_ID=$PROJECT_ID \
+    --max-retries 2 \
+    --task-timeout 30m
+
+echo "⏰ 3. Scheduling the job with Cloud Scheduler..."
+PROJECT_NUMBER=$(gcloud projects describe $PROJECT_ID --format='value(projectNumber)')
+SCHEDULER_SA="${SCHEDULER_SA:-${PROJECT_NUMBER}-compute@developer.gserviceaccount.com}"
+RUN_URI="https://run.googleapis.com/v2/projects/${PROJECT_ID}/locations/${REGION}/jobs/${JOB_NAME}:run"
+
+if gcloud scheduler jobs describe $SCHEDULER_NAME --location $REGION --project $PROJECT_ID > /dev/null 2>&1; then
+    COMMAND="update"
+else
+    COMMAND="create"
+fi
+
+gcloud scheduler jobs $COMMAND http $SCHEDULER_NAME \
+    --location $REGION \
+    --project $PROJECT_ID \
+    --schedule "$SCHEDULE" \
+    --time-zone "$TIME_ZONE" \
+    --uri "$RUN_URI" \
+    --http-method POST \
+    --oauth-service-account-email "$SCHEDULER_SA"
+
+echo "✅ Cloud Run Job '$JOB_NAME' deployed and scheduled ('$SCHEDULE' $TIME_ZONE)!"
+echo "💡 To trigger it manually right now, run:"
+echo "   gcloud run jobs execute $JOB_NAME --region $REGION"
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Daily Congress Net-Buy Materializer
+Keeps `congress_net_buy_daily` up to date: one partition per signal date with
+the rolling 90-day buy/sell counts, buying-day count and last trade date of
+every ticker traded in that window. `fetch_congress_signals_tool` reads a
+single partition instead of re-aggregating `senate_disclosures`.
+
+Each run rebuilds the last --refresh-days partitions (late STOCK Act filings
+land up to 45 days after the trade) plus any gap since the last materialized
+date. Every rebuilt date is also recorded in `congress_net_buy_coverage`, so
+a date whose 90-day window has no eligible trades still counts as
+materialized. Re-running a range is idempotent. Runs daily after the senate
+disclosures load as the `net-buy-materializer-job` Cloud Run Job (see
+deploy_net_buy_job.sh):
+    python materialize_net_buy_signals.py
+    python materialize_net_buy_signals.py --start-date 2024-01-01 --end-date 2024-12-31
+"""
+
+import os
+import sys
+import argparse
+import datetime
+import logging
+from typing import Optional
+
+from google.cloud import bigquery
+from google.api_core.exceptions import NotFound
+
+# --- CONFIGURATION ---
+PROJECT_ID = os.environ.get("PROJECT_ID", "datascience-projects")
+DATASET_ID = "gcp_shareloader"
+SOURCE_TABLE_ID = "senate_disclosures"
+TABLE_ID = "congress_net_buy_daily"
+COVERAGE_TABLE_ID = "congress_net_buy_coverage"
+# Partitions rebuilt on every run to pick up late disclosures.
+DEFAULT_REFRESH_DAYS = 45
+# First signal date materialized when the table does not exist yet.
+BACKFILL_START = os.environ.get("NET_BUY_BACKFILL_START", "2024-01-01")
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+)
+logger = logging.getLogger(__name__)
+
+# Same normalization, ETF exclusions and 90-day window as the live query in
+# congress_trades_agent/tools.py; only the per-date HAVING thresholds are left
+# to the reader so they can change without a rebuild.
+MATERIALIZE_SQL = """
+DECLARE start_date DATE DEFAULT PARSE_DATE('%Y-%m-%d', @start_date);
+DECLARE end_date DATE DEFAULT PARSE_DATE('%Y-%m-%d', @end_date);
+
+CREATE TABLE IF NOT EXISTS `{table}` (
+    signal_date DATE NOT NULL,
+    ticker STRING NOT NULL,
+    purchase_count INT64,
+    sale_count INT64,
+    net_buy_activity INT64,
+    buying_days_count INT64,
+    last_trade_date DATE,
+    materialized_at TIMESTAMP
+)
+PARTITION BY signal_date
+CLUSTER BY ticker;
+
+CREATE TABLE IF NOT EXISTS `{coverage}` (
+    signal_date DATE NOT NULL,
+    materialized_at TIMESTAMP
+);
+
+BEGIN TRANSACTION;
+
+DELETE FROM `{table}` WHERE signal_date BETWEEN start_date AND end_date;
+DELETE FROM `{coverage}` WHERE signal_date BETWEEN start_date AND end_date;
+
+INSERT INTO `{coverage}` (signal_date, materialized_at)
+SELECT signal_date, CURRENT_TIMESTAMP()
+FROM UNNEST(GENERATE_DATE_ARRAY(start_date, end_date)) AS signal_date;
+
+INSERT INTO `{table}` (
+    signal_date, ticker, purchase_count, sale_count, net_buy_activity,
+    buying_days_count, last_trade_date, materialized_at
+)
+WITH clean_data AS (
+    SELECT
+        AS_OF_DATE AS trade_date,
+        CASE
+            WHEN DISCLOSURE LIKE '%Purchase%' THEN 'Buy'
+            WHEN DISCLOSURE LIKE '%Sale%' THEN 'Sell'
+            ELSE 'Other'
+        END AS action,
+        TRIM(REPLACE(TICKER, 'Ticker:', '')) AS ticker
+    FROM `{source}`
+    WHERE
+        TICKER IS NOT NULL
+        AND AS_OF_DATE IS NOT NULL
+        AND AS_OF_DATE >= DATE_SUB(start_date, INTERVAL 90 DAY)
+        AND AS_OF_DATE <= end_date
+),
+eligible AS (
+    SELECT *
+    FROM clean_data
+    WHERE
+        LOWER(ticker) NOT IN (
+            'vti', 'spy', 'voo', 'qqq', 'ivv', 'spxl', 'spxs',
+            'tqqq', 'sqqq', 'dia', 'iwm', 'dow', 'shv', 'bnd'
+        )
+        AND TRIM(ticker) != ''
+        AND ticker IS NOT NULL
+        AND LENGTH(ticker) <= 4
+        AND NOT REGEXP_CONTAINS(ticker, r'[^a-zA-Z]')
+)
+SELECT
+    signal_date,
+    e.ticker,
+    COUNTIF(e.action = 'Buy') AS purchase_count,
+    COUNTIF(e.action = 'Sell') AS sale_count,
+    (COUNTIF(e.action = 'Buy') - COUNTIF(e.action = 'Sell')) AS net_buy_activity,
+    COUNT(DISTINCT CASE WHEN e.action = 'Buy' THEN e.trade_date END) AS buying_days_count,
+    MAX(e.trade_date) AS last_trade_date,
+    CURRENT_TIMESTAMP() AS materialized_at
+FROM UNNEST(GENERATE_DATE_ARRAY(start_date, end_date)) AS signal_date
+JOIN eligible AS e
+    ON e.trade_date BETWEEN DATE_SUB(signal_date, INTERVAL 90 DAY) AND signal_date
+GROUP BY signal_date, e.ticker;
+
+COMMIT TRANSACTION;
+"""
+
+
+def table_ref(table_id: str) -> str:
+    return f"{PROJECT_ID}.{DATASET_ID}.{table_id}"
+
+
+def last_materialized_date(client: bigquery.Client) -> Optional[datetime.date]:
+    """Latest covered signal_date, None if the coverage table is missing or empty."""
+    try:
+        client.get_table(table_ref(COVERAGE_TABLE_ID))
+    except NotFound:
+        return None
+    rows = list(client.query(f"SELECT MAX(signal_date) AS last_date FROM `{table_ref(COVERAGE_TABLE_ID)}`").result())
+    return rows[0].last_date if rows else None
+
+
+def determine_date_range(
+    last_date: Optional[datetime.date],
+    end_date: datetime.date,
+    refresh_days: int,
+) -> tuple:
+    """
+    Refresh window ending at end_date, widened back to the day after the last
+    materialized date if runs were missed. Starts at BACKFILL_START on the
+    first run.
+    """
+    if last_date is None:
+        return datetime.date.fromisoformat(BACKFILL_START), end_date
+    refresh_start = end_date - datetime.timedelta(days=refresh_days)
+    gap_start = last_date + datetime.timedelta(days=1)
+    return min(refresh_start, gap_start), end_date
+
+
+def materialize(client: bigquery.Client, start_date: datetime.date, end_date: datetime.date) -> None:
+    logger.info(f"🧮 Materializing net-buy partitions {start_date} → {end_date}")
+    sql = MATERIALIZE_SQL.format(
+        table=table_ref(TABLE_ID),
+        coverage=table_ref(COVERAGE_TABLE_ID),
+        source=table_ref(SOURCE_TABLE_ID),
+    )
+    job = client.query(
+        sql,
+        job_config=bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("start_date", "STRING", start_date.isoformat()),
+                bigquery.ScalarQueryParameter("end_date", "STRING", end_date.isoformat()),
+            ]
+        ),
+    )
+    job.result()
+    logger.info(f"✅ Done ({job.total_bytes_processed or 0:,} bytes processed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize the daily Congress net-buy signal table.")
+    parser.add_argument("--start-date", help="First signal date to rebuild (YYYY-MM-DD). Defaults to the refresh window.")
+    parser.add_argument("--end-date", help="Last signal date to rebuild (YYYY-MM-DD). Defaults to today.")
+    parser.add_argument("--refresh-days", type=int, default=DEFAULT_REFRESH_DAYS,
+                        help="Trailing partitions rebuilt on each run to pick up late disclosures.")
+    args = parser.parse_args()
+
+    client = bigquery.Client(project=PROJECT_ID)
+    end_date = datetime.date.fromisoformat(args.end_date) if args.end_date else datetime.date.today()
+    if args.start_date:
+        start_date = datetime.date.fromisoformat(args.start_date)
+    else:
+        start_date, end_date = determine_date_range(last_materialized_date(client), end_date, args.refresh_days)
+
+    if start_date > end_date:
+        logger.error(f"Start date {start_date} is after end date {end_date}")
+        sys.exit(1)
+
+    try:
+        materialize(client, start_date, end_date)
+    except Exception as e:
+        logger.error(f"Net-buy materialization failed: {e}", exc_info=True)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
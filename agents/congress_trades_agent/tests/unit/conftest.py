@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fresh_bq_clients():
+    """Drop pooled BigQuery clients so each test sees its own patched Client."""
+    from congress_trades_agent.bq_client import reset_bq_clients
+    reset_bq_clients()
+    yield
+    reset_bq_clients()
+
+
+@pytest.fixture(autouse=True)
+def isolated_regime_store(tmp_path, monkeypatch):
+    """Keep the SPX regime series out of the user's cache directory."""
+    monkeypatch.setenv("REGIME_STORE_PATH", str(tmp_path / "spx_regime.sqlite"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_fundamentals_cache(tmp_path, monkeypatch):
+    """Fresh fundamentals snapshot per test, no background prefetch to Yahoo."""
+    monkeypatch.setenv("FUNDAMENTALS_CACHE_PATH", str(tmp_path / "fundamentals.sqlite"))
+    monkeypatch.setenv("FUNDAMENTALS_PREFETCH", "0")
@@ -0,0 +1,35 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+import congress_trades_agent.bq_client as bq_client
+from congress_trades_agent.bq_client import get_bq_client, reset_bq_clients
+
+
+@pytest.fixture
+def client_factory(monkeypatch):
+    created = []
+
+    def _factory(project=None):
+        client = MagicMock(name=f"Client({project})")
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(bq_client.bigquery, "Client", _factory)
+    reset_bq_clients()
+    yield created
+    reset_bq_clients()
+
+
+def test_client_is_shared_per_project(client_factory):
+    assert get_bq_client("proj-a") is get_bq_client("proj-a")
+    assert get_bq_client("proj-a") is not get_bq_client("proj-b")
+    assert len(client_factory) == 2
+
+
+def test_reset_closes_and_forgets_clients(client_factory):
+    first = get_bq_client("proj-a")
+    reset_bq_clients()
+
+    first.close.assert_called_once()
+    assert get_bq_client("proj-a") is not first
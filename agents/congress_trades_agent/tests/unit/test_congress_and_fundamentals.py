@@ -114,6 +114,73 @@ def test_fetch_congress_signals_exception_handling(mock_bigquery_client):
     assert "BigQuery Access Denied" in result.error
 
 
+@patch("congress_trades_agent.tools._get_spy_data", return_value=pd.DataFrame())
+def test_fetch_congress_signals_reads_materialized_partition(mock_spy_data, mock_bigquery_client):
+    """A materialized date is answered by the single-partition query alone."""
+    mock_query_job = MagicMock()
+    mock_query_job.to_dataframe.return_value = pd.DataFrame([{
+        "materialized": True,
+        "signal_date": "2026-07-01",
+        "ticker": "LMT",
+        "purchase_count": 6,
+        "sale_count": 0,
+        "net_buy_activity": 6,
+        "buying_days_count": 3,
+        "last_trade_date": "2026-06-28",
+    }])
+    mock_bigquery_client.query.return_value = mock_query_job
+
+    result = fetch_congress_signals_tool(analysis_date="2026-07-01")
+
+    assert result.count == 1
+    assert mock_bigquery_client.query.call_count == 1
+    sql = mock_bigquery_client.query.call_args[0][0]
+    assert "congress_net_buy_daily" in sql
+    assert "senate_disclosures" not in sql
+
+
+@patch("congress_trades_agent.tools._get_spy_data", return_value=pd.DataFrame())
+def test_fetch_congress_signals_falls_back_when_partition_missing(mock_spy_data, mock_bigquery_client):
+    """Dates the materializer has not covered are aggregated from senate_disclosures."""
+    live_df = pd.DataFrame([{
+        "signal_date": "2026-07-01",
+        "ticker": "NVDA",
+        "purchase_count": 8,
+        "sale_count": 0,
+        "net_buy_activity": 8,
+        "buying_days_count": 4,
+        "last_trade_date": "2026-06-29",
+    }])
+
+    def run_query(sql, job_config=None):
+        job = MagicMock()
+        job.to_dataframe.return_value = (
+            live_df if "senate_disclosures" in sql else pd.DataFrame([{"materialized": False, "ticker": None}])
+        )
+        return job
+
+    mock_bigquery_client.query.side_effect = run_query
+
+    result = fetch_congress_signals_tool(analysis_date="2026-07-01")
+
+    assert result.count == 1
+    assert result.signals[0].ticker == "NVDA"
+    assert mock_bigquery_client.query.call_count == 2
+
+
+def test_fetch_congress_signals_covered_date_without_signals(mock_bigquery_client):
+    """A materialized date with no eligible trades is answered without the live aggregation."""
+    mock_query_job = MagicMock()
+    mock_query_job.to_dataframe.return_value = pd.DataFrame([{"materialized": True, "ticker": None}])
+    mock_bigquery_client.query.return_value = mock_query_job
+
+    result = fetch_congress_signals_tool(analysis_date="2026-07-01")
+
+    assert result.count == 0
+    assert result.error is None
+    assert mock_bigquery_client.query.call_count == 1
+
+
 # ==============================================================================
 # TESTS FOR check_fundamentals_tool
 # ==============================================================================
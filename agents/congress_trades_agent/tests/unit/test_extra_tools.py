@@ -117,4 +117,71 @@ def test_fetch_form4_signals_bigquery_exception_handling(mock_bigquery_client):
     assert isinstance(result, Form4SignalResponse)
     assert result.ticker == "AAPL"
     assert result.signal_strength == "Neutral"
-    assert "Failed to execute query: BigQuery Access Denied" in result.error
\ No newline at end of file
+    assert "Failed to execute query: BigQuery Access Denied" in result.error
+
+def _mock_rows(*rows):
+    mocks = []
+    for row in rows:
+        mock_row = MagicMock()
+        mock_row.items.return_value = row.items()
+        mocks.append(mock_row)
+    return mocks
+
+
+def test_fetch_form4_signals_bulk_runs_one_job(mock_bigquery_client):
+    """All tickers share one UNNEST query; tickers without rows get the no-records response."""
+    from congress_trades_agent.extra_tools import fetch_form4_signals_bulk
+
+    mock_job = MagicMock()
+    mock_job.result.return_value = _mock_rows(
+        create_mock_row("NVDA", "CHIEF EXECUTIVE OFFICER", "P", 5000, "2026-06-20"),
+        create_mock_row("LMT", "Insider", "S", 100, "2026-06-18", is_officer=False),
+    )
+    mock_bigquery_client.query.return_value = mock_job
+
+    results = fetch_form4_signals_bulk(["nvda", "LMT", "XYZ", "NVDA "], "2026-07-01")
+
+    assert mock_bigquery_client.query.call_count == 1
+    sql, kwargs = mock_bigquery_client.query.call_args[0][0], mock_bigquery_client.query.call_args[1]
+    assert "ticker IN UNNEST(@tks)" in sql
+    assert "QUALIFY ROW_NUMBER()" in sql
+    assert "UPPER(TRIM(ticker))" not in sql
+    assert kwargs["job_config"].query_parameters[0].values == ["NVDA", "LMT", "XYZ"]
+
+    assert list(results) == ["NVDA", "LMT", "XYZ"]
+    assert results["NVDA"].signal_strength == "Strong Buy Confluence"
+    assert results["LMT"].signal_strength == "Neutral"
+    assert results["XYZ"].error == "No recent insider transactions found."
+
+
+def test_enrich_congress_signals_uses_two_jobs_for_all_tickers(mock_bigquery_client):
+    """Ten candidates -> one Form 4 job plus one lobbying job."""
+    from congress_trades_agent.extra_tools import enrich_congress_signals_tool
+
+    tickers = [f"T{i}" for i in range(10)]
+    lobbying_row = {
+        "ticker": "T3",
+        "client_name": "T3 HOLDINGS",
+        "total_spend": 50000.0,
+        "latest_filing": "2026-05-01",
+        "raw_issues": "Defense | Budget",
+        "number_of_filings": 2,
+    }
+
+    def run_query(sql, job_config=None):
+        job = MagicMock()
+        if "lobbying_signals" in sql:
+            job.result.return_value = _mock_rows(lobbying_row)
+        else:
+            job.result.return_value = _mock_rows(create_mock_row("T1", "CFO", "S", 900, "2026-06-01"))
+        return job
+
+    mock_bigquery_client.query.side_effect = run_query
+
+    result = enrich_congress_signals_tool(tickers, "2026-07-01")
+
+    assert mock_bigquery_client.query.call_count == 2
+    assert result.count == 10
+    assert result.enrichments["T1"].form4.signal_strength == "Warning - Insider Dumping"
+    assert result.enrichments["T3"].lobbying.top_lobbied_issues == ["Defense", "Budget"]
+    assert result.enrichments["T0"].lobbying.lobbying_status == "No recent lobbying activity found."
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from congress_trades_agent.fundamentals_cache import FundamentalsCache, get_fundamentals_cache
+from congress_trades_agent.tools import check_fundamentals_tool
+
+
+class FakeFetch:
+    def __init__(self, fail=(), delay=0.0):
+        self.calls = []
+        self.fail = set(fail)
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker):
+        with self._lock:
+            self.calls.append(ticker)
+        time.sleep(self.delay)
+        if ticker in self.fail:
+            raise RuntimeError(f"no data for {ticker}")
+        return {"longName": f"{ticker} Corp", "sector": "Technology", "marketCap": 1e9}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = FundamentalsCache(str(tmp_path / "f.sqlite"), fetch=FakeFetch(), max_workers=4)
+    yield cache
+    cache.close()
+
+
+def test_get_many_resolves_each_ticker_once(cache):
+    first = cache.get_many(["nvda", "LMT", "NVDA "])
+    second = cache.get_many(["LMT", "NVDA", "RTX"])
+
+    assert set(first) == {"NVDA", "LMT"}
+    assert set(second) == {"NVDA", "LMT", "RTX"}
+    assert sorted(cache._fetch.calls) == ["LMT", "NVDA", "RTX"]
+
+
+def test_concurrent_requests_share_one_lookup(tmp_path):
+    cache = FundamentalsCache(str(tmp_path / "f.sqlite"), fetch=FakeFetch(delay=0.1), max_workers=4)
+    cache.prefetch(["NVDA"])
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("NVDA"))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert cache._fetch.calls == ["NVDA"]
+    assert all(r["longName"] == "NVDA Corp" for r in results)
+    cache.close()
+
+
+def test_failed_lookup_is_skipped_and_retried(tmp_path):
+    fetch = FakeFetch(fail={"BAD"})
+    cache = FundamentalsCache(str(tmp_path / "f.sqlite"), fetch=fetch)
+
+    assert set(cache.get_many(["BAD", "GOOD"])) == {"GOOD"}
+    with pytest.raises(RuntimeError):
+        cache.get("BAD")
+    assert fetch.calls.count("BAD") == 2
+    cache.close()
+
+
+def test_snapshot_expires_the_next_day(tmp_path):
+    path = str(tmp_path / "f.sqlite")
+    cache = FundamentalsCache(path, fetch=FakeFetch())
+    cache.get("NVDA")
+    cache._conn.execute("UPDATE fundamentals SET fetched_on = '2000-01-01'")
+    cache.get("NVDA")
+
+    assert cache._fetch.calls == ["NVDA", "NVDA"]
+    cache.close()
+
+
+def test_fundamentals_tool_reads_shared_cache():
+    stock = MagicMock()
+    stock.info = {"sector": "Industrials", "marketCap": 5_000_000_000, "longName": "Acme Inc"}
+    with patch("congress_trades_agent.tools.yf.Ticker", return_value=stock) as ticker_cls:
+        check_fundamentals_tool("ACME")
+        result = check_fundamentals_tool(" acme ")
+        profile = get_fundamentals_cache().get("ACME")
+
+    assert ticker_cls.call_count == 1
+    assert result.sector == "Industrials"
+    assert result.market_cap_B == 5.0
+    assert profile["longName"] == "Acme Inc"
@@ -0,0 +1,56 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from congress_trades_agent.market_regime import tag_market_regime, uptrend_series
+from congress_trades_agent.tools import _check_market_regime, _market_regime_flags
+
+
+@pytest.fixture
+def spy_data():
+    dates = pd.bdate_range("2023-01-02", periods=400)
+    rng = np.random.default_rng(7)
+    prices = 4000 + np.cumsum(rng.normal(0, 40, len(dates)))
+    frame = pd.DataFrame({"adjClose": prices}, index=dates)
+    frame["SMA200"] = frame["adjClose"].rolling(window=200).mean()
+    return frame
+
+
+def _per_row_reference(spy_data, row_date):
+    """The original row-by-row get_indexer lookup."""
+    target = pd.to_datetime(row_date).tz_localize(None)
+    idx_loc = spy_data.index.get_indexer([target], method="pad")[0]
+    if idx_loc == -1:
+        return True
+    sma = spy_data.iloc[idx_loc]["SMA200"]
+    return True if pd.isna(sma) else bool(spy_data.iloc[idx_loc]["adjClose"] > sma)
+
+
+def test_vectorized_flags_match_per_row_lookup(spy_data):
+    signal_dates = [d.date() for d in pd.date_range("2022-12-25", "2024-08-01", freq="D")]
+    expected = [_per_row_reference(spy_data, d) for d in signal_dates]
+
+    flags = tag_market_regime(signal_dates, uptrend_series(spy_data))
+
+    assert flags.tolist() == expected
+    assert not all(expected) and any(expected)
+
+
+def test_empty_or_unparseable_input_defaults_to_uptrend():
+    assert tag_market_regime(["2024-01-02"], uptrend_series(pd.DataFrame())).tolist() == [True]
+    assert tag_market_regime(["not a date"], pd.Series([False], index=pd.to_datetime(["2024-01-01"]))).tolist() == [True]
+
+
+@patch("congress_trades_agent.tools._get_spy_data")
+def test_tools_fetch_spx_once_for_all_rows(mock_spy, spy_data):
+    mock_spy.return_value = spy_data
+    dates = pd.Series([datetime.date(2024, 6, 3), datetime.date(2023, 1, 1), datetime.date(2024, 6, 8)])
+
+    flags = _market_regime_flags(dates, "2024-08-01")
+
+    assert mock_spy.call_count == 1
+    assert flags.tolist() == [_per_row_reference(spy_data, d) for d in dates]
+    assert _check_market_regime(dates[0], "2024-08-01") == flags[0]
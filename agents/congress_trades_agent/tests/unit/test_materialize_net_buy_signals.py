@@ -0,0 +1,41 @@
+import datetime
+from unittest.mock import MagicMock
+
+from scripts import materialize_net_buy_signals as job
+
+
+def test_first_run_backfills_from_backfill_start():
+    start, end = job.determine_date_range(None, datetime.date(2026, 7, 1), refresh_days=45)
+
+    assert start == datetime.date.fromisoformat(job.BACKFILL_START)
+    assert end == datetime.date(2026, 7, 1)
+
+
+def test_daily_run_rebuilds_the_refresh_window():
+    start, end = job.determine_date_range(
+        datetime.date(2026, 6, 30), datetime.date(2026, 7, 1), refresh_days=45
+    )
+
+    assert start == datetime.date(2026, 5, 17)
+    assert end == datetime.date(2026, 7, 1)
+
+
+def test_missed_runs_widen_the_window_to_the_gap():
+    start, _ = job.determine_date_range(
+        datetime.date(2026, 3, 31), datetime.date(2026, 7, 1), refresh_days=45
+    )
+
+    assert start == datetime.date(2026, 4, 1)
+
+
+def test_materialize_records_coverage_for_every_date():
+    client = MagicMock()
+    client.query.return_value.total_bytes_processed = 0
+
+    job.materialize(client, datetime.date(2026, 6, 1), datetime.date(2026, 6, 30))
+
+    sql, = client.query.call_args[0]
+    params = {p.name: p.value for p in client.query.call_args[1]["job_config"].query_parameters}
+    assert params == {"start_date": "2026-06-01", "end_date": "2026-06-30"}
+    assert "INSERT INTO `datascience-projects.gcp_shareloader.congress_net_buy_coverage`" in sql
+    assert "GENERATE_DATE_ARRAY(start_date, end_date)" in sql
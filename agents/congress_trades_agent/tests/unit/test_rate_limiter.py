@@ -0,0 +1,70 @@
+import pytest
+
+import congress_trades_agent.rate_limiter as rate_limiter
+from congress_trades_agent.rate_limiter import TokenBucket, get_fmp_limiter, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", fake.sleep)
+    return fake
+
+
+@pytest.fixture
+def fresh_limiter(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_LIMITER", None)
+
+
+def test_burst_until_budget_spent_then_refill_rate(clock):
+    bucket = TokenBucket(calls_per_minute=60)
+
+    for _ in range(60):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_penalize_blocks_all_callers(clock):
+    bucket = TokenBucket(calls_per_minute=600)
+    bucket.penalize(30)
+
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(30.0)]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after(None, default=5) == 5
+    assert parse_retry_after("garbage", default=7) == 7
+
+
+def test_default_budget_is_this_packages_share(fresh_limiter, monkeypatch):
+    monkeypatch.delenv("FMP_CALLS_PER_MINUTE", raising=False)
+
+    limiter = get_fmp_limiter()
+
+    assert limiter.capacity == rate_limiter.DEFAULT_CALLS_PER_MINUTE == 60
+    assert get_fmp_limiter() is limiter
+
+
+def test_budget_comes_from_env(fresh_limiter, monkeypatch):
+    monkeypatch.setenv("FMP_CALLS_PER_MINUTE", "30")
+
+    assert get_fmp_limiter().capacity == 30
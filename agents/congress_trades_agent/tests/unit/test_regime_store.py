@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from congress_trades_agent.regime_store import HISTORY_START, SMA_WINDOW, SpxRegimeStore
+
+
+@pytest.fixture
+def closes():
+    dates = pd.bdate_range(HISTORY_START, "2024-06-28")
+    rng = np.random.default_rng(11)
+    return pd.Series(4000 + np.cumsum(rng.normal(0, 30, len(dates))), index=dates)
+
+
+class FakeFetch:
+    def __init__(self, closes):
+        self.closes = closes
+        self.calls = []
+
+    def __call__(self, start, end):
+        self.calls.append((start, end))
+        return self.closes[(self.closes.index >= pd.Timestamp(start)) & (self.closes.index <= pd.Timestamp(end))]
+
+
+@pytest.fixture
+def store(tmp_path, closes):
+    store = SpxRegimeStore(str(tmp_path / "spx.sqlite"), fetch=FakeFetch(closes))
+    yield store
+    store.close()
+
+
+def test_first_request_downloads_history_from_start(store):
+    frame = store.frame("2024-01-31")
+
+    assert store._fetch.calls == [(HISTORY_START, "2024-01-31")]
+    assert frame.index.max() == pd.Timestamp("2024-01-31")
+    assert list(frame.columns) == ["adjClose", "SMA200"]
+
+
+def test_later_as_of_date_fetches_only_missing_days(store):
+    store.frame("2024-01-31")
+    store.frame("2024-03-15")
+
+    assert store._fetch.calls[-1] == ("2024-02-01", "2024-03-15")
+
+
+def test_earlier_as_of_date_is_sliced_without_fetching(store):
+    store.frame("2024-03-15")
+    frame = store.frame("2023-06-30")
+
+    assert len(store._fetch.calls) == 1
+    assert frame.index.max() == pd.Timestamp("2023-06-30")
+
+
+def test_incremental_sma_matches_full_rolling_mean(store, closes):
+    for as_of in ["2022-06-30", "2023-01-31", "2023-11-30", "2024-06-28"]:
+        store.frame(as_of)
+
+    frame = store.frame("2024-06-28")
+    expected = closes.rolling(window=SMA_WINDOW).mean()
+
+    assert np.allclose(frame["adjClose"].values, closes.values)
+    assert np.allclose(frame["SMA200"].values, expected.values, equal_nan=True)
+
+
+def test_failed_fetch_is_retried_on_next_request(tmp_path, closes):
+    fetch = FakeFetch(closes)
+    responses = [None]
+    store = SpxRegimeStore(
+        str(tmp_path / "spx.sqlite"),
+        fetch=lambda start, end: responses.pop() if responses else fetch(start, end),
+    )
+
+    assert store.frame("2024-01-31").empty
+    assert not store.frame("2024-01-31").empty
+    assert fetch.calls == [(HISTORY_START, "2024-01-31")]
+    store.close()
+
+
+def test_store_persists_across_instances(tmp_path, closes):
+    path = str(tmp_path / "spx.sqlite")
+    SpxRegimeStore(path, fetch=FakeFetch(closes)).frame("2024-01-31")
+
+    reopened = SpxRegimeStore(path, fetch=FakeFetch(closes))
+    frame = reopened.frame("2023-12-29")
+
+    assert reopened._fetch.calls == []
+    assert frame.index.max() == pd.Timestamp("2023-12-29")
+    reopened.close()
+
+
+def test_intraday_bar_is_replaced_by_a_later_fetch(tmp_path):
+    today = pd.Timestamp.today().normalize()
+    days = pd.bdate_range(end=today - pd.Timedelta(days=1), periods=5)
+    intraday = pd.Series([100.0] * len(days) + [90.0], index=days.append(pd.DatetimeIndex([today])))
+    fetch = FakeFetch(intraday)
+    store = SpxRegimeStore(str(tmp_path / "spx.sqlite"), fetch=fetch)
+    today_str = today.strftime("%Y-%m-%d")
+
+    assert store.frame(today_str)["adjClose"].iloc[-1] == 90.0
+
+    fetch.closes = intraday.copy()
+    fetch.closes.iloc[-1] = 95.0
+    frame = store.frame(today_str)
+
+    assert fetch.calls[-1] == (today_str, today_str)
+    assert frame["adjClose"].iloc[-1] == 95.0
+    assert len(frame) == len(intraday)
+    store.close()
+
+
+class FmpResponse:
+    status_code = 200
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def fmp_store(tmp_path, closes, monkeypatch):
+    """Store filled through Friday 2024-05-31, then reading from (mocked) FMP."""
+    from congress_trades_agent import regime_store
+
+    store = SpxRegimeStore(str(tmp_path / "spx.sqlite"), fetch=FakeFetch(closes))
+    store.frame("2024-05-31")
+    store._fetch = regime_store.fetch_spx_closes
+    monkeypatch.setenv("FMP_API_KEY", "KEY")
+    calls = []
+
+    def respond_with(body):
+        def fake_get(url, timeout=None):
+            calls.append(url)
+            return FmpResponse(body)
+        monkeypatch.setattr(regime_store.requests, "get", fake_get)
+        return calls
+
+    yield store, respond_with
+    store.close()
+
+
+def test_window_without_trading_days_is_settled(fmp_store):
+    store, respond_with = fmp_store
+    calls = respond_with({"symbol": "^SPX", "historical": []})
+
+    frame = store.frame("2024-06-02")
+
+    assert frame.index.max() == pd.Timestamp("2024-05-31")
+    assert store._meta("fetched_through") == "2024-06-02"
+    store.frame("2024-06-02")
+    assert len(calls) == 1
+
+
+def test_fmp_error_body_does_not_advance_fetched_through(fmp_store):
+    store, respond_with = fmp_store
+    calls = respond_with({"Error Message": "Limit Reach. Please upgrade your plan"})
+
+    frame = store.frame("2024-06-03")
+
+    assert frame.index.max() == pd.Timestamp("2024-05-31")
+    assert store._meta("fetched_through") == "2024-05-31"
+    store.frame("2024-06-03")
+    assert len(calls) == 2
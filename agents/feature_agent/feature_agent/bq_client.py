@@ -0,0 +1,85 @@
+# feature_agent/bq_client.py — process-wide, pooled BigQuery clients
+# Each agent directory is its own Cloud Run build context (`--source .`), so
+# this module is vendored per agent; keep the copies identical.
+
+import os
+import logging
+import threading
+from typing import Dict, Iterable, Optional
+
+from google.cloud import bigquery
+from requests.adapters import HTTPAdapter
+
+# -----------------------------
+# CONFIGURATION
+# -----------------------------
+# Max keep-alive HTTP connections per client; should cover the staging thread pool.
+DEFAULT_POOL_SIZE = 16
+
+_CLIENTS: Dict[str, bigquery.Client] = {}
+_LOCK = threading.Lock()
+
+
+def _size_connection_pool(client: bigquery.Client, pool_size: int) -> None:
+    """Mount a larger urllib3 pool on the client's authorized session."""
+    http = getattr(client, "_http", None)
+    mount = getattr(http, "mount", None)
+    if callable(mount):
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        mount("https://", adapter)
+
+
+def get_bq_client(project: Optional[str] = None) -> bigquery.Client:
+    """
+    Return the shared BigQuery client for `project`, creating it on first use.
+
+    Credential discovery and HTTP session setup happen once per project per
+    process; every tool call after that reuses the same pooled connections.
+    `project=None` uses the ADC default project, like bigquery.Client().
+    """
+    key = project or ""
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+
+    with _LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = bigquery.Client(project=project) if project else bigquery.Client()
+            pool_size = int(os.environ.get("BQ_POOL_SIZE", DEFAULT_POOL_SIZE))
+            try:
+                _size_connection_pool(client, pool_size)
+            except Exception as e:
+                logging.warning(f"⚠️ Could not resize BigQuery connection pool: {e}")
+            _CLIENTS[key] = client
+            logging.info(f"🔌 BigQuery client created for project={project or 'default'}")
+        return client
+
+
+def warm_up_bq_clients(projects: Iterable[Optional[str]], run_probe: bool = True) -> None:
+    """
+    Create clients ahead of the first tool call (call at service start).
+    With `run_probe`, a trivial query also primes credentials and the connection pool.
+    """
+    for project in projects:
+        try:
+            client = get_bq_client(project)
+            if run_probe:
+                client.query("SELECT 1").result()
+            logging.info(f"🔥 BigQuery warm-up done for project={project or 'default'}")
+        except Exception as e:
+            logging.warning(f"⚠️ BigQuery warm-up failed for project={project or 'default'}: {e}")
+
+
+def reset_bq_clients() -> None:
+    """Close and forget every cached client (shutdown and tests)."""
+    with _LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client in clients:
+        close = getattr(client, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
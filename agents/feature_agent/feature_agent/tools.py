@@ -5,6 +5,8 @@ from google.cloud import bigquery
 import requests
 import yfinance as yf
 
+from feature_agent.bq_client import get_bq_client
+
 # --- TOOL 1: BigQuery Historical Consensus ---
 # --- TOOL 1: BigQuery Historical Consensus ---
 def fetch_consensus_holdings_tool(target_date: str, offset: int = 0) -> list:
@@ -19,7 +21,7 @@ def fetch_consensus_holdings_tool(target_date: str, offset: int = 0) -> list:
         list: A list of dicts. IMPORTANT: Extract all 'ticker' values from this list 
               to pass to the next tool as a SINGLE space-separated string.
     """
-    bq_client = bigquery.Client(project="datascience-projects")
+    bq_client = get_bq_client("datascience-projects")
     query = f"""
         SELECT 
     map.ticker,
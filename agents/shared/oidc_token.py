@@ -0,0 +1,170 @@
+"""
+oidc_token.py — cached OIDC identity token for calling Cloud Run services.
+
+Identity tokens are JWTs valid for about an hour. Fetching one means a
+metadata-server round trip (on GCP) or forking `gcloud auth
+print-identity-token` (locally), which costs seconds per call. The
+provider decodes the token's `exp` claim, keeps the token in memory and
+only refreshes it REFRESH_MARGIN_SECONDS before it expires. Concurrent
+callers awaiting a refresh share the same in-flight fetch.
+
+This is the only copy. Local client scripts add agents/shared to sys.path;
+the job deploy scripts copy it into their build context before building.
+"""
+
+import json
+import time
+import base64
+import asyncio
+import threading
+import subprocess
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+METADATA_IDENTITY_URL = (
+    "http://metadata.google.internal/computeMetadata/v1/instance/service-accounts/default/identity"
+)
+REFRESH_MARGIN_SECONDS = 300   # refresh 5 minutes before `exp`
+FALLBACK_TTL_SECONDS = 300     # used when a token carries no readable `exp`
+METADATA_TIMEOUT = 5.0
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """Returns the JWT `exp` claim (epoch seconds) without verifying the signature."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class IdentityTokenProvider:
+    """
+    In-memory identity token cache with expiry-aware refresh.
+
+    • `use_metadata_server=True` tries the GCP metadata server first (Cloud
+      Run jobs) and falls back to the gcloud CLI; False goes straight to gcloud.
+    • get_token() is for asyncio callers, get_token_sync() for blocking ones.
+    """
+
+    def __init__(self, audience: Optional[str] = None, use_metadata_server: bool = True,
+                 refresh_margin: float = REFRESH_MARGIN_SECONDS):
+        self.audience = audience
+        self.use_metadata_server = use_metadata_server
+        self.refresh_margin = refresh_margin
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+        self._sync_lock = threading.Lock()
+
+    # -- cache -----------------------------------------------------------------
+    def _cached(self) -> Optional[str]:
+        if self._token and time.time() < self._expires_at - self.refresh_margin:
+            return self._token
+        return None
+
+    def _store(self, token: str) -> str:
+        self._token = token
+        self._expires_at = token_expiry(token) or (time.time() + FALLBACK_TTL_SECONDS)
+        return token
+
+    def invalidate(self) -> None:
+        """Drops the cached token, e.g. after the server answered 401."""
+        self._token = None
+        self._expires_at = 0.0
+
+    # -- async -----------------------------------------------------------------
+    async def get_token(self) -> str:
+        token = self._cached()
+        if token:
+            return token
+
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh())
+        # shield: one caller being cancelled must not cancel everyone's refresh
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh(self) -> str:
+        if self.use_metadata_server:
+            try:
+                async with httpx.AsyncClient() as client:
+                    response = await client.get(
+                        METADATA_IDENTITY_URL,
+                        headers={"Metadata-Flavor": "Google"},
+                        params={"audience": self.audience},
+                        timeout=METADATA_TIMEOUT,
+                    )
+                if response.status_code == 200:
+                    print("✅ [AUTH] Token successfully acquired via GCP Metadata Server.")
+                    return self._store(response.text.strip())
+            except Exception as e:
+                print(f"ℹ️ [AUTH] Metadata Server approach skipped or failed: {e}")
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "gcloud", "auth", "print-identity-token",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await proc.communicate()
+        except FileNotFoundError:
+            raise RuntimeError("gcloud command not found. Please ensure Google Cloud CLI is installed.")
+
+        if proc.returncode != 0:
+            raise RuntimeError(f"gcloud command failed: {stderr.decode().strip()}")
+        print("✅ [AUTH] Token successfully acquired via gcloud CLI.")
+        return self._store(stdout.decode().strip())
+
+    # -- sync ------------------------------------------------------------------
+    def get_token_sync(self) -> str:
+        token = self._cached()
+        if token:
+            return token
+
+        with self._sync_lock:
+            token = self._cached()  # another thread may have refreshed meanwhile
+            if token:
+                return token
+
+            if self.use_metadata_server:
+                try:
+                    response = httpx.get(
+                        METADATA_IDENTITY_URL,
+                        headers={"Metadata-Flavor": "Google"},
+                        params={"audience": self.audience},
+                        timeout=METADATA_TIMEOUT,
+                    )
+                    if response.status_code == 200:
+                        return self._store(response.text.strip())
+                except Exception as e:
+                    print(f"ℹ️ [AUTH] Metadata Server approach skipped or failed: {e}")
+
+            try:
+                result = subprocess.run(
+                    ["gcloud", "auth", "print-identity-token"],
+                    capture_output=True, text=True
+                )
+            except FileNotFoundError:
+                raise RuntimeError("gcloud command not found. Please ensure Google Cloud CLI is installed.")
+            if result.returncode != 0:
+                raise RuntimeError(f"gcloud command failed: {result.stderr.strip()}")
+            return self._store(result.stdout.strip())
+
+
+_PROVIDERS: Dict[Tuple[Optional[str], bool], IdentityTokenProvider] = {}
+_PROVIDERS_LOCK = threading.Lock()
+
+
+def get_token_provider(audience: Optional[str] = None,
+                       use_metadata_server: bool = True) -> IdentityTokenProvider:
+    """Process-wide provider per (audience, source) pair."""
+    key = (audience, use_metadata_server)
+    with _PROVIDERS_LOCK:
+        provider = _PROVIDERS.get(key)
+        if provider is None:
+            provider = IdentityTokenProvider(audience, use_metadata_server=use_metadata_server)
+            _PROVIDERS[key] = provider
+        return provider
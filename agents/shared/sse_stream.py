@@ -0,0 +1,134 @@
+"""
+sse_stream.py — incremental consumer for the ADK `/run_sse` endpoint.
+
+The server emits one `data: {json event}` block per agent event (tool calls,
+tool responses, partial text chunks, final responses). Instead of buffering
+the whole body and parsing only the last line, events are decoded as the
+bytes arrive, handed to a callback, and the request is closed as soon as
+the final response has been seen.
+
+This is the only copy; client scripts add agents/shared to sys.path.
+"""
+
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+EventCallback = Callable[[Dict[str, Any]], None]
+
+
+async def iter_sse_events(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yields each SSE event's JSON payload as soon as its terminating blank
+    line arrives. Multi-line `data:` fields are joined per the SSE spec;
+    comments and non-data fields are ignored, undecodable payloads skipped.
+    """
+    data_lines: List[str] = []
+
+    def _decode(lines: List[str]) -> Optional[Dict[str, Any]]:
+        payload = "\n".join(lines)
+        try:
+            event = json.loads(payload)
+        except json.JSONDecodeError:
+            print(f"⚠️ [SSE] Skipping undecodable event: {payload[:200]}")
+            return None
+        return event if isinstance(event, dict) else {"data": event}
+
+    async for line in response.aiter_lines():
+        if not line:
+            if data_lines:
+                event = _decode(data_lines)
+                data_lines = []
+                if event is not None:
+                    yield event
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+
+    if data_lines:
+        event = _decode(data_lines)
+        if event is not None:
+            yield event
+
+
+def _parts(event: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return (event.get("content") or {}).get("parts") or []
+
+
+def _function_call(part: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return part.get("functionCall") or part.get("function_call")
+
+
+def _function_response(part: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return part.get("functionResponse") or part.get("function_response")
+
+
+def event_text(event: Dict[str, Any]) -> str:
+    """Concatenated (non-thought) text parts of an event."""
+    return "".join(p.get("text") or "" for p in _parts(event) if not p.get("thought"))
+
+
+def is_final_response(event: Dict[str, Any]) -> bool:
+    """Same rule as ADK's Event.is_final_response(): complete text, no tool traffic."""
+    if event.get("partial"):
+        return False
+    parts = _parts(event)
+    if any(_function_call(p) or _function_response(p) for p in parts):
+        return False
+    return bool(event_text(event))
+
+
+def print_event(event: Dict[str, Any]) -> None:
+    """Default progress printer: tool calls/results and streamed text chunks."""
+    author = event.get("author", "agent")
+    for part in _parts(event):
+        call = _function_call(part)
+        if call:
+            print(f"\n🛠️  [{author}] → {call.get('name')}({json.dumps(call.get('args', {}))[:200]})", flush=True)
+        result = _function_response(part)
+        if result:
+            print(f"\n✅ [{author}] ← {result.get('name')}", flush=True)
+    if event.get("partial"):
+        print(event_text(event), end="", flush=True)
+    elif event_text(event) and not is_final_response(event):
+        print(f"\n💬 [{author}] {event_text(event)[:200]}", flush=True)
+
+
+async def stream_agent_run(
+    client: httpx.AsyncClient,
+    url: str,
+    run_data: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None,
+    on_event: Optional[EventCallback] = print_event,
+    final_author: Optional[str] = None
+) -> Optional[str]:
+    """
+    POSTs `run_data` to a /run_sse URL and consumes the event stream.
+
+    Every event goes to `on_event` as it arrives. Returns the text of the
+    last final response. With `final_author`, the stream is closed as soon
+    as that agent's final response arrives (the root agent of a sequential
+    pipeline); otherwise it is read until the server ends it.
+
+    Raises httpx.HTTPStatusError on non-2xx, RuntimeError on an error event.
+    """
+    final_text: Optional[str] = None
+    async with client.stream("POST", url, json=run_data, headers=headers) as response:
+        if response.is_error:
+            await response.aread()
+            response.raise_for_status()
+
+        async for event in iter_sse_events(response):
+            if "error" in event and "content" not in event:
+                raise RuntimeError(f"Agent run failed: {event['error']}")
+            if on_event is not None:
+                on_event(event)
+            if is_final_response(event):
+                final_text = event_text(event)
+                if final_author is not None and event.get("author") == final_author:
+                    break
+    return final_text
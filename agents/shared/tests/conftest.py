@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The shared helpers are flat modules, imported by file name like the clients do
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,70 @@
+import time
+import json
+import base64
+import asyncio
+
+import oidc_token
+from oidc_token import IdentityTokenProvider, token_expiry
+
+
+def _jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).rstrip(b"=").decode()
+    return f"header.{payload}.signature"
+
+
+class CountingProvider(IdentityTokenProvider):
+    """Replaces the network/gcloud fetch with a slow counted one."""
+
+    def __init__(self, lifetime, **kwargs):
+        super().__init__("https://svc", **kwargs)
+        self.lifetime = lifetime
+        self.fetches = 0
+
+    async def _refresh(self):
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        return self._store(_jwt(time.time() + self.lifetime))
+
+
+def test_token_expiry_reads_exp_claim():
+    assert token_expiry(_jwt(1700000000)) == 1700000000
+    assert token_expiry("not-a-jwt") is None
+
+
+def test_concurrent_callers_share_one_refresh_and_reuse_cache():
+    provider = CountingProvider(lifetime=3600)
+
+    async def scenario():
+        tokens = await asyncio.gather(*(provider.get_token() for _ in range(10)))
+        again = await provider.get_token()
+        return tokens, again
+
+    tokens, again = asyncio.run(scenario())
+    assert provider.fetches == 1
+    assert len(set(tokens)) == 1 and again == tokens[0]
+
+
+def test_token_is_refreshed_inside_the_margin():
+    provider = CountingProvider(lifetime=60, refresh_margin=oidc_token.REFRESH_MARGIN_SECONDS)
+
+    async def scenario():
+        await provider.get_token()
+        await provider.get_token()
+
+    asyncio.run(scenario())
+    assert provider.fetches == 2
+
+
+def test_sync_path_caches_gcloud_token(monkeypatch):
+    calls = []
+
+    class Result:
+        returncode = 0
+        stderr = ""
+        stdout = _jwt(time.time() + 3600) + "\n"
+
+    monkeypatch.setattr(oidc_token.subprocess, "run", lambda *a, **k: calls.append(a) or Result())
+    provider = IdentityTokenProvider("https://svc", use_metadata_server=False)
+
+    assert provider.get_token_sync() == provider.get_token_sync()
+    assert len(calls) == 1
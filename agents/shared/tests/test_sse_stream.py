@@ -0,0 +1,89 @@
+import json
+import asyncio
+
+import httpx
+import pytest
+
+import sse_stream
+from sse_stream import is_final_response, iter_sse_events, stream_agent_run
+
+
+def _sse(*events):
+    return [f"data: {json.dumps(e)}\n\n".encode() for e in events]
+
+
+TOOL_CALL = {"author": "NewsAnalyst", "content": {"parts": [{"functionCall": {"name": "get_news", "args": {}}}]}}
+TOOL_RESULT = {"author": "NewsAnalyst", "content": {"parts": [{"functionResponse": {"name": "get_news"}}]}}
+PARTIAL = {"author": "LeadQuantTrader", "partial": True, "content": {"parts": [{"text": "SHO"}]}}
+INTERMEDIATE = {"author": "NewsAnalyst", "content": {"parts": [{"text": "news done"}]}}
+FINAL = {"author": "LeadQuantTrader", "content": {"parts": [{"text": "SHORT ABC"}]}}
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Splits the body at awkward offsets and records how far it was read."""
+
+    def __init__(self, chunks):
+        self.body = b"".join(chunks)
+        self.sent = 0
+
+    async def __aiter__(self):
+        for i in range(0, len(self.body), 7):
+            self.sent = i + 7
+            yield self.body[i:i + 7]
+
+
+def _client(stream, status_code=200):
+    transport = httpx.MockTransport(lambda request: httpx.Response(status_code, stream=stream))
+    return httpx.AsyncClient(transport=transport)
+
+
+def test_final_response_rule():
+    assert is_final_response(FINAL)
+    assert not is_final_response(PARTIAL)
+    assert not is_final_response(TOOL_CALL)
+    assert not is_final_response(TOOL_RESULT)
+
+
+def test_events_are_parsed_incrementally_and_multiline_data_joined():
+    body = b": keep-alive\n\ndata: {\"a\":\ndata: 1}\n\nevent: x\ndata: [2]\n\ndata: not json\n\n"
+
+    async def scenario():
+        async with _client(ChunkedStream([body])) as client:
+            async with client.stream("POST", "http://svc/run_sse") as response:
+                return [e async for e in iter_sse_events(response)]
+
+    assert asyncio.run(scenario()) == [{"a": 1}, {"data": [2]}]
+
+
+def test_stream_surfaces_events_and_stops_at_final_author():
+    trailing = {"author": "LeadQuantTrader", "content": {"parts": [{"text": "x" * 5000}]}}
+    stream = ChunkedStream(_sse(TOOL_CALL, TOOL_RESULT, INTERMEDIATE, PARTIAL, FINAL, trailing))
+    seen = []
+
+    async def scenario():
+        async with _client(stream) as client:
+            return await stream_agent_run(client, "http://svc/run_sse", {}, on_event=seen.append,
+                                          final_author="LeadQuantTrader")
+
+    assert asyncio.run(scenario()) == "SHORT ABC"
+    assert seen == [TOOL_CALL, TOOL_RESULT, INTERMEDIATE, PARTIAL, FINAL]
+    assert stream.sent < len(stream.body)
+
+
+def test_without_final_author_last_final_response_wins():
+    async def scenario():
+        async with _client(ChunkedStream(_sse(INTERMEDIATE, FINAL))) as client:
+            return await stream_agent_run(client, "http://svc/run_sse", {}, on_event=None)
+
+    assert asyncio.run(scenario()) == "SHORT ABC"
+
+
+def test_error_event_and_http_error_raise():
+    async def scenario(stream, status_code=200):
+        async with _client(stream, status_code) as client:
+            return await stream_agent_run(client, "http://svc/run_sse", {}, on_event=None)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario(ChunkedStream(_sse({"error": "boom"}))))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(scenario(ChunkedStream([b"denied"]), status_code=403))
@@ -1,41 +1,147 @@
 import os
-from typing import List, Dict, Any
+import uuid
+import datetime
+from typing import List, Dict, Any, Iterable, Optional
+
 from google.cloud import bigquery
+from google.api_core.exceptions import NotFound
+
+try:
+    from .ct_stream import ChunkedBigQueryLoader
+except ImportError:  # Run as a flat script inside the jobs image
+    from ct_stream import ChunkedBigQueryLoader
 
 PROJECT_ID = os.environ.get("PROJECT_ID", "datascience-projects")
 DATASET_ID = "gcp_shareloader"
 TABLE_ID = "biotech_catalysts"
+TABLE_REF = f"{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}"
+
+# Declare structural type safe tracking fields
+CATALYST_SCHEMA = [
+    bigquery.SchemaField("scraped_at", "TIMESTAMP", mode="REQUIRED"),
+    bigquery.SchemaField("nct_id", "STRING", mode="REQUIRED"),
+    bigquery.SchemaField("sponsor", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("title", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("status", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("negative_reason", "STRING", mode="NULLABLE"),
+    bigquery.SchemaField("last_update", "DATE", mode="NULLABLE"),
+]
+CLUSTERING_FIELDS = ["nct_id"]
+STAGING_EXPIRATION = datetime.timedelta(hours=6)  # orphaned staging tables clean themselves up
+
+def log(msg: str):
+    """Helper formatting logger for consistent execution timestamps."""
+    print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}", flush=True)
+
+def ensure_catalyst_table(client: bigquery.Client, table_ref: str = TABLE_REF) -> bigquery.Table:
+    """
+    Creates the table partitioned by DAY(scraped_at) and clustered on nct_id
+    when missing; on an existing table, adds any new nullable columns.
+    """
+    try:
+        table = client.get_table(table_ref)
+    except NotFound:
+        table = bigquery.Table(table_ref, schema=CATALYST_SCHEMA)
+        table.time_partitioning = bigquery.TimePartitioning(
+            type_=bigquery.TimePartitioningType.DAY, field="scraped_at"
+        )
+        table.clustering_fields = CLUSTERING_FIELDS
+        log(f"🆕 [Storage] Creating partitioned table {table_ref}...")
+        return client.create_table(table, exists_ok=True)
+
+    existing = {field.name for field in table.schema}
+    missing = [field for field in CATALYST_SCHEMA if field.name not in existing]
+    if missing:
+        table.schema = list(table.schema) + missing
+        table = client.update_table(table, ["schema"])
+        log(f"🧱 [Storage] Added columns {[f.name for f in missing]} to {table_ref}")
+    if table.time_partitioning is None:
+        log(f"⚠️ [Storage] {table_ref} is not partitioned; see sql/migrate_biotech_catalysts.sql")
+    return table
+
+def create_staging_table(client: bigquery.Client, table_ref: str = TABLE_REF) -> str:
+    """A per-run staging table that expires on its own if a run dies mid-way."""
+    staging_ref = f"{table_ref}_staging_{uuid.uuid4().hex[:12]}"
+    table = bigquery.Table(staging_ref, schema=CATALYST_SCHEMA)
+    table.expires = datetime.datetime.now(datetime.timezone.utc) + STAGING_EXPIRATION
+    client.create_table(table)
+    return staging_ref
 
-def store_catalysts_in_bigquery(records: List[Dict[str, Any]]):
+def merge_staged_catalysts(client: bigquery.Client, staging_ref: str, table_ref: str = TABLE_REF) -> int:
     """
-    Appends the parsed catalyst records into your BigQuery dataset destination table.
+    Inserts staged rows whose (nct_id, status, last_update) is not in the table
+    yet. Duplicates inside the staging table collapse to their latest scrape.
+    Insert-only MERGEs do not conflict, so parallel shards can merge at once.
+    """
+    query = f"""
+    MERGE `{table_ref}` T
+    USING (
+      SELECT * EXCEPT(rn) FROM (
+        SELECT *, ROW_NUMBER() OVER (
+          PARTITION BY nct_id, status, last_update ORDER BY scraped_at DESC
+        ) AS rn
+        FROM `{staging_ref}`
+      )
+      WHERE rn = 1
+    ) S
+    ON T.nct_id = S.nct_id
+       AND T.status IS NOT DISTINCT FROM S.status
+       AND T.last_update IS NOT DISTINCT FROM S.last_update
+    WHEN NOT MATCHED THEN
+      INSERT (scraped_at, nct_id, sponsor, title, status, negative_reason, last_update)
+      VALUES (scraped_at, nct_id, sponsor, title, status, negative_reason, last_update)
+    """
+    job = client.query(query)
+    job.result()
+    inserted = job.num_dml_affected_rows or 0
+    log(f"🔀 [Storage] MERGE inserted {inserted} new rows into {table_ref}.")
+    return inserted
+
+def upsert_catalyst_stream(records: Iterable[Dict[str, Any]], client: Optional[bigquery.Client] = None,
+                           table_ref: str = TABLE_REF) -> int:
+    """
+    Streams records into a private staging table in bounded load chunks and
+    MERGEs them once everything landed. If extraction or any chunk fails,
+    nothing reaches the destination table and the error propagates.
+    Returns the number of newly inserted rows.
+    """
+    client = client or bigquery.Client(project=PROJECT_ID)
+    staging_ref = create_staging_table(client, table_ref)
+    try:
+        loader = ChunkedBigQueryLoader(staging_ref, CATALYST_SCHEMA, PROJECT_ID, client=client)
+        try:
+            loader.extend(records)
+        finally:
+            loader.close()
+        if loader.failed_chunks:
+            raise RuntimeError(f"{loader.failed_chunks} staging chunk(s) failed for {staging_ref}")
+        if loader.rows_sent == 0:
+            log("⚠️ [Storage] No new records found to merge.")
+            return 0
+        return merge_staged_catalysts(client, staging_ref, table_ref)
+    finally:
+        client.delete_table(staging_ref, not_found_ok=True)
+
+def store_catalysts_in_bigquery(records: List[Dict[str, Any]], client: Optional[bigquery.Client] = None) -> int:
+    """
+    Upserts parsed catalyst records: staged load, then an insert-only MERGE
+    into the destination table, so overlapping runs never duplicate rows.
     """
     if not records:
-        print("⚠️ [Storage] No records provided to append. Aborting BigQuery call.")
-        return
-        
-    client = bigquery.Client(project=PROJECT_ID)
-    table_ref = f"{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}"
-    
-    # Declare structural type safe tracking fields 
-    schema = [
-        bigquery.SchemaField("scraped_at", "TIMESTAMP"),
-        bigquery.SchemaField("nct_id", "STRING"),
-        bigquery.SchemaField("sponsor", "STRING"),
-        bigquery.SchemaField("title", "STRING"),
-        bigquery.SchemaField("status", "STRING"),
-        bigquery.SchemaField("negative_reason", "STRING", mode="NULLABLE"),
-    ]
-    
-    job_config = bigquery.LoadJobConfig(
-        schema=schema,
-        write_disposition="WRITE_APPEND"
-    )
-    
-    print(f"📦 [Storage] Upserting {len(records)} records to {table_ref}...")
+        log("⚠️ [Storage] No records provided to append. Aborting BigQuery call.")
+        return 0
+
+    client = client or bigquery.Client(project=PROJECT_ID)
+    ensure_catalyst_table(client)
+    staging_ref = create_staging_table(client)
+
+    log(f"📦 [Storage] Staging {len(records)} records in {staging_ref}...")
     try:
-        job = client.load_table_from_json(records, table_ref, job_config=job_config)
-        job.result()  # Blocks until execution thread completes
-        print("✅ [Storage Complete] BigQuery write transaction succeeded.")
+        job_config = bigquery.LoadJobConfig(schema=CATALYST_SCHEMA, write_disposition="WRITE_TRUNCATE")
+        client.load_table_from_json(records, staging_ref, job_config=job_config).result()
+        return merge_staged_catalysts(client, staging_ref)
     except Exception as e:
-        print(f"❌ [Storage Error] Failed writing data payloads to BigQuery: {e}")
\ No newline at end of file
+        log(f"❌ [Storage Error] Failed upserting catalyst records: {e}")
+        return 0
+    finally:
+        client.delete_table(staging_ref, not_found_ok=True)
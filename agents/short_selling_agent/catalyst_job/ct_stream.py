@@ -0,0 +1,156 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from google.cloud import bigquery
+
+# --- Configuration Mapping ---
+CT_API_URL = "https://clinicaltrials.gov/api/v2/studies"
+PAGE_SIZE = 100
+REQUEST_TIMEOUT = 60          # seconds per page request
+LOAD_CHUNK_ROWS = 5000        # rows per BigQuery load job
+
+class ClinicalTrialsError(RuntimeError):
+    """Raised in strict mode when the API rejects a page request."""
+
+def log(msg: str):
+    """Helper formatting logger for consistent execution timestamps."""
+    print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}", flush=True)
+
+def parse_ct_date(value: Optional[str]) -> Optional[str]:
+    """Normalizes ClinicalTrials.gov YYYY-MM-DD / YYYY-MM / YYYY dates to YYYY-MM-DD."""
+    for fmt in ("%Y-%m-%d", "%Y-%m", "%Y"):
+        try:
+            return datetime.datetime.strptime(value or "", fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+def new_session() -> requests.Session:
+    """One keep-alive session for every page of a run."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=3))
+    return session
+
+def iter_study_pages(params: Dict[str, Any], session: Optional[requests.Session] = None,
+                     strict: bool = False) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yields the `studies` list of each ClinicalTrials.gov v2 page.
+
+    While the caller works on page N, page N+1 is already being fetched on a
+    background thread (one request in flight at a time, same session).
+    Stops on the last page, an empty page or a non-200 response; with
+    `strict`, a non-200 raises ClinicalTrialsError instead.
+    """
+    own_session = session is None
+    session = session or new_session()
+    base_params = {**params, "pageSize": params.get("pageSize", PAGE_SIZE)}
+    base_params.pop("pageToken", None)
+
+    def fetch(page_token: Optional[str]) -> Optional[Dict[str, Any]]:
+        page_params = dict(base_params)
+        if page_token:
+            page_params["pageToken"] = page_token
+        response = session.get(CT_API_URL, params=page_params, timeout=REQUEST_TIMEOUT)
+        if response.status_code != 200:
+            log(f"❌ [Download Error] API Request Rejected ({response.status_code}): {response.text}")
+            if strict:
+                raise ClinicalTrialsError(f"HTTP {response.status_code}: {response.text[:200]}")
+            return None
+        return response.json()
+
+    page_count = 0
+    try:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ct-prefetch") as prefetcher:
+            pending = prefetcher.submit(fetch, None)
+            while pending is not None:
+                payload = pending.result()
+                if payload is None:
+                    break
+                page_count += 1
+                studies = payload.get("studies", [])
+                next_page_token = payload.get("nextPageToken")
+
+                # Kick off the next request before handing this page to the caller
+                pending = prefetcher.submit(fetch, next_page_token) if next_page_token and studies else None
+                log(f"   🔄 Page {page_count}: {len(studies)} studies")
+                if studies:
+                    yield studies
+    finally:
+        if own_session:
+            session.close()
+
+def iter_parsed_studies(
+    params: Dict[str, Any],
+    parse_study: Callable[[Dict[str, Any]], Dict[str, Any]],
+    session: Optional[requests.Session] = None,
+    strict: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Flattens iter_study_pages into parsed rows, one page in memory at a time."""
+    for studies in iter_study_pages(params, session=session, strict=strict):
+        for study in studies:
+            yield parse_study(study)
+
+class ChunkedBigQueryLoader:
+    """
+    Buffers rows and appends them to BigQuery in bounded load jobs.
+
+    Each full chunk is uploaded as soon as it fills; the jobs run server-side
+    while extraction continues and are all awaited in close(). Memory is
+    bounded by one chunk, not by the size of the backfill.
+    """
+
+    def __init__(self, table_ref: str, schema: List[bigquery.SchemaField], project: str,
+                 chunk_rows: int = LOAD_CHUNK_ROWS, client: Optional[bigquery.Client] = None):
+        self.table_ref = table_ref
+        self.chunk_rows = max(1, chunk_rows)
+        self.client = client or bigquery.Client(project=project)
+        self.job_config = bigquery.LoadJobConfig(schema=schema, write_disposition="WRITE_APPEND")
+        self._buffer: List[Dict[str, Any]] = []
+        self._jobs = []
+        self.rows_sent = 0
+        self.failed_chunks = 0
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(record)
+        if len(self._buffer) >= self.chunk_rows:
+            self.flush()
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.add(record)
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        chunk, self._buffer = self._buffer, []
+        log(f"📦 [Storage] Uploading chunk of {len(chunk)} rows to {self.table_ref}...")
+        try:
+            job = self.client.load_table_from_json(chunk, self.table_ref, job_config=self.job_config)
+        except Exception as e:
+            log(f"❌ [Storage Error] Failed to upload chunk to {self.table_ref}: {e}")
+            self.failed_chunks += 1
+            return
+        self._jobs.append((job, len(chunk)))
+        self.rows_sent += len(chunk)
+
+    def close(self) -> int:
+        """Flushes the tail chunk and waits for every load job; returns rows loaded."""
+        self.flush()
+        loaded, failed = 0, 0
+        for job, n_rows in self._jobs:
+            try:
+                job.result()
+                loaded += n_rows
+            except Exception as e:
+                failed += 1
+                log(f"❌ [Storage Error] Load job failed for {self.table_ref}: {e}")
+        self._jobs = []
+        self.failed_chunks += failed
+        if failed:
+            log(f"⚠️ [Storage] {failed} load job(s) failed; {loaded}/{self.rows_sent} rows committed.")
+        else:
+            log(f"✨ [Storage Complete] {loaded} rows committed to {self.table_ref}.")
+        return loaded
@@ -1,18 +1,27 @@
 import os
-import requests
+import json
 import datetime
 import argparse
-from typing import List, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import requests
 from google.cloud import bigquery
 
+try:
+    from .ct_stream import iter_parsed_studies, log, new_session, parse_ct_date
+    from . import catalyst_storage
+except ImportError:  # Run as a flat script inside the jobs image
+    from ct_stream import iter_parsed_studies, log, new_session, parse_ct_date
+    import catalyst_storage
+
 # --- Configuration Mapping ---
-PROJECT_ID = os.environ.get("PROJECT_ID", "datascience-projects")
-DATASET_ID = "gcp_shareloader"
-TABLE_ID = "biotech_catalysts"
+PROJECT_ID = catalyst_storage.PROJECT_ID
 
-def log(msg: str):
-    """Helper formatting logger for consistent execution timestamps."""
-    print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}", flush=True)
+DEFAULT_SHARD = "month"
+DEFAULT_WORKERS = 4  # ClinicalTrials.gov throttles aggressive clients; keep this modest
+DEFAULT_MANIFEST = "catalyst_backfill_manifest.json"
 
 def validate_date(date_string: str) -> str:
     """Validates that the CLI input matches YYYY-MM-DD format."""
@@ -24,160 +33,229 @@ def validate_date(date_string: str) -> str:
             f"Invalid date format: '{date_string}'. Must be in YYYY-MM-DD format."
         )
 
-def download_historical_catalysts(start_date: str, end_date: str) -> List[Dict[str, Any]]:
+def _record_timestamp(api_update_date: Optional[str]) -> str:
+    """Safely parse complete or partial API date strings."""
+    if api_update_date:
+        try:
+            # Case 1: Standard full date (YYYY-MM-DD)
+            if len(api_update_date) == 10:
+                dt = datetime.datetime.strptime(api_update_date, "%Y-%m-%d")
+            # Case 2: Partial month precision (YYYY-MM)
+            elif len(api_update_date) == 7:
+                dt = datetime.datetime.strptime(api_update_date, "%Y-%m")
+            # Case 3: Partial year precision (YYYY)
+            elif len(api_update_date) == 4:
+                dt = datetime.datetime.strptime(api_update_date, "%Y")
+            else:
+                dt = datetime.datetime.utcnow()
+            return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+        except Exception:
+            pass
+    return datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+
+def _parse_study(study: Dict[str, Any]) -> Dict[str, Any]:
+    protocol = study.get("protocolSection", {})
+    id_info = protocol.get("identificationModule", {})
+    status_info = protocol.get("statusModule", {})
+    sponsor_info = protocol.get("sponsorCollaboratorsModule", {})
+
+    api_update_date = status_info.get("lastUpdatePostDateStruct", {}).get("date")
+    return {
+        "scraped_at": _record_timestamp(api_update_date),
+        "nct_id": id_info.get("nctId"),
+        "sponsor": sponsor_info.get("leadSponsor", {}).get("name"),
+        "title": id_info.get("briefTitle"),
+        "status": status_info.get("overallStatus"),
+        "negative_reason": status_info.get("whyStopped", None),
+        "last_update": parse_ct_date(api_update_date)
+    }
+
+def iter_historical_catalysts(start_date: str, end_date: str,
+                              session: Optional[requests.Session] = None,
+                              strict: bool = False) -> Iterator[Dict[str, Any]]:
     """
-    Queries the ClinicalTrials.gov v2 API for interventional trials 
-    modified within an explicit historical range window.
+    Streams Phase 2/3 industry-sponsored interventional trials modified within
+    an explicit historical range window, one prefetched page at a time.
     """
-    url = "https://clinicaltrials.gov/api/v2/studies"
-    
     log(f"⏳ [Download] Scanning historical updates from {start_date} to {end_date}...")
-    ## We use the exact RANGE syntax matching your daily framework configuration
-    
+
     params = {
         # Combine the phase, study type, and industry sponsor type all into the main query term
         "query.term": "AREA[StudyType]Interventional AND (AREA[Phase]Phase 2 OR AREA[Phase]Phase 3) AND AREA[LeadSponsorClass]INDUSTRY",
-        
+
         # Keep the advanced filter strictly for your historical date range
         "filter.advanced": f"AREA[LastUpdatePostDate]RANGE[{start_date}, {end_date}]",
-        
+
         "pageSize": 100
     }
-    
-    parsed_records = []
-    next_page_token = None
-    page_count = 0
-    
-    while True:
-        page_count += 1
-        if next_page_token:
-            # CHANGE THIS LINE: Key must be "pageToken", value is next_page_token
-            params["pageToken"] = next_page_token
-        else:
-            params.pop("pageToken", None)    
-                
-        log(f"   🔄 Fetching page {page_count}...")
-        response = requests.get(url, params=params)
-        if response.status_code != 200:
-            log(f"❌ [Download Error] API Request Rejected ({response.status_code}): {response.text}")
-            break
-            
-        payload = response.json()
-        studies = payload.get("studies", [])
-        
-        for study in studies:
-            protocol = study.get("protocolSection", {})
-            id_info = protocol.get("identificationModule", {})
-            status_info = protocol.get("statusModule", {})
-            sponsor_info = protocol.get("sponsorCollaboratorsModule", {})
-            
-            nct_id = id_info.get("nctId")
-            brief_title = id_info.get("briefTitle")
-            overall_status = status_info.get("overallStatus")
-            why_stopped = status_info.get("whyStopped", None)
-            sponsor = sponsor_info.get("leadSponsor", {}).get("name")
-            
-            # --- BULLETPROOF FIX: Safely parse complete or partial API date strings ---
-            api_update_date = status_info.get("lastUpdatePostDateStruct", {}).get("date")
-            record_timestamp = None
-            
-            if api_update_date:
-                try:
-                    # Case 1: Standard full date (YYYY-MM-DD)
-                    if len(api_update_date) == 10:
-                        dt = datetime.datetime.strptime(api_update_date, "%Y-%m-%d")
-                    # Case 2: Partial month precision (YYYY-MM)
-                    elif len(api_update_date) == 7:
-                        dt = datetime.datetime.strptime(api_update_date, "%Y-%m")
-                    # Case 3: Partial year precision (YYYY)
-                    elif len(api_update_date) == 4:
-                        dt = datetime.datetime.strptime(api_update_date, "%Y")
-                    else:
-                        dt = datetime.datetime.utcnow()
-                    
-                    record_timestamp = dt.strftime("%Y-%m-%d %H:%M:%S UTC")
-                except Exception:
-                    record_timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-            else:
-                record_timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-            
-            # --- SINGLE CLEAN INGESTION APPEND ---
-            parsed_records.append({
-                "scraped_at": record_timestamp,
-                "nct_id": nct_id,
-                "sponsor": sponsor,
-                "title": brief_title,
-                "status": overall_status,
-                "negative_reason": why_stopped
-            })
-            
-
-        next_page_token = payload.get("nextPageToken")
-        if not next_page_token or not studies:
-            break
-            
-    log(f"✅ [Download Complete] Extracted {len(parsed_records)} raw records over {page_count} pages.")
+    return iter_parsed_studies(params, _parse_study, session=session, strict=strict)
+
+def download_historical_catalysts(start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    """
+    Queries the ClinicalTrials.gov v2 API for interventional trials
+    modified within an explicit historical range window.
+    """
+    parsed_records = list(iter_historical_catalysts(start_date, end_date))
+    log(f"✅ [Download Complete] Extracted {len(parsed_records)} raw records.")
     return parsed_records
 
 def store_catalysts_in_bigquery(records: List[Dict[str, Any]]):
     """
-    Appends the parsed rows directly to the daily-partitioned BigQuery table.
+    Upserts the parsed rows into the partitioned BigQuery table (staged load + MERGE).
     """
-    if not records:
-        log("⚠️ [Storage] No new records found to append. Skipping BigQuery ingestion.")
-        return
-        
-    client = bigquery.Client(project=PROJECT_ID)
-    table_ref = f"{PROJECT_ID}.{DATASET_ID}.{TABLE_ID}"
-    
-    schema = [
-        bigquery.SchemaField("scraped_at", "TIMESTAMP", mode="REQUIRED"),
-        bigquery.SchemaField("nct_id", "STRING", mode="REQUIRED"),
-        bigquery.SchemaField("sponsor", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("title", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("status", "STRING", mode="NULLABLE"),
-        bigquery.SchemaField("negative_reason", "STRING", mode="NULLABLE"),
-    ]
-    
-    job_config = bigquery.LoadJobConfig(
-        schema=schema,
-        write_disposition="WRITE_APPEND"
-    )
-    
-    log(f"📦 [Storage] Committing {len(records)} data payloads to BigQuery table: {table_ref}...")
+    return catalyst_storage.store_catalysts_in_bigquery(records)
+
+def split_date_range(start_date: str, end_date: str, shard: str = DEFAULT_SHARD) -> List[Tuple[str, str]]:
+    """
+    Splits an inclusive [start_date, end_date] range into non-overlapping,
+    inclusive week or calendar-month shards.
+    """
+    start = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.datetime.strptime(end_date, "%Y-%m-%d").date()
+    if shard not in ("week", "month"):
+        raise ValueError(f"shard must be 'week' or 'month', got {shard!r}")
+
+    shards = []
+    current = start
+    while current <= end:
+        if shard == "week":
+            shard_end = current + datetime.timedelta(days=6)
+        else:
+            next_month = (current.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+            shard_end = next_month - datetime.timedelta(days=1)
+        shard_end = min(shard_end, end)
+        shards.append((current.strftime("%Y-%m-%d"), shard_end.strftime("%Y-%m-%d")))
+        current = shard_end + datetime.timedelta(days=1)
+    return shards
+
+class ShardManifest:
+    """
+    Local JSON checkpoint of completed shards, rewritten atomically after each
+    one so a crashed or killed backfill resumes from the first missing shard.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._done = json.load(f).get("completed", {})
+
+    @staticmethod
+    def key(shard: Tuple[str, str]) -> str:
+        return f"{shard[0]}..{shard[1]}"
+
+    def is_done(self, shard: Tuple[str, str]) -> bool:
+        return self.key(shard) in self._done
+
+    def mark_done(self, shard: Tuple[str, str], rows: int) -> None:
+        with self._lock:
+            self._done[self.key(shard)] = {
+                "rows": rows,
+                "completed_at": datetime.datetime.utcnow().isoformat(),
+            }
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"completed": self._done}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+    def total_rows(self, shards: List[Tuple[str, str]]) -> int:
+        return sum(self._done.get(self.key(s), {}).get("rows", 0) for s in shards)
+
+def run_shard(shard: Tuple[str, str], client: Optional[bigquery.Client] = None) -> int:
+    """
+    Extracts one shard with its own session into a private staging table and
+    MERGEs it. Raises if any page or load chunk failed; in that case nothing
+    was merged and the shard is not checkpointed, so a retry is clean.
+    Returns the number of newly inserted rows.
+    """
+    session = new_session()
     try:
-        job = client.load_table_from_json(records, table_ref, job_config=job_config)
-        job.result()  
-        log("✨ [Storage Complete] Database write transaction succeeded.")
-    except Exception as e:
-        log(f"❌ [Storage Error] Failed to write data to BigQuery: {e}")
-
-def run_historical_pipeline(start_date: str, end_date: str):
-    """Orchestrates the historical data extraction pipeline flow sequentially."""
+        return catalyst_storage.upsert_catalyst_stream(
+            iter_historical_catalysts(shard[0], shard[1], session=session, strict=True),
+            client=client,
+        )
+    finally:
+        session.close()
+
+def run_historical_pipeline(start_date: str, end_date: str, shard: str = DEFAULT_SHARD,
+                            workers: int = DEFAULT_WORKERS, manifest_path: str = DEFAULT_MANIFEST):
+    """
+    Splits the range into shards and backfills them in parallel, streaming each
+    into chunked BigQuery loads. Completed shards are checkpointed to the
+    manifest and skipped when the same command is re-run.
+    """
     log(f"🚀 Starting Historical Biotech Catalyst Backfill Pipeline [{start_date} to {end_date}]...")
-    
-    # Step 1: Extract
-    extracted_data = download_historical_catalysts(start_date=start_date, end_date=end_date)
-    
-    # Step 2: Load
-    store_catalysts_in_bigquery(extracted_data)
-    
+
+    shards = split_date_range(start_date, end_date, shard)
+    manifest = ShardManifest(manifest_path)
+    pending = [s for s in shards if not manifest.is_done(s)]
+    log(f"🧩 {len(shards)} {shard} shards, {len(shards) - len(pending)} already done, "
+        f"{len(pending)} to run with {workers} workers (manifest: {manifest_path})")
+
+    failed = []
+    if pending:
+        client = bigquery.Client(project=PROJECT_ID)  # thread-safe; shared by every shard's loader
+        catalyst_storage.ensure_catalyst_table(client)
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ct-shard") as pool:
+            futures = {pool.submit(run_shard, s, client): s for s in pending}
+            for future in as_completed(futures):
+                s = futures[future]
+                try:
+                    rows = future.result()
+                    manifest.mark_done(s, rows)
+                    log(f"✅ [Shard {s[0]}..{s[1]}] {rows} new rows merged")
+                except Exception as e:
+                    failed.append(s)
+                    log(f"❌ [Shard {s[0]}..{s[1]}] failed, will retry on next run: {e}")
+
+    log(f"📊 Backfill total: {manifest.total_rows(shards)} rows across "
+        f"{len(shards) - len(failed)}/{len(shards)} completed shards.")
+    if failed:
+        log(f"⚠️ {len(failed)} shard(s) incomplete; re-run the same command to resume.")
     log("🏁 Historical batch pipeline execution finished.")
+    return not failed
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Biotech Catalyst Historical Backfill Engine")
     parser.add_argument(
-        "--start-date", 
+        "--start-date",
         type=validate_date,
-        required=True, 
+        required=True,
         help="The start execution date in YYYY-MM-DD format"
     )
     parser.add_argument(
-        "--end-date", 
+        "--end-date",
         type=validate_date,
-        required=True, 
+        required=True,
         help="The end execution date in YYYY-MM-DD format"
     )
-    
+
+    parser.add_argument(
+        "--shard",
+        choices=["week", "month"],
+        default=DEFAULT_SHARD,
+        help="Shard size for parallel extraction (Default: month)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of shards to run concurrently (Default: 4)"
+    )
+    parser.add_argument(
+        "--manifest",
+        default=DEFAULT_MANIFEST,
+        help="Local checkpoint file of completed shards"
+    )
+
     args = parser.parse_args()
-    run_historical_pipeline(start_date=args.start_date, end_date=args.end_date)
\ No newline at end of file
+    ok = run_historical_pipeline(
+        start_date=args.start_date,
+        end_date=args.end_date,
+        shard=args.shard,
+        workers=args.workers,
+        manifest_path=args.manifest,
+    )
+    raise SystemExit(0 if ok else 1)
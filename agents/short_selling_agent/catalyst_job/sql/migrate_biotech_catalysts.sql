@@ -0,0 +1,46 @@
+-- One-off migration: rebuild biotech_catalysts as a deduplicated,
+-- partitioned + clustered table matching catalyst_storage.CATALYST_SCHEMA.
+-- Run once in the BigQuery console, check the row counts, then swap the names.
+
+-- 1) Build the new table. Legacy rows were appended on every scrape and carry
+--    no ClinicalTrials.gov last_update, so keep only the latest row per
+--    (nct_id, status) and leave last_update NULL. Faking it from scraped_at
+--    would never match the dates the MERGE inserts, and every trial would be
+--    duplicated again on the next sync.
+CREATE TABLE `datascience-projects.gcp_shareloader.biotech_catalysts_v2`
+PARTITION BY DATE(scraped_at)
+CLUSTER BY nct_id
+AS
+SELECT * EXCEPT(rn)
+FROM (
+  SELECT
+    scraped_at,
+    nct_id,
+    sponsor,
+    title,
+    status,
+    negative_reason,
+    CAST(NULL AS DATE) AS last_update,
+    ROW_NUMBER() OVER (
+      PARTITION BY nct_id, status
+      ORDER BY scraped_at DESC
+    ) AS rn
+  FROM `datascience-projects.gcp_shareloader.biotech_catalysts`
+)
+WHERE rn = 1;
+
+-- 2) Swap (after verifying biotech_catalysts_v2):
+-- ALTER TABLE `datascience-projects.gcp_shareloader.biotech_catalysts` RENAME TO biotech_catalysts_legacy;
+-- ALTER TABLE `datascience-projects.gcp_shareloader.biotech_catalysts_v2` RENAME TO biotech_catalysts;
+
+-- 3) After the first sync / historical backfill has MERGEd rows with real
+--    last_update dates, retire the legacy rows those supersede:
+-- DELETE FROM `datascience-projects.gcp_shareloader.biotech_catalysts` T
+-- WHERE T.last_update IS NULL
+--   AND EXISTS (
+--     SELECT 1
+--     FROM `datascience-projects.gcp_shareloader.biotech_catalysts` N
+--     WHERE N.nct_id = T.nct_id
+--       AND N.status = T.status
+--       AND N.last_update IS NOT NULL
+--   );
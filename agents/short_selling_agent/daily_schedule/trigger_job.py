@@ -2,11 +2,17 @@ import os
 import json
 import subprocess
 import asyncio
-from typing import Dict, Any, List
-from datetime import datetime
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
 import httpx 
 import sys
+import argparse
 from google.cloud import bigquery
+
+# Shared helpers have a single source in agents/shared; the deploy script copies
+# them into the job image, this path only matters when running from the repo.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from oidc_token import get_token_provider
 import os
 import smtplib
 from email.mime.multipart import MIMEMultipart
@@ -20,6 +26,8 @@ APP_URL = os.environ.get("AGENT_SERVICE_URL", "https://short-selling-agent-servi
 USER_ID = "automated_cron_job"
 SESSION_ID = f"session_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}" 
 APP_NAME = "short_selling_agent"
+# Concurrent agent sessions in batch mode (each one is a full pipeline run on the service)
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("TRIGGER_MAX_CONCURRENCY", "3"))
 
 # BigQuery Destination Schema Configuration
 PROJECT_ID = "datascience-projects"
@@ -181,37 +189,9 @@ def send_summary_email(rows_inserted: List[Dict[str, Any]]):
 # --- Authentication Function (ASYNC) ---
 
 async def get_auth_token() -> str:
-    """Retrieves an OIDC Identity Token."""
-    print("🔑 [AUTH] Attempting to acquire OIDC token...")
-    try:
-        async with httpx.AsyncClient() as client:
-            metadata_url = "http://metadata.google.internal/computeMetadata/v1/instance/service-accounts/default/identity"
-            headers = {"Metadata-Flavor": "Google"}
-            params = {"audience": APP_URL}
-            
-            response = await client.get(metadata_url, headers=headers, params=params, timeout=5.0)
-            if response.status_code == 200:
-                print("✅ [AUTH] Token successfully acquired via GCP Metadata Server.")
-                return response.text.strip()
-    except Exception as e:
-        print(f"ℹ️ [AUTH] Metadata Server approach skipped or failed: {e}")
+    """Returns the OIDC Identity Token, cached in memory and refreshed shortly before it expires."""
+    return await get_token_provider(APP_URL).get_token()
 
-    try:
-        print("ℹ️ [AUTH] Falling back to local gcloud CLI token extraction...")
-        proc = await asyncio.create_subprocess_exec(
-            "gcloud", "auth", "print-identity-token",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
-        
-        if proc.returncode != 0:
-            raise RuntimeError(f"gcloud command failed: {stderr.decode().strip()}")
-            
-        print("✅ [AUTH] Token successfully acquired via gcloud CLI fallback.")
-        return stdout.decode().strip()
-    except FileNotFoundError:
-        raise RuntimeError("gcloud command not found. Please ensure Google Cloud CLI is installed.")
 
 # --- API Interaction Functions (ASYNC) ---
 
@@ -237,6 +217,8 @@ async def make_request(client: httpx.AsyncClient, method: str, endpoint: str, da
         response.raise_for_status() 
         return response
     except httpx.HTTPStatusError as errh:
+        if errh.response.status_code == 401:
+            get_token_provider(APP_URL).invalidate()
         print(f"\n❌ **HTTP ERROR:** Status {response.status_code} for {url}")
         print(f"❌ **Server Response (Raw text layout):**\n{response.text}")
         raise
@@ -292,168 +274,218 @@ async def run_agent_request(client: httpx.AsyncClient, session_id: str, message:
     print("==============================================================================\n")
     return final_text
 
+# --- Result Parsing & Persistence ---
+
+def parse_agent_rows(agent_text: str) -> List[Dict[str, Any]]:
+    """Strips Markdown fences and returns the decision rows from the agent's JSON answer."""
+    clean_text = agent_text.strip()
+    if clean_text.startswith("```"):
+        print("✂️ [PARSING] Detected Markdown block fences. Stripping wrappers out...")
+        lines = clean_text.splitlines()
+        if lines[0].startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].startswith("```"):
+            lines = lines[:-1]
+        clean_text = "\n".join(lines).strip()
+
+    try:
+        print("🔍 [PARSING] Attempting to deserialize clean text block into JSON...")
+        parsed_json = json.loads(clean_text)
+    except json.JSONDecodeError as decode_error:
+        print("\n🚨 ==================== 💥 JSON PARSE ERROR OCCURRED ====================")
+        print(f"Message: Agent did not output a cleanly parsable JSON data block schema structure.")
+        print(f"Exception Track: {decode_error}")
+        print(f"--- RAW BLOCK INGESTION STRIPPED SOURCE ---\n{clean_text}")
+        print("============================================================================\n")
+        return []
+
+    if isinstance(parsed_json, dict) and "final_decisions" in parsed_json:
+        print("📂 [PARSING] Detected 'final_decisions' nesting key object. Slicing inner array data...")
+        raw_rows = parsed_json["final_decisions"]
+    else:
+        raw_rows = parsed_json if isinstance(parsed_json, list) else [parsed_json]
+
+    print(f"📊 [PARSING] Discovered {len(raw_rows)} individual target asset evaluation rows inside data payload.")
+    return [row for row in raw_rows if isinstance(row, dict)]
+
+
+def fetch_plus500_tickers(tickers: List[str]) -> set:
+    """Defensive Plus500 eligibility lookup; any failure degrades to an empty set."""
+    if not tickers:
+        return set()
+    try:
+        print("🔍 [BIGQUERY] Performing defensive Plus500 eligibility validation check...")
+        bq_client = bigquery.Client(project=PROJECT_ID)
+        # Cross reference tickers against your database shortable table
+        query = f"""
+            SELECT UPPER(ticker) as ticker 
+            FROM `datascience-projects.gcp_shareloader.plus500`
+            WHERE UPPER(ticker) IN UNNEST(@tickers) AND is_available = TRUE
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ArrayQueryParameter("tickers", "STRING", tickers)
+            ]
+        )
+        results = bq_client.query(query, job_config=job_config).result(timeout=20.0) # Defensive timeout configuration
+        plus500_shortable_tickers = {row.ticker for row in results}
+        print(f"✅ [BIGQUERY] Plus500 check succeeded. Verified count: {len(plus500_shortable_tickers)}")
+        return plus500_shortable_tickers
+    except Exception as plus500_err:
+        # If this lookup fails, we swallow the error, output logs, and default to empty (assumed not plus500)
+        print(f"⚠️ [BIGQUERY] Intermittent Plus500 query lookup failure: {plus500_err}.")
+        print("ℹ️ [FALLBACK] Continuing execution loop. Defaulting tickers to 'Not Plus500 Available'.")
+        return set()
+
+
+def compile_rows(raw_rows: List[Dict[str, Any]], run_date: str, timestamp_now: str) -> List[Dict[str, Any]]:
+    """Maps agent decision rows onto the daily_recommendations schema."""
+    compiled = []
+    for row in raw_rows:
+        compiled.append({
+            "evaluation_date": row.get("evaluation_date", run_date),
+            "ticker": str(row.get("ticker", "")).upper(),
+            "conviction_score": int(row.get("conviction_score", 3)),
+            "action": str(row.get("action", "WATCH")).upper(),
+            "reasoning": row.get("reasoning", None),
+            "inserted_at": timestamp_now
+            # You can explicitly map "is_plus500" here if your bigquery schema has the column!
+        })
+    return compiled
+
+
+def insert_recommendations(rows_to_insert: List[Dict[str, Any]]) -> bool:
+    """Single streaming insert for every compiled row of the run."""
+    print(f"📤 [BIGQUERY] Broadcasting packet chunk array ({len(rows_to_insert)} items) to {TABLE_REF}...")
+    bq_client = bigquery.Client(project=PROJECT_ID)
+    errors = bq_client.insert_rows_json(TABLE_REF, rows_to_insert)
+    if errors:
+        print("\n❌ ==================== 🔥 BIGQUERY INSERT ERRORS OCCURRED ====================")
+        print(json.dumps(errors, indent=2))
+        print("=================================================================================\n")
+        return False
+    print("🎉 ==================== 🚀 SUCCESSFUL BIGQUERY INGESTION ====================")
+    print(f" All {len(rows_to_insert)} items successfully appended to BigQuery storage layer.")
+    print("===============================================================================\n")
+    return True
+
 # --- Main Logic (ASYNC) ---
 
-async def amain(message_to_send: str):
-    """Main function to run a single interaction, parse recommendations, insert into BigQuery, and then cleanup."""
-    print(f"\n🤖 Starting Single-Run Client | Session: **{SESSION_ID}**")
-    
+def build_message(run_date: str) -> str:
+    return f"Run the short-selling pipeline for {run_date}."
+
+
+def expand_dates(dates: str = "", start_date: str = "", end_date: str = "") -> List[str]:
+    """
+    Comma-separated --dates plus an optional inclusive --start-date/--end-date
+    range (weekdays only, markets are shut at weekends). Defaults to today.
+    """
+    run_dates = [d.strip() for d in dates.split(",") if d.strip()] if dates else []
+    if start_date or end_date:
+        current = datetime.strptime(start_date or end_date, "%Y-%m-%d")
+        last = datetime.strptime(end_date or start_date, "%Y-%m-%d")
+        while current <= last:
+            if current.weekday() < 5:
+                run_dates.append(current.strftime("%Y-%m-%d"))
+            current += timedelta(days=1)
+    for d in run_dates:
+        datetime.strptime(d, "%Y-%m-%d")  # fail fast on malformed input
+    return sorted(set(run_dates)) or [datetime.utcnow().strftime('%Y-%m-%d')]
+
+
+async def run_date_session(client: httpx.AsyncClient, run_date: str, limiter: asyncio.Semaphore) -> Optional[List[Dict[str, Any]]]:
+    """
+    One isolated session per date: create, run, parse, delete.
+    Returns the compiled rows, or None when the agent never answered.
+    """
+    session_id = f"{SESSION_ID}_{run_date.replace('-', '')}"
+    session_endpoint = f"/apps/{APP_NAME}/users/{USER_ID}/sessions/{session_id}"
     session_data = {"state": {"preferred_language": "English", "visit_count": 5}}
-    current_session_endpoint = f"/apps/{APP_NAME}/users/{USER_ID}/sessions/{SESSION_ID}"
-    
-    async with httpx.AsyncClient(timeout=600.0) as client:
-        
-        # 1. Create Session
+
+    async with limiter:
+        print(f"\n🗓️ [{run_date}] Starting session **{session_id}**")
         try:
-            await make_request(client, "POST", current_session_endpoint, data=session_data)
-            print(f"✅ Session state re-initialized successfully.")
+            await make_request(client, "POST", session_endpoint, data=session_data)
+            print(f"✅ [{run_date}] Session state re-initialized successfully.")
         except Exception as e:
-            print(f"❌ Could not start session framework: {e}")
-            return
+            print(f"❌ [{run_date}] Could not start session framework: {e}")
+            return None
 
-        # 2. Run Single Request & Capture Output Text
-        print(f"--- 💬 Executing Single Task ---")
-        agent_text = ""
+        rows = None
         try:
-            agent_text = await run_agent_request(client, SESSION_ID, message_to_send)
-            print(f"✅ [Agent] -> Raw Response Captured successfully.")
+            agent_text = await run_agent_request(client, session_id, build_message(run_date))
+            print(f"✅ [{run_date}] Raw Response Captured successfully.")
+            timestamp_now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f UTC')
+            rows = compile_rows(parse_agent_rows(agent_text), run_date, timestamp_now)
         except Exception as e:
-            print(f"❌ Agent execution runtime error: {e}")
-            return
-        
-        # 3. Parse Text Responses and Stream directly to BigQuery
-        if agent_text:
-            loop = asyncio.get_running_loop()
-            clean_text = agent_text.strip()
-            if clean_text.startswith("```"):
-                print("✂️ [PARSING] Detected Markdown block fences. Stripping wrappers out...")
-                lines = clean_text.splitlines()
-                if lines[0].startswith("```"):
-                    lines = lines[1:]
-                if lines and lines[-1].startswith("```"):
-                    lines = lines[:-1]
-                clean_text = "\n".join(lines).strip()
-                
-            try:
-                print("🔍 [PARSING] Attempting to deserialize clean text block into JSON...")
-                parsed_json = json.loads(clean_text)
-                
-                if isinstance(parsed_json, dict) and "final_decisions" in parsed_json:
-                    print("📂 [PARSING] Detected 'final_decisions' nesting key object. Slicing inner array data...")
-                    raw_rows = parsed_json["final_decisions"]
-                else:
-                    raw_rows = parsed_json if isinstance(parsed_json, list) else [parsed_json]
-                
-                print(f"📊 [PARSING] Discovered {len(raw_rows)} individual target asset evaluation rows inside data payload.")
-                
-                # --- NEW SAFE BIGQUERY PLUS500 CHECK LAYER ---
-                plus500_shortable_tickers = set()
-                try:
-                    print("🔍 [BIGQUERY] Performing defensive Plus500 eligibility validation check...")
-                    bq_client = bigquery.Client(project=PROJECT_ID)
-                    tickers_extracted = [str(row.get("ticker", "")).upper() for row in raw_rows if row.get("ticker")]
-                    
-                    if tickers_extracted:
-                        # Cross reference tickers against your database shortable table
-                        query = f"""
-                            SELECT UPPER(ticker) as ticker 
-                            FROM `datascience-projects.gcp_shareloader.plus500`
-                            WHERE UPPER(ticker) IN UNNEST(@tickers) AND is_available = TRUE
-                        """
-                        job_config = bigquery.QueryJobConfig(
-                            query_parameters=[
-                                bigquery.ArrayQueryParameter("tickers", "STRING", tickers_extracted)
-                            ]
-                        )
-                        query_job = bq_client.query(query, job_config=job_config)
-                        results = query_job.result(timeout=20.0) # Defensive timeout configuration
-                        plus500_shortable_tickers = {row.ticker for row in results}
-                        print(f"✅ [BIGQUERY] Plus500 check succeeded. Verified count: {len(plus500_shortable_tickers)}")
-                except Exception as plus500_err:
-                    # If this lookup fails, we swallow the error, output logs, and default to empty (assumed not plus500)
-                    print(f"⚠️ [BIGQUERY] Intermittent Plus500 query lookup failure: {plus500_err}.")
-                    print("ℹ️ [FALLBACK] Continuing execution loop. Defaulting tickers to 'Not Plus500 Available'.")
-                    plus500_shortable_tickers = set()
-                # ----------------------------------------------
-
-                rows_to_insert = []
-                today_str = datetime.utcnow().strftime('%Y-%m-%d')
-                timestamp_now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f UTC')
-
-                print("\n==================== 🛠️ COMPILING ROWS FOR BIGQUERY ====================")
-                for index, row in enumerate(raw_rows):
-                    ticker_upper = str(row.get("ticker", "")).upper()
-                    
-                    # Determine tracking metric status flags based on validation results
-                    is_plus500 = ticker_upper in plus500_shortable_tickers
-                    
-                    compiled_row = {
-                        "evaluation_date": row.get("evaluation_date", today_str),
-                        "ticker": ticker_upper,
-                        "conviction_score": int(row.get("conviction_score", 3)),
-                        "action": str(row.get("action", "WATCH")).upper(),
-                        "reasoning": row.get("reasoning", None),
-                        "inserted_at": timestamp_now
-                        # You can explicitly map "is_plus500": is_plus500 here if your bigquery schema has the column!
-                    }
-                    print(f"👉 Row [{index}] Compiled Payload Architecture:")
-                    print(json.dumps(compiled_row, indent=2))
-                    rows_to_insert.append(compiled_row)
-                print("==========================================================================\n")
-                
-                if rows_to_insert:
-                    print(f"📤 [BIGQUERY] Initializing streaming upload framework target connection: {TABLE_REF}")
-                    bq_client = bigquery.Client(project=PROJECT_ID)
-                    
-                    print(f"📤 [BIGQUERY] Broadcasting packet chunk array ({len(rows_to_insert)} items) via streaming API call...")
-                    errors = bq_client.insert_rows_json(TABLE_REF, rows_to_insert)
-                    
-                    if errors:
-                        print("\n❌ ==================== 🔥 BIGQUERY INSERT ERRORS OCCURRED ====================")
-                        print(json.dumps(errors, indent=2))
-                        print("=================================================================================\n")
-                    else:
-                        print("🎉 ==================== 🚀 SUCCESSFUL BIGQUERY INGESTION ====================")
-                        print(f" All {len(rows_to_insert)} items successfully appended to BigQuery storage layer.")
-                        print("===============================================================================\n")
-                        
-                        # 📬 --- TRIGGER SENDGRID NOTIFICATION UPON SUCCESS ---
-                        # Run via standard loop executor since sendgrid's delivery client is synchronous
-                        print("📧 [ORCHESTRATOR] Initializing mail summary delivery dispatch...")
-                else:
-                    print("⚠️ [BIGQUERY] Aborting ingestion phase: No rows were successfully extracted or compiled.")
-                
-                # 📬 ALWAYS SEND EMAIL HERE (Safe from UnboundLocalError)
-                print("📧 [ORCHESTRATOR] Initializing mail summary delivery dispatch...")
-                await loop.run_in_executor(None, send_summary_email, rows_to_insert)
-            
-            except json.JSONDecodeError as decode_error:
-                print("\n🚨 ==================== 💥 JSON PARSE ERROR OCCURRED ====================")
-                print(f"Message: Agent did not output a cleanly parsable JSON data block schema structure.")
-                print(f"Exception Track: {decode_error}")
-                print(f"--- RAW BLOCK INGESTION STRIPPED SOURCE ---\n{clean_text}")
-                print("============================================================================\n")
-            except Exception as bq_err:
-                print(f"❌ [BIGQUERY] Failed to complete execution or compile transaction context: {bq_err}")
-
-        # 4. Cleanup: Delete Session
-        await asyncio.sleep(1) 
-        print(f"\n## 3. Deleting active processing Session Context: {SESSION_ID}")
+            print(f"❌ [{run_date}] Agent execution runtime error: {e}")
+
+        await asyncio.sleep(1)
         try:
-            await make_request(client, "DELETE", current_session_endpoint)
-            print("✅ Session state torn down cleanly.")
+            await make_request(client, "DELETE", session_endpoint)
+            print(f"✅ [{run_date}] Session state torn down cleanly.")
         except Exception as e:
-            print(f"⚠️ Warning: Failed to clear tracking frame out completely. {e}")
+            print(f"⚠️ [{run_date}] Warning: Failed to clear tracking frame out completely. {e}")
+        return rows
+
+
+async def amain(run_dates: List[str], max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+    """
+    Runs one agent session per date (at most `max_concurrency` at a time),
+    then does a single Plus500 check, a single BigQuery insert and a single
+    summary email across all dates.
+    """
+    print(f"\n🤖 Starting Client | Run: **{SESSION_ID}** | {len(run_dates)} date(s): {', '.join(run_dates)}")
+    limiter = asyncio.Semaphore(max(1, max_concurrency))
+
+    async with httpx.AsyncClient(timeout=600.0) as client:
+        per_date = await asyncio.gather(*(run_date_session(client, d, limiter) for d in run_dates))
+
+    failed_dates = [d for d, rows in zip(run_dates, per_date) if rows is None]
+    if failed_dates:
+        print(f"⚠️ [ORCHESTRATOR] Agent run failed for: {', '.join(failed_dates)}")
+    if len(failed_dates) == len(run_dates):
+        print("❌ [ORCHESTRATOR] No date produced an agent answer. Nothing to store or report.")
+        return
+    rows_to_insert = [row for rows in per_date if rows for row in rows]
+
+    print("\n==================== 🛠️ COMPILED ROWS FOR BIGQUERY ====================")
+    for index, row in enumerate(rows_to_insert):
+        print(f"👉 Row [{index}] Compiled Payload Architecture:")
+        print(json.dumps(row, indent=2))
+    print("==========================================================================\n")
+
+    plus500_shortable_tickers = fetch_plus500_tickers(sorted({r["ticker"] for r in rows_to_insert if r["ticker"]}))
+    print(f"ℹ️ [BIGQUERY] {len(plus500_shortable_tickers)} of the recommended tickers are Plus500 shortable.")
+
+    if rows_to_insert:
+        try:
+            insert_recommendations(rows_to_insert)
+        except Exception as bq_err:
+            print(f"❌ [BIGQUERY] Failed to complete execution or compile transaction context: {bq_err}")
+    else:
+        print("⚠️ [BIGQUERY] Aborting ingestion phase: No rows were successfully extracted or compiled.")
+
+    # 📬 ALWAYS SEND ONE EMAIL FOR THE WHOLE RUN
+    print("📧 [ORCHESTRATOR] Initializing mail summary delivery dispatch...")
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, send_summary_email, rows_to_insert)
 
 if __name__ == "__main__":
     if sys.version_info < (3, 9):
         print("🚨 ERROR: Python 3.9+ required.")
         sys.exit(1)
-        
-    today_str = datetime.utcnow().strftime('%Y-%m-%d')
-    QUERY = f"Run the short-selling pipeline for {today_str}."
-    
+
+    parser = argparse.ArgumentParser(description="Trigger the short-selling agent for one or more dates")
+    parser.add_argument("--dates", default=os.environ.get("RUN_DATES", ""),
+                        help="Comma-separated YYYY-MM-DD dates (Default: today)")
+    parser.add_argument("--start-date", default="", help="Inclusive range start, weekdays only")
+    parser.add_argument("--end-date", default="", help="Inclusive range end, weekdays only")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help=f"Concurrent agent sessions (Default: {DEFAULT_MAX_CONCURRENCY})")
+    args = parser.parse_args()
+
     try:
-        asyncio.run(amain(QUERY))
+        asyncio.run(amain(expand_dates(args.dates, args.start_date, args.end_date), args.max_concurrency))
     except Exception as e:
-        print(f"FATAL SYSTEM FAILURE EXECUTION TRACE: {e}")
\ No newline at end of file
+        print(f"FATAL SYSTEM FAILURE EXECUTION TRACE: {e}")
@@ -22,6 +22,12 @@ app: FastAPI = get_fast_api_app(
     web=SERVE_WEB_INTERFACE,
 )
 
+# Optional: create the pooled BigQuery client at start-up so the first tool
+# call does not pay for credential discovery and HTTP session setup.
+if os.environ.get("BQ_WARMUP", "").lower() in ("1", "true", "yes"):
+    from short_selling_agent.bq_client import warm_up_bq_clients
+    warm_up_bq_clients([os.environ.get("GCP_PROJECT_ID", "datascience-projects")])
+
 # You can add more FastAPI routes or configurations below if needed
 # Example:
 # @app.get("/hello")
@@ -1,8 +1,27 @@
-import json
 import os
-import requests
 import argparse
-from datetime import datetime, timedelta
+
+from short_selling_agent.backtest_engine import (
+    HOLD_DAYS,
+    MIN_PRICE,
+    STOP_LOSS_PCT,
+    TAKE_PROFIT_PCT,
+    DEFAULT_SWEEP_GRID,
+    build_trade_windows,
+    default_signals_path,
+    iter_signals,
+    load_signals,
+    preload_price_history,
+    run_engine,
+    sweep_parameters,
+)
+
+EXIT_MESSAGES = {
+    "gap_stop": "📉 GAP DOWN STOP OUT",
+    "stop": "❌ STOP LOSS HIT",
+    "target": "🎉 BOUNCE WIN",
+}
+
 
 def get_fmp_key():
     key = os.environ.get("FMP_API_KEY")
@@ -10,139 +29,130 @@ def get_fmp_key():
         raise ValueError("Please set the FMP_API_KEY environment variable.")
     return key
 
-def run_backtest(initial_capital=10000.0):
+
+def run_backtest(
+    initial_capital=10000.0,
+    signals_path=None,
+    stop_loss_pct=STOP_LOSS_PCT,
+    take_profit_pct=TAKE_PROFIT_PCT,
+    hold_days=HOLD_DAYS,
+    min_price=MIN_PRICE
+):
     print(f"🔄 Flipped Strategy: LONG MEAN REVERSION ENGINE")
-    print(f"Filters -> Min Price: $5.00 | Entry: Day 1 Open LONG | Stop: 5% | Target: 8%")
+    print(f"Filters -> Min Price: ${min_price:.2f} | Entry: Day 1 Open LONG | "
+          f"Stop: {stop_loss_pct:g}% | Target: {take_profit_pct:g}%")
     print(f"Starting Portfolio Capital: ${initial_capital:,.2f}\n")
-    
-    try:
-        with open("signals.json", "r") as f:
-            signals = json.load(f)
-    except FileNotFoundError:
-        print("❌ signals.json not found.")
-        return
-
-    api_key = get_fmp_key()
-    signals.sort(key=lambda x: x["date"])
-    
-    current_capital = initial_capital
-    winning_trades = 0
-    total_trades = 0
-    pnl_percentages = []
-    active_positions = {}
-
-    for signal in signals:
-        ticker = signal["ticker"]
-        entry_date_str = signal["date"]
-        score = float(signal.get("conviction_score", 8))
-        
-        entry_date = datetime.strptime(entry_date_str, "%Y-%m-%d")
-        active_positions = {t: exp for t, exp in active_positions.items() if exp > entry_date}
-        
-        if ticker in active_positions:
-            continue 
-            
-        # Give it a 7-day window to play out the bounce
-        max_exit_date = entry_date + timedelta(days=7)
-        url = f"https://financialmodelingprep.com/api/v3/historical-price-full/{ticker}?from={entry_date_str}&to={max_exit_date.strftime('%Y-%m-%d')}&apikey={api_key}"
-        
-        try:
-            res = requests.get(url).json()
-            historical = res.get("historical", [])
-            if len(historical) < 2: 
-                continue
-                
-            historical.reverse() 
-            
-            day_0_close = historical[0]["close"]
-            
-            # --- FILTER: EXCLUDE PENNY STOCKS LESS THAN $5 ---
-            if day_0_close < 5.0:
-                continue
-
-            # --- THE FLIPPED EXECUTION (LONG ENTRY) ---
-            # We buy the Open of Day 1 immediately following the crash
-            day_1_open = historical[1]["open"]
-            entry_price = day_1_open
-            
-            # Fixed, disciplined risk parameters for a long scalp
-            stop_loss_pct = 5.0    # Tight 5% floor
-            take_profit_pct = 8.0  # 8% target bounce
-            
-            stop_loss_price = entry_price * (1 - (stop_loss_pct / 100.0))
-            take_profit_price = entry_price * (1 + (take_profit_pct / 100.0))
-            
-            # Baseline 3% capital sizing per setup
-            conviction_modifier = score / 8.0
-            allocated_capital = current_capital * 0.03 * conviction_modifier
-
-            trade_closed = False
-            actual_pnl_pct = 0.0
-            actual_exit_date = max_exit_date
-            
-            # Watch Day 1 and subsequent days for the snap-back
-            for idx, day in enumerate(historical[1:], start=1):
-                daily_open = day["open"]
-                daily_high = day["high"]
-                daily_low = day["low"]
-                daily_close = day["close"]
-                current_bar_date = datetime.strptime(day["date"], "%Y-%m-%d")
-                
-                # 1. Check if the asset gaps down past our stop at the open
-                if daily_open <= stop_loss_price:
-                    actual_pnl_pct = ((daily_open - entry_price) / entry_price) * 100
-                    print(f"[{entry_date_str}] {ticker}: 📉 GAP DOWN STOP OUT ({actual_pnl_pct:.2f}%)")
-                    trade_closed = True
-                    actual_exit_date = current_bar_date
-                    break
-                
-                # 2. Check Intraday Stop Loss
-                elif daily_low <= stop_loss_price:
-                    actual_pnl_pct = -stop_loss_pct
-                    print(f"[{entry_date_str}] {ticker}: ❌ STOP LOSS HIT (-{stop_loss_pct:.2f}%)")
-                    trade_closed = True
-                    actual_exit_date = current_bar_date
-                    break
-                    
-                # 3. Check Intraday Take Profit (The Rubber-Band Snap)
-                elif daily_high >= take_profit_price:
-                    exit_p = max(take_profit_price, daily_open)
-                    actual_pnl_pct = ((exit_p - entry_price) / entry_price) * 100
-                    print(f"[{entry_date_str}] {ticker}: 🎉 BOUNCE WIN (+{actual_pnl_pct:.2f}%)")
-                    winning_trades += 1
-                    trade_closed = True
-                    actual_exit_date = current_bar_date
-                    break
-
-            # If the trade is just grinding flat, exit at the end of the data window
-            if not trade_closed:
-                final_price = historical[-1]["close"]
-                actual_pnl_pct = ((final_price - entry_price) / entry_price) * 100
-                if actual_pnl_pct > 0:
-                    print(f"[{entry_date_str}] {ticker}: ⏳ TIME EXIT WIN (+{actual_pnl_pct:.2f}%)")
-                    winning_trades += 1
-                else:
-                    print(f"[{entry_date_str}] {ticker}: ⏳ TIME EXIT LOSS ({actual_pnl_pct:.2f}%)")
-                actual_exit_date = max_exit_date
-
-            # Process Long Capital Accounting
-            trade_dollar_return = allocated_capital * (actual_pnl_pct / 100.0)
-            current_capital += trade_dollar_return
-            pnl_percentages.append(actual_pnl_pct)
-            total_trades += 1
-            active_positions[ticker] = actual_exit_date
-            
-        except Exception as e:
-            pass
 
+    signals_path = signals_path or default_signals_path()
+    if not os.path.exists(signals_path):
+        print(f"❌ {signals_path} not found.")
+        return None
+
+    # Signals are streamed twice (ranges, then windows) rather than held in memory.
+    # One concurrent, cached fetch per ticker; the simulation below is offline
+    prices = preload_price_history(iter_signals(signals_path), get_fmp_key(), hold_days=hold_days)
+    windows = build_trade_windows(iter_signals(signals_path), prices, hold_days=hold_days, min_price=min_price)
+    result = run_engine(
+        windows,
+        initial_capital=initial_capital,
+        stop_loss_pct=stop_loss_pct,
+        take_profit_pct=take_profit_pct,
+    )
+
+    for trade in result["trades"].itertuples(index=False):
+        date_str = trade.entry_date.strftime("%Y-%m-%d")
+        if trade.exit_reason == "time":
+            label = "⏳ TIME EXIT WIN" if trade.pnl_pct > 0 else "⏳ TIME EXIT LOSS"
+        else:
+            label = EXIT_MESSAGES[trade.exit_reason]
+        print(f"[{date_str}] {trade.ticker}: {label} ({trade.pnl_pct:+.2f}%)")
+
+    stats = result["stats"]
     print("\n" + "=" * 50)
     print("🏆 LONG MEAN REVERSION RESULTS")
-    print(f"Total Trades Taken: {total_trades}")
-    if total_trades > 0:
-        print(f"Win Rate: {(winning_trades / total_trades) * 100:.1f}%")
-        print(f"Average Profit Per Trade: {sum(pnl_percentages) / total_trades:.2f}%")
-        print(f"Final Account Balance: ${current_capital:,.2f} ({((current_capital - initial_capital)/initial_capital)*100:.2f}% Net Return)")
+    print(f"Total Trades Taken: {stats['total_trades']}")
+    if stats["total_trades"] > 0:
+        print(f"Win Rate: {stats['win_rate_pct']:.1f}%")
+        print(f"Average Profit Per Trade: {stats['avg_pnl_pct']:.2f}%")
+        print(f"Max Drawdown: {stats['max_drawdown_pct']:.2f}% | Profit Factor: {stats['profit_factor']:.2f}")
+        print(f"Exits: {stats['exit_counts']}")
+        print(f"Final Account Balance: ${stats['final_capital']:,.2f} ({stats['net_return_pct']:.2f}% Net Return)")
     print("=" * 50)
+    return result
+
+
+def run_sweep(grid, initial_capital=10000.0, signals_path=None, max_workers=None, top=20, out_csv=None):
+    """
+    Grid-search the strategy parameters over one preloaded price panel.
+    """
+    signals_path = signals_path or default_signals_path()
+    try:
+        signals = load_signals(signals_path)
+    except FileNotFoundError:
+        print(f"❌ {signals_path} not found.")
+        return None
+
+    # Preload once for the longest hold window; shorter windows are slices of it
+    prices = preload_price_history(signals, get_fmp_key(), hold_days=max(grid["hold_days"]))
+    results = sweep_parameters(signals, prices, grid, initial_capital=initial_capital, max_workers=max_workers)
+
+    print(f"🧪 Evaluated {len(results)} parameter combinations")
+    print(results.head(top).to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+    if out_csv:
+        results.to_csv(out_csv, index=False)
+        print(f"💾 Full results written to {out_csv}")
+    return results
+
+
+def _float_list(value):
+    return [float(v) for v in value.split(",") if v.strip()]
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
 
 if __name__ == "__main__":
-    run_backtest()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Backtest generated signals with a long mean-reversion scalp")
+    parser.add_argument("--signals", default=None,
+                        help="Signal store directory or legacy signals.json (default: store if present)")
+    parser.add_argument("--capital", type=float, default=10000.0)
+    parser.add_argument("--stop", type=float, default=STOP_LOSS_PCT, help="Stop loss in percent")
+    parser.add_argument("--target", type=float, default=TAKE_PROFIT_PCT, help="Take profit in percent")
+    parser.add_argument("--hold-days", type=int, default=HOLD_DAYS)
+
+    sweep = parser.add_argument_group("sweep mode")
+    sweep.add_argument("--sweep", action="store_true", help="Grid-search instead of a single run")
+    sweep.add_argument("--stops", type=_float_list, default=DEFAULT_SWEEP_GRID["stop_loss_pct"])
+    sweep.add_argument("--targets", type=_float_list, default=DEFAULT_SWEEP_GRID["take_profit_pct"])
+    sweep.add_argument("--hold-days-grid", type=_int_list, default=DEFAULT_SWEEP_GRID["hold_days"])
+    sweep.add_argument("--allocations", type=_float_list, default=DEFAULT_SWEEP_GRID["base_allocation"])
+    sweep.add_argument("--min-prices", type=_float_list, default=DEFAULT_SWEEP_GRID["min_price"])
+    sweep.add_argument("--workers", type=int, default=None)
+    sweep.add_argument("--top", type=int, default=20)
+    sweep.add_argument("--out", default=None, help="Write the ranked table to this CSV")
+    args = parser.parse_args()
+
+    if args.sweep:
+        run_sweep(
+            {
+                "stop_loss_pct": args.stops,
+                "take_profit_pct": args.targets,
+                "hold_days": args.hold_days_grid,
+                "base_allocation": args.allocations,
+                "min_price": args.min_prices,
+            },
+            initial_capital=args.capital,
+            signals_path=args.signals,
+            max_workers=args.workers,
+            top=args.top,
+            out_csv=args.out,
+        )
+    else:
+        run_backtest(
+            initial_capital=args.capital,
+            signals_path=args.signals,
+            stop_loss_pct=args.stop,
+            take_profit_pct=args.target,
+            hold_days=args.hold_days,
+        )
@@ -0,0 +1,168 @@
+# short_selling_agent/audit_sink.py — buffered, background BigQuery writer for audit rows
+
+import os
+import queue
+import atexit
+import threading
+from typing import Any, Dict, List, Optional
+
+from google.cloud import bigquery
+
+from .bq_client import get_bq_client
+
+# -----------------------------
+# CONFIGURATION
+# -----------------------------
+DEFAULT_MAX_BATCH_ROWS = 500
+DEFAULT_FLUSH_INTERVAL = 5.0  # seconds
+# "streaming" → insert_rows_json, "load" → load_table_from_json (free, no streaming buffer)
+WRITE_MODES = ("streaming", "load")
+
+
+class BigQueryAuditSink:
+    """
+    In-process queue that batches rows for one BigQuery table and writes them
+    from a daemon thread, so callers never wait on a BigQuery round trip.
+
+    A batch is flushed when `max_batch_rows` rows are waiting or every
+    `flush_interval` seconds, whichever comes first. close() (registered with
+    atexit for the shared sinks) drains everything still queued.
+    """
+
+    def __init__(
+        self,
+        table_ref: str,
+        project: Optional[str] = None,
+        max_batch_rows: int = DEFAULT_MAX_BATCH_ROWS,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        write_mode: str = "streaming"
+    ):
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"write_mode must be one of {WRITE_MODES}, got {write_mode!r}")
+        self.table_ref = table_ref
+        self.project = project
+        self.max_batch_rows = max(1, max_batch_rows)
+        self.flush_interval = flush_interval
+        self.write_mode = write_mode
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    # -----------------------------
+    # Producer side
+    # -----------------------------
+    def enqueue(self, rows: List[Dict[str, Any]]) -> None:
+        """Queue rows for the background writer and return immediately."""
+        for row in rows:
+            self._queue.put(row)
+        self._ensure_started()
+        if self._queue.qsize() >= self.max_batch_rows:
+            self._wake.set()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name=f"bq-audit-sink:{self.table_ref}", daemon=True
+                )
+                self._thread.start()
+
+    # -----------------------------
+    # Consumer side
+    # -----------------------------
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write everything queued right now; returns the number of rows sent."""
+        sent = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain(self.max_batch_rows)
+                if not batch:
+                    break
+                self._write(batch)
+                sent += len(batch)
+        return sent
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            client = get_bq_client(self.project)
+            if self.write_mode == "load":
+                job = client.load_table_from_json(
+                    rows,
+                    self.table_ref,
+                    job_config=bigquery.LoadJobConfig(
+                        write_disposition=bigquery.WriteDisposition.WRITE_APPEND
+                    ),
+                )
+                job.result()
+            else:
+                errors = client.insert_rows_json(self.table_ref, rows)
+                if errors:
+                    print(f"❌ [TOOL AUDIT] BigQuery context logging errors occurred: {errors}")
+                    return
+            print(f"🎉 [TOOL AUDIT] Flushed {len(rows)} audit rows to {self.table_ref}.")
+        except Exception as e:
+            print(f"💥 [TOOL AUDIT] Exception during BigQuery logging: {str(e)}")
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Stop the writer thread and flush whatever is still queued."""
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+
+_SINKS: Dict[str, BigQueryAuditSink] = {}
+_SINKS_LOCK = threading.Lock()
+
+
+def get_audit_sink(table_ref: str, project: Optional[str] = None) -> BigQueryAuditSink:
+    """
+    Process-wide sink for `table_ref`, configured from AUDIT_SINK_* env vars.
+    """
+    with _SINKS_LOCK:
+        sink = _SINKS.get(table_ref)
+        if sink is None:
+            sink = BigQueryAuditSink(
+                table_ref,
+                project=project,
+                max_batch_rows=int(os.environ.get("AUDIT_SINK_MAX_ROWS", DEFAULT_MAX_BATCH_ROWS)),
+                flush_interval=float(os.environ.get("AUDIT_SINK_FLUSH_SECONDS", DEFAULT_FLUSH_INTERVAL)),
+                write_mode=os.environ.get("AUDIT_SINK_WRITE_MODE", "streaming"),
+            )
+            _SINKS[table_ref] = sink
+        return sink
+
+
+def close_audit_sinks() -> None:
+    """Flush and stop every shared sink (runs automatically at interpreter exit)."""
+    with _SINKS_LOCK:
+        sinks = list(_SINKS.values())
+    for sink in sinks:
+        sink.close()
+
+
+atexit.register(close_audit_sinks)
@@ -0,0 +1,434 @@
+# short_selling_agent/backtest_engine.py — preloaded, array-based signal backtester
+
+import os
+import json
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .fmp_client import fmp_get_json, FMPResponseError
+from .signal_store import DEFAULT_SIGNAL_STORE, SignalStore
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------
+# CONFIGURATION
+# -----------------------------
+FMP_PRICE_URL = "https://financialmodelingprep.com/api/v3/historical-price-full/{ticker}"
+DATE_FORMAT = "%Y-%m-%d"
+
+HOLD_DAYS = 7              # Calendar days a trade is given to play out
+MIN_PRICE = 5.0            # Skip setups whose day-0 close is below this
+STOP_LOSS_PCT = 5.0
+TAKE_PROFIT_PCT = 8.0
+BASE_ALLOCATION = 0.03     # Fraction of capital per setup at the baseline score
+BASELINE_SCORE = 8.0
+PRELOAD_MAX_WORKERS = int(os.environ.get("BACKTEST_MAX_WORKERS", "8"))
+
+# Exit codes produced by simulate_exits
+EXIT_TIME, EXIT_GAP_STOP, EXIT_STOP, EXIT_TARGET = 0, 1, 2, 3
+EXIT_LABELS = {
+    EXIT_TIME: "time",
+    EXIT_GAP_STOP: "gap_stop",
+    EXIT_STOP: "stop",
+    EXIT_TARGET: "target",
+}
+
+
+class TradeWindows(NamedTuple):
+    """
+    Price windows for every tradeable signal, padded into (n_trades, max_bars) arrays.
+    Bar 0 is the signal day; entry is the open of bar 1. Padding is NaN.
+    """
+    meta: pd.DataFrame          # ticker, entry_date, max_exit_date, score, n_bars
+    dates: np.ndarray           # (n, max_bars) datetime64[D], NaT padded
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+
+# -----------------------------------------------------------------------------
+# Signals + price preload
+# -----------------------------------------------------------------------------
+def default_signals_path() -> str:
+    """The partitioned signal store if present, else the legacy signals.json."""
+    return DEFAULT_SIGNAL_STORE if os.path.isdir(DEFAULT_SIGNAL_STORE) else "signals.json"
+
+
+def iter_signals(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Signals in date order. A directory is read as a SignalStore and streamed
+    partition by partition; a file is the legacy signals.json list.
+    """
+    if os.path.isdir(path):
+        yield from SignalStore(path).iter_signals()
+        return
+    with open(path, "r") as f:
+        signals = json.load(f)
+    yield from sorted(signals, key=lambda s: s["date"])
+
+
+def load_signals(path: str = "signals.json") -> List[Dict[str, Any]]:
+    return list(iter_signals(path))
+
+
+def _fetch_ticker_history(ticker: str, start: str, end: str, api_key: str) -> pd.DataFrame:
+    url = f"{FMP_PRICE_URL.format(ticker=ticker)}?from={start}&to={end}&apikey={api_key}"
+    # A window that ends in the past never changes, so it is cached for good
+    payload = fmp_get_json(url, as_of_date=end)
+    historical = payload.get("historical", []) if isinstance(payload, dict) else []
+    df = pd.DataFrame(historical, columns=["date", "open", "high", "low", "close"])
+    if df.empty:
+        return df
+    df["date"] = pd.to_datetime(df["date"].astype(str).str.split(" ").str[0])
+    return df.sort_values("date").drop_duplicates("date").reset_index(drop=True)
+
+
+def preload_price_history(
+    signals: Iterable[Dict[str, Any]],
+    api_key: str,
+    hold_days: int = HOLD_DAYS,
+    max_workers: int = PRELOAD_MAX_WORKERS
+) -> Dict[str, pd.DataFrame]:
+    """
+    Fetch one OHLCV range per ticker covering all of its signals (+ hold window),
+    concurrently, through the rate-limited FMP cache.
+
+    Tickers that fail are logged and left out; they never abort the run.
+    """
+    ranges: Dict[str, Tuple[datetime, datetime]] = {}
+    for s in signals:
+        d = datetime.strptime(s["date"], DATE_FORMAT)
+        lo, hi = ranges.get(s["ticker"], (d, d))
+        ranges[s["ticker"]] = (min(lo, d), max(hi, d))
+
+    prices: Dict[str, pd.DataFrame] = {}
+    if not ranges:
+        return prices
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            ticker: pool.submit(
+                _fetch_ticker_history,
+                ticker,
+                lo.strftime(DATE_FORMAT),
+                (hi + timedelta(days=hold_days)).strftime(DATE_FORMAT),
+                api_key,
+            )
+            for ticker, (lo, hi) in ranges.items()
+        }
+        for ticker, future in futures.items():
+            try:
+                prices[ticker] = future.result()
+            except FMPResponseError as e:
+                logger.warning(f"⚠️ Price preload failed for {ticker}: {e}")
+            except Exception as e:
+                logger.error(f"💥 Price preload crashed for {ticker}: {e}")
+
+    logger.info(f"📦 Preloaded price history for {len(prices)}/{len(ranges)} tickers")
+    return prices
+
+
+# -----------------------------------------------------------------------------
+# Windows + vectorized exits
+# -----------------------------------------------------------------------------
+def build_trade_windows(
+    signals: Iterable[Dict[str, Any]],
+    prices: Dict[str, pd.DataFrame],
+    hold_days: int = HOLD_DAYS,
+    min_price: float = MIN_PRICE
+) -> TradeWindows:
+    """
+    Slice each signal's [date, date + hold_days] bars out of the preloaded history.
+    Signals without at least two bars or with a day-0 close below `min_price`
+    are dropped, exactly as the original per-signal loop skipped them.
+    """
+    rows, slices = [], []
+    for s in signals:
+        df = prices.get(s["ticker"])
+        if df is None or df.empty:
+            continue
+        entry_date = pd.Timestamp(s["date"])
+        max_exit = entry_date + pd.Timedelta(days=hold_days)
+        dates = df["date"].to_numpy()
+        lo = np.searchsorted(dates, entry_date.to_datetime64(), side="left")
+        hi = np.searchsorted(dates, max_exit.to_datetime64(), side="right")
+        window = df.iloc[lo:hi]
+        if len(window) < 2 or window["close"].iloc[0] < min_price:
+            continue
+        rows.append({
+            "ticker": s["ticker"],
+            "entry_date": entry_date,
+            "max_exit_date": max_exit,
+            "score": float(s.get("conviction_score", BASELINE_SCORE)),
+            "n_bars": len(window),
+        })
+        slices.append(window)
+
+    meta = pd.DataFrame(rows, columns=["ticker", "entry_date", "max_exit_date", "score", "n_bars"])
+    width = int(meta["n_bars"].max()) if len(meta) else 2
+    shape = (len(slices), width)
+    arrays = {k: np.full(shape, np.nan) for k in ("open", "high", "low", "close")}
+    dates = np.full(shape, np.datetime64("NaT"), dtype="datetime64[D]")
+    for i, window in enumerate(slices):
+        n = len(window)
+        dates[i, :n] = window["date"].to_numpy().astype("datetime64[D]")
+        for k in arrays:
+            arrays[k][i, :n] = window[k].to_numpy(dtype=float)
+    return TradeWindows(meta=meta, dates=dates, **arrays)
+
+
+def simulate_exits(
+    windows: TradeWindows,
+    stop_loss_pct: float = STOP_LOSS_PCT,
+    take_profit_pct: float = TAKE_PROFIT_PCT
+) -> pd.DataFrame:
+    """
+    Resolve every trade's exit at once for a long entry at bar 1's open.
+
+    Per bar, in priority order: open at/below the stop (gap stop, filled at the
+    open), low at/below the stop (stop, filled at the stop), high at/above the
+    target (filled at max(target, open)). The first bar with any event wins;
+    trades with none exit at the last close of the window.
+    """
+    n = len(windows.meta)
+    out = windows.meta.copy()
+    if n == 0:
+        for col in ("entry_price", "exit_price", "pnl_pct", "exit_code", "exit_reason", "exit_date"):
+            out[col] = pd.Series(dtype=float)
+        return out
+
+    entry = windows.open[:, 1]
+    stop = entry * (1 - stop_loss_pct / 100.0)
+    target = entry * (1 + take_profit_pct / 100.0)
+
+    # Only bars 1..n_bars-1 are watched; NaN padding compares False
+    o, h, l = windows.open[:, 1:], windows.high[:, 1:], windows.low[:, 1:]
+    with np.errstate(invalid="ignore"):
+        gap = o <= stop[:, None]
+        stopped = l <= stop[:, None]
+        hit = h >= target[:, None]
+    event = gap | stopped | hit
+    has_event = event.any(axis=1)
+    first = event.argmax(axis=1)
+    rows = np.arange(n)
+
+    code = np.select(
+        [gap[rows, first], stopped[rows, first], hit[rows, first]],
+        [EXIT_GAP_STOP, EXIT_STOP, EXIT_TARGET],
+        default=EXIT_TIME,
+    )
+    code = np.where(has_event, code, EXIT_TIME)
+
+    first_open = o[rows, first]
+    last_close = windows.close[rows, windows.meta["n_bars"].to_numpy() - 1]
+    exit_price = np.select(
+        [code == EXIT_GAP_STOP, code == EXIT_STOP, code == EXIT_TARGET],
+        [first_open, stop, np.maximum(target, first_open)],
+        default=last_close,
+    )
+    pnl_pct = (exit_price - entry) / entry * 100.0
+    # A plain stop books exactly -stop_loss_pct, as the original loop did
+    pnl_pct = np.where(code == EXIT_STOP, -stop_loss_pct, pnl_pct)
+
+    event_dates = windows.dates[:, 1:][rows, first]
+    exit_date = np.where(
+        code == EXIT_TIME,
+        out["max_exit_date"].to_numpy().astype("datetime64[D]"),
+        event_dates,
+    )
+
+    out["entry_price"] = entry
+    out["exit_price"] = exit_price
+    out["pnl_pct"] = pnl_pct
+    out["exit_code"] = code
+    out["exit_reason"] = [EXIT_LABELS[c] for c in code]
+    out["exit_date"] = pd.to_datetime(exit_date)
+    return out
+
+
+# -----------------------------------------------------------------------------
+# Portfolio accounting + stats
+# -----------------------------------------------------------------------------
+def apply_portfolio(
+    trades: pd.DataFrame,
+    initial_capital: float = 10000.0,
+    base_allocation: float = BASE_ALLOCATION,
+    baseline_score: float = BASELINE_SCORE
+) -> pd.DataFrame:
+    """
+    Walk the simulated trades in signal order, skipping a ticker while a
+    previous position in it is still open, and compound capital.
+    Returns only the trades actually taken, with sizing and equity columns.
+    """
+    capital = initial_capital
+    open_until: Dict[str, pd.Timestamp] = {}
+    taken, allocated, returns, equity = [], [], [], []
+
+    for i, (ticker, entry_date, exit_date, score, pnl) in enumerate(zip(
+        trades["ticker"], trades["entry_date"], trades["exit_date"], trades["score"], trades["pnl_pct"]
+    )):
+        open_until = {t: exp for t, exp in open_until.items() if exp > entry_date}
+        if ticker in open_until:
+            continue
+        alloc = capital * base_allocation * (score / baseline_score)
+        dollar = alloc * pnl / 100.0
+        capital += dollar
+        open_until[ticker] = exit_date
+
+        taken.append(i)
+        allocated.append(alloc)
+        returns.append(dollar)
+        equity.append(capital)
+
+    result = trades.iloc[taken].reset_index(drop=True)
+    result["allocated_capital"] = allocated
+    result["dollar_return"] = returns
+    result["equity"] = equity
+    return result
+
+
+def summarize(ledger: pd.DataFrame, initial_capital: float = 10000.0) -> Dict[str, Any]:
+    """Portfolio-level stats for an apply_portfolio ledger."""
+    total = len(ledger)
+    if total == 0:
+        return {"total_trades": 0, "final_capital": initial_capital, "net_return_pct": 0.0}
+
+    pnl = ledger["pnl_pct"].to_numpy()
+    equity = np.concatenate([[initial_capital], ledger["equity"].to_numpy()])
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    gains = ledger.loc[ledger["dollar_return"] > 0, "dollar_return"].sum()
+    losses = -ledger.loc[ledger["dollar_return"] < 0, "dollar_return"].sum()
+
+    return {
+        "total_trades": total,
+        "win_rate_pct": float((pnl > 0).mean() * 100),
+        "avg_pnl_pct": float(pnl.mean()),
+        "median_pnl_pct": float(np.median(pnl)),
+        "final_capital": float(equity[-1]),
+        "net_return_pct": float((equity[-1] - initial_capital) / initial_capital * 100),
+        "max_drawdown_pct": float(drawdown.min() * 100),
+        "profit_factor": float(gains / losses) if losses > 0 else float("inf"),
+        "exit_counts": ledger["exit_reason"].value_counts().to_dict(),
+    }
+
+
+def run_engine(
+    windows: TradeWindows,
+    initial_capital: float = 10000.0,
+    stop_loss_pct: float = STOP_LOSS_PCT,
+    take_profit_pct: float = TAKE_PROFIT_PCT,
+    base_allocation: float = BASE_ALLOCATION
+) -> Dict[str, Any]:
+    """
+    Simulate + account + summarize on preloaded windows; no network I/O,
+    so it can be called repeatedly for parameter sweeps.
+    """
+    trades = simulate_exits(windows, stop_loss_pct, take_profit_pct)
+    ledger = apply_portfolio(trades, initial_capital, base_allocation)
+    return {"trades": ledger, "stats": summarize(ledger, initial_capital)}
+
+
+# -----------------------------------------------------------------------------
+# Parameter sweep
+# -----------------------------------------------------------------------------
+SWEEP_PARAMS = ("stop_loss_pct", "take_profit_pct", "hold_days", "base_allocation", "min_price")
+DEFAULT_SWEEP_GRID = {
+    "stop_loss_pct": [3.0, 5.0, 7.0],
+    "take_profit_pct": [5.0, 8.0, 12.0],
+    "hold_days": [5, 7, 10],
+    "base_allocation": [BASE_ALLOCATION],
+    "min_price": [MIN_PRICE],
+}
+SWEEP_COLUMNS = ("total_trades", "win_rate_pct", "avg_pnl_pct", "max_drawdown_pct",
+                 "profit_factor", "final_capital", "net_return_pct")
+
+# Per-process state for sweep workers (set once by _init_sweep_worker)
+_SWEEP_STATE: Dict[str, Any] = {}
+
+
+def _init_sweep_worker(signals, prices, initial_capital) -> None:
+    _SWEEP_STATE.clear()
+    _SWEEP_STATE.update(signals=signals, prices=prices, initial_capital=initial_capital, windows={})
+
+
+def _evaluate_combo(params: Dict[str, Any]) -> Dict[str, Any]:
+    # Windows only depend on (hold_days, min_price); reuse them across stop/target combos
+    key = (params["hold_days"], params["min_price"])
+    windows = _SWEEP_STATE["windows"].get(key)
+    if windows is None:
+        windows = build_trade_windows(
+            _SWEEP_STATE["signals"], _SWEEP_STATE["prices"],
+            hold_days=params["hold_days"], min_price=params["min_price"],
+        )
+        _SWEEP_STATE["windows"][key] = windows
+
+    stats = run_engine(
+        windows,
+        initial_capital=_SWEEP_STATE["initial_capital"],
+        stop_loss_pct=params["stop_loss_pct"],
+        take_profit_pct=params["take_profit_pct"],
+        base_allocation=params["base_allocation"],
+    )["stats"]
+    return {**params, **{col: stats.get(col, np.nan) for col in SWEEP_COLUMNS}}
+
+
+def expand_grid(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of `grid`; parameters left out use the module defaults."""
+    defaults = {
+        "stop_loss_pct": [STOP_LOSS_PCT],
+        "take_profit_pct": [TAKE_PROFIT_PCT],
+        "hold_days": [HOLD_DAYS],
+        "base_allocation": [BASE_ALLOCATION],
+        "min_price": [MIN_PRICE],
+    }
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    axes = [list(grid.get(name, defaults[name])) for name in SWEEP_PARAMS]
+    return [dict(zip(SWEEP_PARAMS, combo)) for combo in itertools.product(*axes)]
+
+
+def sweep_parameters(
+    signals: List[Dict[str, Any]],
+    prices: Dict[str, pd.DataFrame],
+    grid: Optional[Dict[str, Iterable[Any]]] = None,
+    initial_capital: float = 10000.0,
+    max_workers: Optional[int] = None,
+    rank_by: str = "final_capital"
+) -> pd.DataFrame:
+    """
+    Evaluate every grid combination on one preloaded price panel.
+
+    `prices` must cover the largest hold_days in the grid (preload with it).
+    Combinations run across a process pool; each worker receives the panel
+    once and caches trade windows per (hold_days, min_price). max_workers=1
+    runs in-process. Returns one row per combination, best `rank_by` first.
+    """
+    combos = expand_grid(grid if grid is not None else DEFAULT_SWEEP_GRID)
+    workers = max_workers or os.cpu_count() or 1
+
+    if workers == 1 or len(combos) == 1:
+        _init_sweep_worker(signals, prices, initial_capital)
+        rows = [_evaluate_combo(c) for c in combos]
+    else:
+        # Order combos so each worker's chunk shares a window key
+        combos.sort(key=lambda c: (c["hold_days"], c["min_price"]))
+        chunksize = max(1, len(combos) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_sweep_worker,
+            initargs=(signals, prices, initial_capital),
+        ) as pool:
+            rows = list(pool.map(_evaluate_combo, combos, chunksize=chunksize))
+
+    results = pd.DataFrame(rows, columns=[*SWEEP_PARAMS, *SWEEP_COLUMNS])
+    results = results.sort_values(rank_by, ascending=False, kind="stable").reset_index(drop=True)
+    results.insert(0, "rank", np.arange(1, len(results) + 1))
+    return results
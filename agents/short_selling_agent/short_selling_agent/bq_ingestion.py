@@ -6,7 +6,8 @@ from google.cloud.exceptions import NotFound
 
 # Absolute imports based on the inner package name
 from short_selling_agent.tools import get_fmp_bigger_losers, \
-                    get_squeeze_metrics
+                    get_squeeze_metrics_bulk
+from short_selling_agent.bq_client import get_bq_client
 
 logging.basicConfig(level=logging.INFO)
 
@@ -48,7 +49,7 @@ def main():
         logging.error("Missing GCP_PROJECT_ID or FMP_API_KEY environment variables.")
         return
 
-    client = bigquery.Client(project=PROJECT_ID)
+    client = get_bq_client(PROJECT_ID)
     dataset_ref = client.dataset(DATASET_ID)
     losers_table_id = setup_bigquery_tables(client, dataset_ref)
     today_str = datetime.utcnow().strftime('%Y-%m-%d')
@@ -58,19 +59,19 @@ def main():
     if getattr(losers_report, "error_message", None):
         logging.error(f"Failed to get Losers: {losers_report.error_message}")
     elif losers_report.losers:
+        # Skip penny stocks instantly
+        candidates = [loser for loser in losers_report.losers if loser.price >= 5.00]
+
+        # Fetch the squeeze metrics for every candidate concurrently
+        metrics = get_squeeze_metrics_bulk([loser.ticker for loser in candidates])
+
         rows_to_insert = []
-        for loser in losers_report.losers:
-            # Skip penny stocks instantly
-            if loser.price < 5.00:
-                continue 
-                
-            # Check the Squeeze Risk
-            # Fetch the historical metrics
-            short_pct, free_float = get_squeeze_metrics(loser.ticker)
-            
+        for loser in candidates:
+            short_pct, free_float = metrics[loser.ticker]
+
             # Determine the risk (Short > 15% AND Float < 50M)
             is_dangerous = bool(short_pct > 15.0 and free_float < 50000000)
-            
+
             rows_to_insert.append({
                 "scrape_date": today_str,
                 "ticker": loser.ticker,
@@ -79,14 +80,16 @@ def main():
                 "short_interest_pct": short_pct,
                 "free_float": free_float,
                 "is_squeeze_risk": is_dangerous
-            })    
+            })
 
         if rows_to_insert:
-            errors = client.insert_rows_json(losers_table_id, rows_to_insert)
-            if errors:
-                logging.error(f"BQ Insert Errors: {errors}")
-            else:
+            # One load job for the whole day (no streaming buffer, no per-row quota)
+            job_config = bigquery.LoadJobConfig(write_disposition="WRITE_APPEND")
+            try:
+                client.load_table_from_json(rows_to_insert, losers_table_id, job_config=job_config).result()
                 logging.info(f"Saved {len(rows_to_insert)} Enriched Losers to BQ.")
+            except Exception as e:
+                logging.error(f"BQ Load Errors: {e}")
         else:
             logging.warning("No valid stocks (>\$5.00) found today. Nothing saved to BQ.")
 
@@ -0,0 +1,341 @@
+# short_selling_agent/fmp_client.py — shared FMP GET with a persistent response cache
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+import requests
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from .rate_limiter import get_fmp_limiter, parse_retry_after
+
+# -----------------------------
+# CONFIGURATION
+# -----------------------------
+# Set FMP_CACHE_PATH to "" to disable the on-disk cache entirely.
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "short_selling_agent", "fmp_cache.sqlite"
+)
+DEFAULT_CACHE_MAX_MB = 256
+
+# Live (as_of_date is today or unset) TTLs in seconds, matched on URL path fragment.
+# Historical requests (as_of_date in the past) never expire.
+LIVE_TTLS = {
+    "biggest-losers": 60,
+    "news/stock": 15 * 60,
+    "insider-trading": 60 * 60,
+    "earning_calendar": 60 * 60,
+    "historical-price-full": 60 * 60,
+    "stock-short-interest": 12 * 60 * 60,
+    "short-interest": 12 * 60 * 60,
+    "shares_float": 12 * 60 * 60,
+    "profile": 24 * 60 * 60,
+}
+DEFAULT_LIVE_TTL = 5 * 60
+# Empty bodies ([] / {} / no "historical" rows) may be a transient gap on FMP's
+# side, so they are re-checked soon even for past as_of dates.
+EMPTY_RESULT_TTL = 15 * 60
+
+# How many times a 429 is retried (after honouring Retry-After) before giving up.
+MAX_RATE_LIMIT_RETRIES = 2
+
+# Symbols per comma-separated multi-symbol request.
+MAX_SYMBOLS_PER_REQUEST = int(os.environ.get("FMP_MAX_SYMBOLS_PER_REQUEST", "50"))
+
+
+class FMPResponseError(Exception):
+    """Raised when FMP answers with a non-200 status."""
+
+    def __init__(self, status_code: int, body: str = ""):
+        self.status_code = status_code
+        super().__init__(f"HTTP {status_code}: {body[:100]}")
+
+
+# -----------------------------
+# HELPER: Cache key normalization
+# -----------------------------
+def normalize_url(url: str) -> str:
+    """
+    Canonical cache key for an FMP URL: API key removed, query params sorted.
+    """
+    parts = urlsplit(url)
+    params = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() != "apikey"
+    )
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(params), ""))
+
+
+def ttl_for(url: str, as_of_date: Optional[str] = None) -> Optional[float]:
+    """
+    Seconds until a cached response expires, or None for never.
+    """
+    if as_of_date and as_of_date < datetime.now().strftime("%Y-%m-%d"):
+        return None
+
+    path = urlsplit(url).path
+    for fragment, ttl in LIVE_TTLS.items():
+        if fragment in path:
+            return ttl
+    return DEFAULT_LIVE_TTL
+
+
+def is_fmp_error(data: Any) -> bool:
+    """FMP reports bad keys, plan limits and unknown endpoints as a 200 with an error dict."""
+    return isinstance(data, dict) and ("Error Message" in data or "error" in data)
+
+
+def is_empty_result(data: Any) -> bool:
+    if not data:
+        return True
+    return isinstance(data, dict) and "historical" in data and not data["historical"]
+
+
+def cache_ttl_for(url: str, data: Any, as_of_date: Optional[str] = None) -> Optional[float]:
+    """TTL for storing `data`: the URL's TTL, capped at EMPTY_RESULT_TTL for empty bodies."""
+    ttl = ttl_for(url, as_of_date)
+    if is_empty_result(data):
+        return EMPTY_RESULT_TTL if ttl is None else min(ttl, EMPTY_RESULT_TTL)
+    return ttl
+
+
+# -----------------------------
+# PERSISTENT CACHE (SQLite, LRU-bounded)
+# -----------------------------
+class FMPCache:
+    """
+    Size-bounded, least-recently-used response cache stored in SQLite so it
+    survives restarts and is shared between processes on the same host.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key         TEXT PRIMARY KEY,
+                    payload     TEXT NOT NULL,
+                    size        INTEGER NOT NULL,
+                    expires_at  REAL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)"
+            )
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            payload, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(payload)
+
+    def set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        payload = json.dumps(value)
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), expires_at, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired rows, then least-recently-used rows until under max_bytes."""
+        self._conn.execute(
+            "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (time.time(),),
+        )
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        overflow = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= overflow:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_CACHES: Dict[str, Optional[FMPCache]] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_fmp_cache() -> Optional[FMPCache]:
+    """
+    Process-wide cache for the path in FMP_CACHE_PATH (None when disabled).
+
+    If the cache file cannot be created (read-only or missing HOME, as on
+    some Cloud Run images) the cache is disabled for that path with a single
+    warning, and requests go straight to FMP.
+    """
+    path = os.environ.get("FMP_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if not path:
+        return None
+
+    with _CACHES_LOCK:
+        if path in _CACHES:
+            return _CACHES[path]
+        try:
+            max_mb = float(os.environ.get("FMP_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB))
+            cache = FMPCache(path, max_bytes=int(max_mb * 1024 * 1024))
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"⚠️ [FMP cache] disabled, cannot open {path}: {e}")
+            cache = None
+        _CACHES[path] = cache
+        return cache
+
+
+# -----------------------------
+# SHARED GET
+# -----------------------------
+def fmp_get_json(
+    url: str,
+    as_of_date: Optional[str] = None,
+    timeout: float = 10
+) -> Any:
+    """
+    GET an FMP endpoint and return the parsed JSON body, served from the
+    persistent cache when possible. Only 200 responses are cached, and never
+    FMP's `{"Error Message": ...}` bodies; empty bodies get EMPTY_RESULT_TTL.
+
+    • `as_of_date` in the past marks the response as historical (never expires)
+      and becomes part of the key, so each as-of window is cached separately.
+    • Network fetches (never cache hits) go through the process-wide FMP
+      token bucket; a 429 pauses all callers for its Retry-After and retries.
+
+    Raises FMPResponseError on non-200 responses; network errors propagate.
+    """
+    cache = get_fmp_cache()
+    key = normalize_url(url) + (f"#as_of={as_of_date}" if as_of_date else "")
+
+    if cache is not None:
+        try:
+            hit = cache.get(key)
+        except sqlite3.Error as e:
+            logging.warning(f"⚠️ [FMP cache] read failed for {key}: {e}")
+            hit = None
+        if hit is not None:
+            logging.debug(f"📦 [FMP cache] hit {key}")
+            return hit
+
+    limiter = get_fmp_limiter()
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        limiter.acquire()
+        response = requests.get(url, timeout=timeout)
+        if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+            break
+        headers = getattr(response, "headers", None) or {}
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        logging.warning(f"⏳ [FMP] 429 on {normalize_url(url)}, backing off {retry_after:.1f}s")
+        limiter.penalize(retry_after)
+
+    if response.status_code != 200:
+        raise FMPResponseError(response.status_code, str(getattr(response, "text", "")))
+
+    data = response.json()
+    if cache is not None and data is not None and not is_fmp_error(data):
+        try:
+            cache.set(key, data, cache_ttl_for(url, data, as_of_date))
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logging.warning(f"⚠️ [FMP cache] write failed for {key}: {e}")
+    return data
+
+
+# -----------------------------
+# MULTI-SYMBOL GET
+# -----------------------------
+def chunk_symbols(tickers: Iterable[str], size: int = MAX_SYMBOLS_PER_REQUEST) -> List[List[str]]:
+    """
+    Upper-cased, de-duplicated tickers (first-seen order) split into
+    request-sized chunks.
+    """
+    unique = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+    size = max(1, size)
+    return [unique[i:i + size] for i in range(0, len(unique), size)]
+
+
+def fmp_get_json_by_symbol(
+    url_template: str,
+    tickers: Iterable[str],
+    as_of_date: Optional[str] = None,
+    timeout: float = 10,
+    max_symbols: int = MAX_SYMBOLS_PER_REQUEST,
+    symbol_field: str = "symbol"
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    GET a multi-symbol FMP endpoint for many tickers, `max_symbols` per request.
+
+    `url_template` must contain a `{symbols}` placeholder, which receives the
+    comma-separated chunk. Each chunk goes through fmp_get_json, so it is
+    cached and rate limited like any other call.
+
+    Returns {TICKER: [rows]} with upper-cased keys. A ticker FMP had no rows
+    for maps to []. A ticker whose chunk failed is left out, so callers can
+    tell "no data" from "not fetched". Rows without `symbol_field` are only
+    attributed when the chunk had a single symbol.
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    for chunk in chunk_symbols(tickers, max_symbols):
+        url = url_template.format(symbols=",".join(chunk))
+        try:
+            data = fmp_get_json(url, as_of_date=as_of_date, timeout=timeout)
+        except Exception as e:
+            logging.warning(f"⚠️ [FMP] multi-symbol request failed for {normalize_url(url)}: {e}")
+            continue
+        if is_fmp_error(data) or not isinstance(data, list):
+            logging.warning(f"⚠️ [FMP] multi-symbol request returned no rows for {normalize_url(url)}: {data}")
+            continue
+
+        by_symbol: Dict[str, List[Dict[str, Any]]] = {t: [] for t in chunk}
+        for row in data:
+            if not isinstance(row, dict):
+                continue
+            symbol = str(row.get(symbol_field) or "").upper()
+            if not symbol and len(chunk) == 1:
+                symbol = chunk[0]
+            if symbol in by_symbol:
+                by_symbol[symbol].append(row)
+        results.update(by_symbol)
+    return results
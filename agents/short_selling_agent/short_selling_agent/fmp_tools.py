@@ -2,13 +2,15 @@
 
 import os
 import json
-import time
 import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import ta  # pip install ta
 
+from .fmp_client import fmp_get_json, FMPResponseError
+
 # -----------------------------
 # CONFIGURATION
 # -----------------------------
@@ -18,17 +20,16 @@ if not FMP_API_KEY:
 
 BASE_URL = 'https://financialmodelingprep.com/api/v3'
 
-# Rate limit: 1 sec delay between calls
-REQUEST_DELAY = 1.0
+# Rate limiting: shared token bucket (FMP_CALLS_PER_MINUTE), see rate_limiter.py
 
 # -----------------------------
-# HELPER: Safe GET (no caching)
+# HELPER: Safe GET (persistent cache, see fmp_client.py)
 # -----------------------------
-def _get(url: str) -> Dict:
+def _get(url: str, as_of_date: Optional[str] = None) -> Dict:
     try:
-        response = requests.get(url, timeout=10)
-        time.sleep(REQUEST_DELAY)
-        return response.json() if response.status_code == 200 else {}
+        return fmp_get_json(url, as_of_date=as_of_date)
+    except FMPResponseError:
+        return {}
     except Exception as e:
         print(f"Request failed: {str(e)}")
         return {}
@@ -52,7 +53,7 @@ def get_historical_price_full(
     end_date_str = end_date.strftime('%Y-%m-%d')
 
     url = f"{BASE_URL}/historical-price-full/{symbol}?apikey={FMP_API_KEY}"
-    data = _get(url)
+    data = _get(url, as_of_date)
     if not data or 'historical' not in data:
         return []
 
@@ -71,6 +72,104 @@ def get_historical_price_full(
 # -----------------------------
 # 2. Technical Indicators — Historical-Only Mode
 # -----------------------------
+# Indicator name -> (indicator_type, period_length) as consumed by the agent
+INDICATOR_SPECS = {
+    "rsi": ("rsi", 14),
+    "adx": ("adx", 14),
+    "sma200": ("sma", 200),
+    "sma50": ("sma", 50),
+    "sma20": ("sma", 20),
+    "bollinger_upper": ("bollinger_upper", 20),
+    "bollinger_lower": ("bollinger_lower", 20),
+}
+
+
+def _ohlcv_frame(ohlcv_list: List[Dict], as_of_date: str) -> pd.DataFrame:
+    """
+    Build one date-sorted OHLCV frame, truncated at `as_of_date`.
+    """
+    if not ohlcv_list:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(ohlcv_list)
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.sort_values('date').reset_index(drop=True)
+
+    # Enforce end date
+    as_of_dt = pd.to_datetime(as_of_date)
+    return df[df['date'] <= as_of_dt].reset_index(drop=True)
+
+
+def _indicator_values(
+    df: pd.DataFrame,
+    indicator_type: str,
+    period_length: int,
+    bands: Dict[str, pd.Series]
+) -> Optional[pd.Series]:
+    """
+    Compute a single indicator column over an OHLCV frame.
+    `bands` memoizes the Bollinger computation so upper/lower share one pass.
+    """
+    if indicator_type == 'rsi':
+        return ta.momentum.RSIIndicator(df['adjClose'], window=period_length).rsi()
+    if indicator_type == 'adx':
+        return ta.trend.ADXIndicator(
+            df['high'], df['low'], df['close'], window=period_length
+        ).adx()
+    if indicator_type == 'sma':
+        return df['adjClose'].rolling(period_length).mean()
+    if indicator_type in ('bollinger_upper', 'bollinger_lower'):
+        if indicator_type not in bands:
+            bb = ta.volatility.BollingerBands(df['adjClose'], window=20, window_dev=2)
+            bands['bollinger_upper'] = bb.bollinger_hband()
+            bands['bollinger_lower'] = bb.bollinger_lband()
+        return bands[indicator_type]
+
+    print(f"Indicator {indicator_type} not supported.")
+    return None
+
+
+def _to_records(dates: pd.Series, values: pd.Series, period_length: int) -> List[Dict]:
+    """
+    Convert an indicator column to the agent's [{'date', 'value'}] shape,
+    skipping the first `period_length` warm-up rows.
+    """
+    date_strs = dates.iloc[period_length:].dt.strftime('%Y-%m-%d').tolist()
+    raw = values.iloc[period_length:].to_numpy(dtype=float)
+    return [
+        {'date': d, 'value': float(v) if not np.isnan(v) else None}
+        for d, v in zip(date_strs, raw)
+    ]
+
+
+def compute_indicators(
+    ohlcv_list: List[Dict],
+    as_of_date: str,
+    specs: Dict[str, tuple] = None
+) -> Dict[str, List[Dict]]:
+    """
+    Compute every indicator in `specs` from one already-downloaded OHLCV history.
+    Returns {name: [{'date', 'value'}, ...]} matching get_technical_indicators.
+    """
+    specs = specs or INDICATOR_SPECS
+    df = _ohlcv_frame(ohlcv_list, as_of_date)
+    bands: Dict[str, pd.Series] = {}
+
+    results = {}
+    for name, (indicator_type, period_length) in specs.items():
+        if len(df) < period_length:
+            results[name] = []
+            continue
+        try:
+            values = _indicator_values(df, indicator_type, period_length, bands)
+            results[name] = [] if values is None else _to_records(df['date'], values, period_length)
+        except Exception as e:
+            print(f"Error computing {indicator_type}: {str(e)}")
+            results[name] = []
+
+    return results
+
+
 def get_technical_indicators(
     symbol: str,
     indicator_type: str,
@@ -89,54 +188,8 @@ def get_technical_indicators(
     if len(ohlcv_list) < period_length:
         return []
 
-    df = pd.DataFrame(ohlcv_list)
-    df['date'] = pd.to_datetime(df['date'])
-    df = df.sort_values('date').reset_index(drop=True)
-
-    # Enforce end date
-    as_of_dt = pd.to_datetime(as_of_date)
-    df = df[df['date'] <= as_of_dt]
-
-    if len(df) < period_length:
-        return []
-
-    result = []
-
-    try:
-        if indicator_type == 'rsi':
-            df['value'] = ta.momentum.RSIIndicator(df['adjClose'], window=period_length).rsi()
-            column = 'value'
-        elif indicator_type == 'adx':
-            df['value'] = ta.trend.ADXIndicator(
-                df['high'], df['low'], df['close'], window=period_length
-            ).adx()
-            column = 'value'
-        elif indicator_type == 'sma':
-            df['value'] = df['adjClose'].rolling(period_length).mean()
-        elif indicator_type == 'bollinger_upper':
-            bb = ta.volatility.BollingerBands(df['adjClose'], window=20, window_dev=2)
-            df['value'] = bb.bollinger_hband()
-            column = 'value'
-        elif indicator_type == 'bollinger_lower':
-            bb = ta.volatility.BollingerBands(df['adjClose'], window=20, window_dev=2)
-            df['value'] = bb.bollinger_lband()
-            column = 'value'
-        else:
-            print(f"Indicator {indicator_type} not supported.")
-            return []
-
-        result = [
-            {
-                'date': row['date'].strftime('%Y-%m-%d'),
-                'value': float(row['value']) if pd.notna(row['value']) else None
-            }
-            for _, row in df.iloc[period_length:].iterrows()
-        ]
-
-    except Exception as e:
-        print(f"Error computing {indicator_type} for {symbol}: {str(e)}")
-
-    return result
+    spec = {indicator_type: (indicator_type, period_length)}
+    return compute_indicators(ohlcv_list, as_of_date, spec)[indicator_type]
 
 
 # -----------------------------
@@ -150,7 +203,7 @@ def get_short_interest(
     Returns the most recent short interest data available *before* as_of_date.
     """
     url = f"{BASE_URL}/short-interest/{symbol}?apikey={FMP_API_KEY}"
-    data = _get(url)
+    data = _get(url, as_of_date)
 
     if isinstance(data, list) and len(data) > 0:
         # Sort by date, descending
@@ -176,7 +229,7 @@ def get_historical_earnings(
     to_date: str
 ) -> List[Dict]:
     url = f"{BASE_URL}/historical/earning_calendar?from={from_date}&to={to_date}&apikey={FMP_API_KEY}"
-    data = _get(url)
+    data = _get(url, to_date)
     if not isinstance(data, list):
         return []
 
@@ -237,21 +290,16 @@ def get_all_data_for_ticker(
     earnings_window = get_historical_earnings(start_date, end_date_str)
     symbol_earnings = [e for e in earnings_window if e['symbol'] == symbol]
 
+    # One download feeds both the price history and every indicator
+    price = get_historical_price_full(symbol, as_of_date, lookback_days)
+
     return {
         "symbol": symbol,
         "as_of_date": as_of_date,
 
-        "price": get_historical_price_full(symbol, as_of_date, lookback_days),
-
-        "indicators": {
-            "rsi": get_technical_indicators(symbol, "rsi", 14, as_of_date, lookback_days),
-            "adx": get_technical_indicators(symbol, "adx", 14, as_of_date, lookback_days),
-            "sma200": get_technical_indicators(symbol, "sma", 200, as_of_date, lookback_days),
-            "sma50": get_technical_indicators(symbol, "sma", 50, as_of_date, lookback_days),
-            "sma20": get_technical_indicators(symbol, "sma", 20, as_of_date, lookback_days),
-            "bollinger_upper": get_technical_indicators(symbol, "bollinger_upper", 20, as_of_date, lookback_days),
-            "bollinger_lower": get_technical_indicators(symbol, "bollinger_lower", 20, as_of_date, lookback_days),
-        },
+        "price": price,
+
+        "indicators": compute_indicators(price, as_of_date),
 
         "fundamentals": {
             "short_interest": get_short_interest(symbol, as_of_date),
@@ -19,9 +19,9 @@ You are Step 2: the News Analyst Agent.
      "final_decisions": []
    }
 3. If valid tickers are present, re-extract the target date from the user's message.
-4. For EACH ticker provided in the Step 1 output, call:
-     tool_stage_news(ticker="<TICKER>", as_of_date="YYYY-MM-DD")
-5. Wait until all tool calls succeed. Then output exactly: "News is staged for the active candidates."
+4. Call this tool ONCE to stage news for every ticker loaded in Step 1:
+     tool_stage_all_candidates(as_of_date="YYYY-MM-DD", sources="news")
+5. Wait until the tool call succeeds. Then output exactly: "News is staged for the active candidates."
 """.strip()
 
 INSIDER_ANALYST_INSTRUCTIONS = """
@@ -29,10 +29,10 @@ You are Step 3: the Insider Analyst Agent.
 
 1. Inspect the preceding response from Step 2 (News Analyst Agent).
 2. HARD CRITICAL GUARDRAIL: If Step 2 outputted the "No candidates for shorting found" JSON structure, you MUST short-circuit and halt immediately. Do not call any tools. Output that exact JSON structure word-for-word.
-3. If news staging completed successfully, extract the target date and the list of active tickers from the message history.
-4. For EACH active ticker, call:
-     tool_stage_insiders(ticker="<TICKER>", as_of_date="YYYY-MM-DD")
-5. Wait until all calls finish. Then output exactly: "Insiders are staged. The tickers are ready for the Quant Coordinator."
+3. If news staging completed successfully, extract the target date from the message history.
+4. Call this tool ONCE to stage insider sales for every active ticker:
+     tool_stage_all_candidates(as_of_date="YYYY-MM-DD", sources="insiders")
+5. Wait until the call finishes. Then output exactly: "Insiders are staged. The tickers are ready for the Quant Coordinator."
 """.strip()
 
 QUANT_COORDINATOR_INSTRUCTIONS = """
@@ -0,0 +1,115 @@
+# short_selling_agent/rate_limiter.py — process-wide token bucket for FMP calls
+
+import os
+import time
+import asyncio
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# The budget is per process, and per package: congress_trades_agent/rate_limiter.py
+# is an independent copy of this bucket (each agent deploys as its own
+# Cloud Run service, so it cannot share one). When both run against the
+# same FMP key, set FMP_CALLS_PER_MINUTE in each deployment so that the
+# budgets add up to no more than the plan. The defaults (short selling
+# 240 + congress 60) add up to the Starter plan's 300 calls/minute.
+
+# -----------------------------
+# CONFIGURATION
+# -----------------------------
+# This package's share of the plan: the short-selling agent and its jobs
+# make most of the FMP calls.
+DEFAULT_CALLS_PER_MINUTE = 240
+# Back-off used when a 429 arrives without a usable Retry-After header.
+DEFAULT_RETRY_AFTER = 60.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket usable from sync and async code.
+
+    Starts full, so requests run back-to-back until the per-minute budget is
+    spent; after that callers are spaced at the refill rate. Each acquire
+    reserves a token up front and then sleeps outside the lock, so waiting
+    callers are served in arrival order.
+    """
+
+    def __init__(self, calls_per_minute: float, capacity: Optional[float] = None):
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
+        self.rate = calls_per_minute / 60.0  # tokens per second
+        self.capacity = float(capacity if capacity is not None else calls_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = 0.0
+            if self._tokens < 0:
+                wait = -self._tokens / self.rate
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, retry_after: float) -> None:
+        """Pause every caller for `retry_after` seconds and drain the bucket (after a 429)."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+            self._tokens = min(self._tokens, 0.0)
+
+
+def parse_retry_after(value: Optional[str], default: float = DEFAULT_RETRY_AFTER) -> float:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date).
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
+
+
+_LIMITER: Optional[TokenBucket] = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_fmp_limiter() -> TokenBucket:
+    """
+    Process-wide limiter sized from FMP_CALLS_PER_MINUTE (this process's
+    share of the FMP plan, see the module header).
+    """
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            cpm = float(os.environ.get("FMP_CALLS_PER_MINUTE", DEFAULT_CALLS_PER_MINUTE))
+            _LIMITER = TokenBucket(cpm)
+        return _LIMITER
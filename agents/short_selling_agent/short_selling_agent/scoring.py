@@ -1,21 +1,38 @@
-from types import Dict, Any 
+from typing import Dict, Any, List, Iterable
+
+import numpy as np
+import pandas as pd
 
 # scoring.py
+SHORT_SIGNAL_WEIGHTS = {
+    'below_sma200': 20,
+    'rsi_20_to_40': 15,
+    'adx_above_25': 15,
+    'volume_spike': 10,
+    'high_short_interest': 15,
+    'negative_earnings_surprise': 10,
+    'bearish_sma_cross': 10,
+    'chop_downward': 5  # Choppiness decreasing → trend forming
+}
+
+# Indicator columns expected in a scoring panel (see build_scoring_panel)
+PANEL_INDICATORS = ('sma200', 'sma50', 'rsi', 'adx', 'chop')
+
+
+def _verdict(score: float) -> str:
+    if score >= 70:
+        return 'strong'
+    if score >= 50:
+        return 'medium'
+    return 'weak'
+
+
 def calculate_short_conviction_score(data: dict) -> Dict[str, Any]:
     """
     Assign weights to high-conviction short signals.
     Returns { 'score': 0-100, 'breakdown': { signal: score }, 'verdict': 'strong/medium/weak' }
     """
-    weights = {
-        'below_sma200': 20,
-        'rsi_20_to_40': 15,
-        'adx_above_25': 15,
-        'volume_spike': 10,
-        'high_short_interest': 15,
-        'negative_earnings_surprise': 10,
-        'bearish_sma_cross': 10,
-        'chop_downward': 5  # Choppiness decreasing → trend forming
-    }
+    weights = SHORT_SIGNAL_WEIGHTS
 
     score = 0
     breakdown = {}
@@ -23,28 +40,37 @@ def calculate_short_conviction_score(data: dict) -> Dict[str, Any]:
     price_hist = data['price']
     indicators = data['indicators']
     fundamentals = data['fundamentals']
-    
+
     if not price_hist:
         return {'score': 0, 'breakdown': {}, 'verdict': 'none'}
 
     latest_price = price_hist[-1]['adjClose']
     latest_date = price_hist[-1]['date']
 
+    def value_on(name: str):
+        # First record for latest_date, as the original list-comprehension lookups did
+        for rec in indicators[name]:
+            if rec['date'] == latest_date:
+                return rec['value']
+        return None
+
+    sma200 = value_on('sma200')
+    sma50 = value_on('sma50')
+    rsi = value_on('rsi')
+    adx = value_on('adx')
+
     # --- 1. Below SMA200 ---
-    sma200_vals = [i for i in indicators['sma200'] if i['date'] == latest_date]
-    below_sma200 = sma200_vals[0]['value'] > latest_price if sma200_vals and sma200_vals[0]['value'] else False
+    below_sma200 = sma200 > latest_price if sma200 else False
     breakdown['below_sma200'] = weights['below_sma200'] if below_sma200 else 0
     score += breakdown['below_sma200']
 
     # --- 2. RSI between 20 and 40 ---
-    rsi_vals = [i for i in indicators['rsi'] if i['date'] == latest_date]
-    rsi_ok = 20 < rsi_vals[0]['value'] < 40 if rsi_vals and rsi_vals[0]['value'] else False
+    rsi_ok = 20 < rsi < 40 if rsi else False
     breakdown['rsi_20_to_40'] = weights['rsi_20_to_40'] if rsi_ok else 0
     score += breakdown['rsi_20_to_40']
 
     # --- 3. ADX > 25 ---
-    adx_vals = [i for i in indicators['adx'] if i['date'] == latest_date]
-    adx_strong = adx_vals[0]['value'] > 25 if adx_vals and adx_vals[0]['value'] else False
+    adx_strong = adx > 25 if adx else False
     breakdown['adx_above_25'] = weights['adx_above_25'] if adx_strong else 0
     score += breakdown['adx_above_25']
 
@@ -68,14 +94,7 @@ def calculate_short_conviction_score(data: dict) -> Dict[str, Any]:
     score += breakdown['negative_earnings_surprise']
 
     # --- 7. SMA50 < SMA200 (bearish alignment) ---
-    sma50_vals = [i for i in indicators['sma50'] if i['date'] == latest_date]
-    sma200_vals = [i for i in indicators['sma200'] if i['date'] == latest_date]
-    bearish_sma = (
-        sma50_vals and sma200_vals 
-        and sma50_vals[0]['value'] 
-        and sma200_vals[0]['value'] 
-        and sma50_vals[0]['value'] < sma200_vals[0]['value']
-    )
+    bearish_sma = bool(sma50 and sma200 and sma50 < sma200)
     breakdown['bearish_sma_cross'] = weights['bearish_sma_cross'] if bearish_sma else 0
     score += breakdown['bearish_sma_cross']
 
@@ -87,18 +106,154 @@ def calculate_short_conviction_score(data: dict) -> Dict[str, Any]:
         breakdown['chop_downward'] = weights['chop_downward'] if chop_downward else 0
         score += breakdown['chop_downward']
 
-    # --- Final Verdict ---
-    if score >= 70:
-        verdict = 'strong'
-    elif score >= 50:
-        verdict = 'medium'
-    else:
-        verdict = 'weak'
-
     return {
         'score': round(score, 1),
         'breakdown': breakdown,
-        'verdict': verdict,
+        'verdict': _verdict(score),
         'as_of': data['as_of_date'],
         'symbol': data['symbol']
-    }
\ No newline at end of file
+    }
+
+
+# -----------------------------------------------------------------------------
+# Columnar scoring (many tickers x many dates)
+# -----------------------------------------------------------------------------
+def build_scoring_panel(payloads: Iterable[dict]) -> pd.DataFrame:
+    """
+    Flatten get_all_data_for_ticker-style payloads into one scoring panel.
+
+    One row per (ticker, price date) with columns:
+    adjClose, volume, sma200, sma50, rsi, adx, chop, short_percent,
+    min_earnings_surprise. Indicators are joined on date; the fundamentals
+    snapshot is repeated on every row of its ticker.
+    """
+    frames: List[pd.DataFrame] = []
+    for data in payloads:
+        price_hist = data.get('price') or []
+        if not price_hist:
+            continue
+        df = pd.DataFrame(price_hist, columns=['date', 'adjClose', 'volume'])
+        df.insert(0, 'ticker', data['symbol'])
+
+        indicators = data.get('indicators') or {}
+        for name in PANEL_INDICATORS:
+            recs = indicators.get(name) or []
+            if recs:
+                ind = pd.DataFrame(recs, columns=['date', 'value'])
+                # First record per date wins, matching the scalar lookup
+                ind = ind.drop_duplicates('date', keep='first')
+                df[name] = df['date'].map(ind.set_index('date')['value'])
+            else:
+                df[name] = np.nan
+
+        fundamentals = data.get('fundamentals') or {}
+        short_pct = (fundamentals.get('short_interest') or {}).get('shortPercent')
+        surprises = [e.get('surprise') for e in fundamentals.get('recent_earnings') or []
+                     if e.get('surprise') is not None]
+        df['short_percent'] = short_pct if short_pct is not None else np.nan
+        df['min_earnings_surprise'] = min(surprises) if surprises else np.nan
+        frames.append(df)
+
+    columns = ['ticker', 'date', 'adjClose', 'volume', *PANEL_INDICATORS,
+               'short_percent', 'min_earnings_surprise']
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)[columns]
+
+
+def _truthy(values: pd.Series) -> pd.Series:
+    """Float view with NaN for None/0, mirroring the scalar `if value` guards."""
+    v = pd.to_numeric(values, errors='coerce').astype(float)
+    return v.where(v != 0)
+
+
+def score_panel(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score every (ticker, date) row of a panel at once.
+
+    Expects the columns produced by build_scoring_panel. Each row is scored as
+    if it were the latest day of that ticker's history: the volume average
+    and choppiness trend look back over the ticker's earlier rows.
+
+    Returns the panel sorted by (ticker, date) plus one column per weighted
+    signal, 'score' and 'verdict'. 'chop_downward' is NaN where fewer than
+    five rows of history exist (the scalar scorer omits it from the breakdown).
+    """
+    w = SHORT_SIGNAL_WEIGHTS
+    out = panel.sort_values(['ticker', 'date'], kind='stable').reset_index(drop=True)
+    if out.empty:
+        for signal in w:
+            out[signal] = pd.Series(dtype=float)
+        out['score'] = pd.Series(dtype=float)
+        out['verdict'] = pd.Series(dtype=object)
+        return out
+
+    by_ticker = out.groupby('ticker', sort=False)
+    price = out['adjClose'].to_numpy(dtype=float)
+    volume = out['volume'].to_numpy(dtype=float)
+    sma200 = _truthy(out['sma200']).to_numpy()
+    sma50 = _truthy(out['sma50']).to_numpy()
+    rsi = _truthy(out['rsi']).to_numpy()
+    adx = _truthy(out['adx']).to_numpy()
+    short_pct = _truthy(out['short_percent']).to_numpy()
+    min_surprise = pd.to_numeric(out['min_earnings_surprise'], errors='coerce').to_numpy(dtype=float)
+
+    avg_vol = by_ticker['volume'].transform(
+        lambda s: s.rolling(20, min_periods=1).mean()
+    ).to_numpy(dtype=float)
+
+    # NaN comparisons are False, so missing inputs never fire a signal
+    with np.errstate(invalid='ignore'):
+        masks = {
+            'below_sma200': sma200 > price,
+            'rsi_20_to_40': (rsi > 20) & (rsi < 40),
+            'adx_above_25': adx > 25,
+            'volume_spike': volume > 1.5 * avg_vol,
+            'high_short_interest': short_pct > 0.10,
+            'negative_earnings_surprise': min_surprise < -0.10,
+            'bearish_sma_cross': sma50 < sma200,
+        }
+
+    # --- Choppiness: last vs first non-empty value in the trailing 5-row window ---
+    chop = _truthy(out['chop'])
+    window = pd.concat(
+        [chop.groupby(out['ticker'], sort=False).shift(lag) for lag in range(4, -1, -1)],
+        axis=1,
+    )
+    first_chop = window.bfill(axis=1).iloc[:, 0].to_numpy()
+    last_chop = window.ffill(axis=1).iloc[:, -1].to_numpy()
+    eligible = by_ticker.cumcount().to_numpy() >= 4
+    with np.errstate(invalid='ignore'):
+        chop_down = (window.notna().sum(axis=1).to_numpy() > 1) & (last_chop < first_chop)
+
+    score = np.zeros(len(out))
+    for signal, mask in masks.items():
+        out[signal] = np.where(mask, w[signal], 0)
+        score += out[signal].to_numpy()
+
+    chop_points = np.where(chop_down, w['chop_downward'], 0).astype(float)
+    score += np.where(eligible, chop_points, 0)
+    out['chop_downward'] = np.where(eligible, chop_points, np.nan)
+
+    out['score'] = np.round(score, 1)
+    out['verdict'] = np.select([score >= 70, score >= 50], ['strong', 'medium'], default='weak')
+    return out
+
+
+def panel_breakdowns(scored: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Convert score_panel output rows into calculate_short_conviction_score dicts.
+    """
+    signals = list(SHORT_SIGNAL_WEIGHTS)
+    results = []
+    for row in scored[['ticker', 'date', 'score', 'verdict', *signals]].itertuples(index=False):
+        values = dict(zip(signals, row[4:]))
+        breakdown = {k: int(v) for k, v in values.items() if not pd.isna(v)}
+        results.append({
+            'score': float(row.score),
+            'breakdown': breakdown,
+            'verdict': row.verdict,
+            'as_of': row.date,
+            'symbol': row.ticker,
+        })
+    return results
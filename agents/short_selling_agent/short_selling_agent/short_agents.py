@@ -4,8 +4,7 @@ from short_selling_agent.prompts import BQ_ANALYST_INSTRUCTIONS,\
                     NEWS_ANALYST_INSTRUCTIONS, INSIDER_ANALYST_INSTRUCTIONS, QUANT_COORDINATOR_INSTRUCTIONS
 from short_selling_agent.stage_tools import (
     tool_fetch_bq_candidates, 
-    tool_stage_news, 
-    tool_stage_insiders, 
+    tool_stage_all_candidates,
     tool_read_full_dossier
 )
 from pathlib import Path
@@ -37,7 +36,7 @@ news_skill = load_skill_from_dir(str(NEWS_SKILL_PATH))
 NEWS_ANALYST_AGENT = LlmAgent(
     name="NewsAnalystAgent",
     model="gemini-2.5-flash",
-    tools=[tool_stage_news],
+    tools=[tool_stage_all_candidates],
     instruction=news_skill.instructions
 )
 
@@ -50,7 +49,7 @@ insider_skill = load_skill_from_dir(str(INSIDER_SKILL_PATH))
 INSIDER_ANALYST_AGENT = LlmAgent(
     name="InsiderAnalystAgent",
     model="gemini-2.5-flash",
-    tools=[tool_stage_insiders],
+    tools=[tool_stage_all_candidates],
     instruction=insider_skill.instructions
 )
 
@@ -0,0 +1,75 @@
+# short_selling_agent/signal_store.py — append-only, date-partitioned signal store
+
+import os
+import re
+import json
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+# -----------------------------
+# CONFIGURATION
+# -----------------------------
+DEFAULT_SIGNAL_STORE = os.environ.get("SIGNAL_STORE_DIR", "signals")
+_PARTITION_RE = re.compile(r"^date=(\d{4}-\d{2}-\d{2})\.jsonl$")
+
+
+class SignalStore:
+    """
+    One JSON Lines file per scan date: <root>/date=YYYY-MM-DD.jsonl.
+
+    Writing a date never touches the other partitions, so re-running the
+    generator only costs the new dates. An empty partition records "computed,
+    no signals" so that date is skipped on the next run as well.
+    """
+
+    def __init__(self, root: str = DEFAULT_SIGNAL_STORE):
+        self.root = root
+
+    def _partition(self, date: str) -> str:
+        return os.path.join(self.root, f"date={date}.jsonl")
+
+    def computed_dates(self) -> Set[str]:
+        if not os.path.isdir(self.root):
+            return set()
+        return {m.group(1) for m in map(_PARTITION_RE.match, os.listdir(self.root)) if m}
+
+    def has_date(self, date: str) -> bool:
+        return os.path.exists(self._partition(date))
+
+    def write_date(self, date: str, signals: Iterable[Dict[str, Any]]) -> int:
+        """Atomically (re)write one date's partition; returns the row count."""
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=f".date={date}.", suffix=".tmp")
+        count = 0
+        try:
+            with os.fdopen(fd, "w") as f:
+                for signal in signals:
+                    f.write(json.dumps({**signal, "date": date}) + "\n")
+                    count += 1
+            os.replace(tmp_path, self._partition(date))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return count
+
+    def iter_signals(self, start: Optional[str] = None, end: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield signals in date order, one partition in memory at a time."""
+        for date in sorted(self.computed_dates()):
+            if (start and date < start) or (end and date > end):
+                continue
+            with open(self._partition(date), "r") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def import_json(self, path: str) -> List[str]:
+        """Split a legacy signals.json list into partitions; returns the dates written."""
+        with open(path, "r") as f:
+            signals = json.load(f)
+        by_date: Dict[str, List[Dict[str, Any]]] = {}
+        for s in signals:
+            by_date.setdefault(s["date"], []).append(s)
+        for date, rows in by_date.items():
+            self.write_date(date, rows)
+        return sorted(by_date)
@@ -8,10 +8,14 @@ from .tools import (
     get_bq_short_candidates,
     get_fmp_news,
     get_bearish_insider_sales,
+    get_bearish_insider_sales_bulk,
 )
-from .schemas import MarketLoser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .schemas import MarketLoser, StockNewsReport, InsiderTradingReport
 from .state import CURRENT_RUN_STATE
 from .schemas import Plus500UniverseReport
+from .bq_client import get_bq_client
 
 
 # -----------------------------------------------------------------------------
@@ -150,7 +154,7 @@ def get_plus500_universe(
         params = []
 
     try:
-        client = bigquery.Client(project=project_id)
+        client = get_bq_client(project_id)
         job = client.query(
             sql,
             job_config=bigquery.QueryJobConfig(query_parameters=params)
@@ -182,6 +186,17 @@ def tool_stage_quant_data(ticker: str, as_of_date: str) -> None:
     ✅ No manual dicts — full schema compliance
     """
     from short_selling_agent.state import CURRENT_RUN_STATE
+
+    quant_signal = _build_quant_signal(ticker, as_of_date)
+    if quant_signal is not None:
+        CURRENT_RUN_STATE.dossier.quant_reports.append(quant_signal)
+
+
+def _build_quant_signal(ticker: str, as_of_date: str):
+    """
+    Fetch and compute the QuantitativeSignal for one ticker without touching state.
+    Returns None when there is no price data or the fetch fails.
+    """
     from short_selling_agent.schemas import QuantitativeSignal  # Make sure this exists
 
     try:
@@ -193,7 +208,7 @@ def tool_stage_quant_data(ticker: str, as_of_date: str) -> None:
         )
 
         if not data['price']:
-            return  # Nothing to stage
+            return None  # Nothing to stage
 
         # ------------------------------
         # Extract: Price & Trend
@@ -274,14 +289,142 @@ def tool_stage_quant_data(ticker: str, as_of_date: str) -> None:
             as_of_date=as_of_date
         )
 
-        # ------------------------------
-        # Append to Dossier
-        # ------------------------------
-        CURRENT_RUN_STATE.dossier.quant_reports.append(quant_signal)
-
         # Optional: log
         # print(f"📊 Staged quant signal for {ticker} | RSI: {rsi_val}, Short: {short_pct_pct}%")
+        return quant_signal
 
     except Exception as e:
         print(f"❌ Error staging quant data for {ticker}: {str(e)}")
-        # Don't crash — continue pipeline
\ No newline at end of file
+        # Don't crash — continue pipeline
+        return None
+
+
+# -----------------------------------------------------------------------------
+# Batch staging: all loaded candidates, all sources, concurrently
+# -----------------------------------------------------------------------------
+STAGING_SOURCES = ("news", "insiders", "quant")
+STAGING_MAX_WORKERS = int(os.environ.get("STAGING_MAX_WORKERS", "8"))
+
+
+def _fetch_news_safe(ticker: str, as_of_date: str) -> StockNewsReport:
+    try:
+        return get_fmp_news(ticker, as_of_date=as_of_date)
+    except Exception as e:
+        logging.error(f"News staging failed for {ticker}: {e}")
+        return StockNewsReport(ticker=ticker, articles=[], error_message=str(e))
+
+
+def _fetch_insiders_safe(ticker: str, as_of_date: str) -> InsiderTradingReport:
+    try:
+        return get_bearish_insider_sales(ticker, as_of_date=as_of_date)
+    except Exception as e:
+        logging.error(f"Insider staging failed for {ticker}: {e}")
+        return InsiderTradingReport(
+            ticker=ticker,
+            total_dollars_dumped=0.0,
+            significant_sales=[],
+            error_message=str(e)
+        )
+
+
+def stage_candidates_concurrently(
+    as_of_date: str = "",
+    sources: tuple = STAGING_SOURCES,
+    max_workers: int = STAGING_MAX_WORKERS
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch every requested source for every ticker already in
+    CURRENT_RUN_STATE.dossier.market_losers on a bounded thread pool.
+
+    FMP calls share the process-wide rate limiter, so the pool only overlaps
+    network latency; it never exceeds the plan budget. In historical mode the
+    insider source is one bulk BigQuery job for all tickers. Results are appended to
+    the dossier afterwards, in market_losers order, so the staged state is
+    identical to calling the per-ticker tools one after another.
+
+    Returns {ticker: {source: report}} for the caller's bookkeeping.
+    """
+    fetchers = {
+        "news": _fetch_news_safe,
+        "insiders": _fetch_insiders_safe,
+        "quant": _build_quant_signal,
+    }
+    unknown = set(sources) - set(fetchers)
+    if unknown:
+        raise ValueError(f"Unknown staging sources: {sorted(unknown)}")
+
+    # Preserve first-seen order, drop duplicate tickers
+    tickers = list(dict.fromkeys(l.ticker for l in CURRENT_RUN_STATE.dossier.market_losers))
+    results: Dict[str, Dict[str, Any]] = {t: {} for t in tickers}
+    if not tickers:
+        return results
+
+    bulk_insiders = bool(as_of_date) and "insiders" in sources
+    per_ticker_sources = [s for s in sources if not (bulk_insiders and s == "insiders")]
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            pool.submit(fetchers[source], ticker, as_of_date): (ticker, source)
+            for ticker in tickers
+            for source in per_ticker_sources
+        }
+        bulk_future = (
+            pool.submit(get_bearish_insider_sales_bulk, tickers, as_of_date=as_of_date)
+            if bulk_insiders else None
+        )
+        for future in as_completed(futures):
+            ticker, source = futures[future]
+            results[ticker][source] = future.result()
+
+        if bulk_future is not None:
+            try:
+                reports = bulk_future.result()
+            except Exception as e:
+                logging.error(f"Bulk insider staging failed: {e}")
+                reports = {}
+            for ticker in tickers:
+                report = reports.get(ticker.upper())
+                if report is None:
+                    report = InsiderTradingReport(
+                        ticker=ticker,
+                        total_dollars_dumped=0.0,
+                        significant_sales=[],
+                        error_message="No bulk insider result"
+                    )
+                results[ticker]["insiders"] = report
+
+    dossier = CURRENT_RUN_STATE.dossier
+    for ticker in tickers:
+        if "news" in results[ticker]:
+            dossier.news_reports.append(results[ticker]["news"])
+        if "insiders" in results[ticker]:
+            dossier.insider_reports.append(results[ticker]["insiders"])
+        if results[ticker].get("quant") is not None:
+            dossier.quant_reports.append(results[ticker]["quant"])
+
+    return results
+
+
+def tool_stage_all_candidates(
+    as_of_date: str = "",
+    sources: str = "news,insiders,quant"
+) -> str:
+    """
+    AGENT INSTRUCTIONS:
+      • Call this tool once, after tool_fetch_bq_candidates, instead of calling
+        tool_stage_news / tool_stage_insiders / tool_stage_quant_data per ticker.
+      • Pass the same `as_of_date` you used in tool_fetch_bq_candidates.
+      • `sources` is a comma-separated subset of "news,insiders,quant"; only
+        those sources are fetched.
+      • Fetches the requested sources for every loaded ticker concurrently and
+        appends them to CURRENT_RUN_STATE.dossier.
+      • Returns the string: "Success: Staged news for TICKER1, TICKER2, …"
+
+    Example:
+      tool_stage_all_candidates(as_of_date="2023-06-01", sources="news")
+    """
+    requested = tuple(s.strip().lower() for s in sources.split(",") if s.strip())
+    results = stage_candidates_concurrently(as_of_date=as_of_date, sources=requested)
+    if not results:
+        return "No tickers loaded. Call tool_fetch_bq_candidates first."
+    return f"Success: Staged {', '.join(requested)} for {', '.join(results)}"
@@ -7,7 +7,8 @@ from datetime import datetime, timedelta
 from google.cloud import bigquery
 import os
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import bigquery
 
 # Configure destination from environment variables or defaults
@@ -15,6 +16,10 @@ PROJECT_ID = "datascience-projects"
 DATASET_ID = "finviz_blacklist"
 NEWS_TABLE_REF = f"{PROJECT_ID}.{DATASET_ID}.daily_news_context"
 
+# Squeeze enrichment: concurrent FMP requests (still bounded by the shared rate limiter)
+SQUEEZE_MAX_WORKERS = int(os.environ.get("SQUEEZE_MAX_WORKERS", "8"))
+SQUEEZE_REQUEST_TIMEOUT = 10
+
 from .schemas import (
     BiggestLosersReport,
     MarketLoser,
@@ -23,6 +28,9 @@ from .schemas import (
     InsiderTradingReport,
     InsiderTrade,
 )
+from .fmp_client import fmp_get_json, fmp_get_json_by_symbol, chunk_symbols, FMPResponseError
+from .bq_client import get_bq_client
+from .audit_sink import get_audit_sink
 
 
 # -----------------------------------------------------------------------------
@@ -48,7 +56,7 @@ def get_fmp_bigger_losers(
         logging.info(f"🔍 [get_fmp_bigger_losers] Historical mode: fetching losers for {as_of_date}, limit={limit}")
 
         try:
-            client = bigquery.Client(project="datascience-projects")
+            client = get_bq_client("datascience-projects")
             sql = """
                 SELECT ticker, price, change_pct, short_interest_pct, free_float, is_squeeze_risk
                 FROM `datascience-projects.finviz_blacklist.fmp_daily_losers`
@@ -114,14 +122,12 @@ def get_fmp_bigger_losers(
     url = f"https://financialmodelingprep.com/stable/biggest-losers?apikey={api_key}"
     logging.info("🚀 [Live] Fetching biggest losers from FMP")
     try:
-        response = requests.get(url, timeout=10)
-        logging.debug(f"📡 FMP response status: {response.status_code}")
-
-        if response.status_code != 200:
-            logging.warning(f"❌ FMP /biggest-losers returned {response.status_code}: {response.text[:200]}")
-            return BiggestLosersReport(losers=[], error_message=f"HTTP {response.status_code}")
+        try:
+            data = fmp_get_json(url)
+        except FMPResponseError as e:
+            logging.warning(f"❌ FMP /biggest-losers returned {e}")
+            return BiggestLosersReport(losers=[], error_message=f"HTTP {e.status_code}")
 
-        data = response.json()
         if not isinstance(data, list):
             logging.warning(f"⚠️ FMP /biggest-losers did not return a list: got {type(data)}")
             return BiggestLosersReport(losers=[], error_message="Invalid response format")
@@ -151,15 +157,15 @@ def get_fmp_bigger_losers(
 def log_news_context_to_bigquery(ticker: str, evaluation_date: str, news_items: List[Dict[str, Any]], 
                                  source_name: str = "FMPNews"):
     """
-    Utility function to instantly stream raw text evidence into BigQuery.
-    Inject this directly at the bottom of your news fetching tools!
+    Utility function to queue raw text evidence for BigQuery.
+    Rows go to the shared audit sink (audit_sink.py), which writes them in
+    batches from a background thread, so the calling tool never waits on BQ.
     """
     if not news_items:
         print(f"⚠️ [TOOL AUDIT] No news articles fetched for {ticker}. Skipping BigQuery logging.")
         return
 
     try:
-        bq_client = bigquery.Client(project=PROJECT_ID)
         rows_to_insert = []
         
         # Capture the exact network transaction time
@@ -181,12 +187,8 @@ def log_news_context_to_bigquery(ticker: str, evaluation_date: str, news_items:
             })
 
         if rows_to_insert:
-            print(f"📤 [TOOL AUDIT] Streaming {len(rows_to_insert)} raw news evidence rows to BigQuery for {ticker}...")
-            errors = bq_client.insert_rows_json(NEWS_TABLE_REF, rows_to_insert)
-            if errors:
-                print(f"❌ [TOOL AUDIT] BigQuery context logging errors occurred: {errors}")
-            else:
-                print(f"🎉 [TOOL AUDIT] Traceability verification successfully stored for {ticker}.")
+            print(f"📤 [TOOL AUDIT] Queued {len(rows_to_insert)} raw news evidence rows for BigQuery for {ticker}...")
+            get_audit_sink(NEWS_TABLE_REF, project=PROJECT_ID).enqueue(rows_to_insert)
     except Exception as e:
         print(f"💥 [TOOL AUDIT] Exception during BigQuery logging: {str(e)}")
 
@@ -246,14 +248,11 @@ def get_fmp_news(
     print(f"🚀 [DEBUG URL] get_fmp_news executing network fetch via:\n{url}")
 
     try:
-        response = requests.get(url, timeout=10)
-        
-        # Guard against bad HTTP responses completely
-        if response.status_code != 200:
-            error_msg = f"HTTP {response.status_code}: {response.text[:100]}"
-            return StockNewsReport(ticker=ticker, articles=[], error_message=error_msg)
-            
-        data = response.json() or []
+        try:
+            data = fmp_get_json(url, as_of_date=as_of_date or None) or []
+        except FMPResponseError as e:
+            # Guard against bad HTTP responses completely
+            return StockNewsReport(ticker=ticker, articles=[], error_message=str(e))
         
         # Guard against non-list structures (error dict responses from FMP)
         if not isinstance(data, list):
@@ -318,7 +317,7 @@ def get_bearish_insider_sales(
     Returns an InsiderTradingReport.
     """
     if as_of_date:
-        client = bigquery.Client(project="datascience-projects")
+        client = get_bq_client("datascience-projects")
         sql = """
           SELECT filing_date,
                  owner_name,
@@ -350,7 +349,7 @@ def get_bearish_insider_sales(
             f"?symbol={ticker}&apikey={api_key}"
         )
         try:
-            records = requests.get(url).json() or []
+            records = fmp_get_json(url) or []
         except Exception as e:
             logging.error(f"get_bearish_insider_sales error: {e}")
             return InsiderTradingReport(
@@ -364,9 +363,25 @@ def get_bearish_insider_sales(
         datetime.fromisoformat(as_of_date) if as_of_date else datetime.now()
     ) - timedelta(days=days_back)
 
+    return _summarize_insider_sales(ticker, records, cutoff, min_value)
+
+
+INSIDER_ROLES = ("CEO", "CFO", "COO", "PRESIDENT", "DIRECTOR")
+
+
+def _summarize_insider_sales(
+    ticker: str,
+    records: list,
+    cutoff: datetime,
+    min_value: float
+) -> InsiderTradingReport:
+    """
+    Apply the S-Sale / window / value / role filters to raw FMP dicts or
+    form4_master rows and build the InsiderTradingReport.
+    """
     total = 0.0
     sig: list[InsiderTrade] = []
-    roles = {"CEO","CFO","COO","PRESIDENT","DIRECTOR"}
+    roles = set(INSIDER_ROLES)
 
     for tr in records:
         # LIVE API dict path
@@ -425,9 +440,106 @@ def get_bearish_insider_sales(
 
 
 # -----------------------------------------------------------------------------
+def get_bearish_insider_sales_bulk(
+    tickers: List[str],
+    days_back: int = 180,
+    min_value: int = 250_000,
+    as_of_date: str | None = None
+) -> Dict[str, InsiderTradingReport]:
+    """
+    Batch version of get_bearish_insider_sales for a whole candidate list.
+
+    • Historical (as_of_date set): ONE BigQuery job over `form4_master` with
+      `ticker IN UNNEST(@tks)`; window, value and role filters run server-side
+      and rows are fanned back out into one report per ticker.
+    • Live (as_of_date=None): FMP has no multi-symbol insider endpoint, so this
+      falls back to get_bearish_insider_sales per ticker.
+
+    Returns {ticker: InsiderTradingReport} for every requested ticker.
+    """
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+    if not tickers:
+        return {}
+
+    if not as_of_date:
+        return {
+            t: get_bearish_insider_sales(t, days_back=days_back, min_value=min_value)
+            for t in tickers
+        }
+
+    sql = """
+      SELECT UPPER(ticker) AS ticker,
+             filing_date,
+             owner_name,
+             officer_title,
+             transaction_side,
+             shares,
+             price
+      FROM `datascience-projects.gcp_shareloader.form4_master`
+      WHERE ticker IN UNNEST(@tks)
+        AND filing_date BETWEEN
+            DATE_SUB(@dt, INTERVAL @db DAY) AND @dt
+        AND transaction_side = 'S'
+        AND IFNULL(shares, 0) * IFNULL(price, 0) >= @mv
+        AND REGEXP_CONTAINS(UPPER(IFNULL(officer_title, '')), @roles)
+    """
+    try:
+        client = get_bq_client("datascience-projects")
+        job = client.query(
+            sql,
+            job_config=bigquery.QueryJobConfig(
+                query_parameters=[
+                    bigquery.ArrayQueryParameter("tks", "STRING", tickers),
+                    bigquery.ScalarQueryParameter("dt", "DATE", as_of_date),
+                    bigquery.ScalarQueryParameter("db", "INT64", days_back),
+                    bigquery.ScalarQueryParameter("mv", "FLOAT64", float(min_value)),
+                    bigquery.ScalarQueryParameter("roles", "STRING", "|".join(INSIDER_ROLES)),
+                ]
+            ),
+        )
+        rows = list(job.result())
+    except Exception as e:
+        logging.error(f"get_bearish_insider_sales_bulk error: {e}")
+        return {
+            t: InsiderTradingReport(
+                ticker=t,
+                total_dollars_dumped=0.0,
+                significant_sales=[],
+                error_message=str(e)
+            )
+            for t in tickers
+        }
+
+    by_ticker: Dict[str, list] = {t: [] for t in tickers}
+    for row in rows:
+        tk = str(row.ticker).upper()
+        if tk in by_ticker:
+            by_ticker[tk].append(row)
+
+    cutoff = datetime.fromisoformat(as_of_date) - timedelta(days=days_back)
+    logging.info(f"📊 Bulk insider query: {len(rows)} row(s) across {len(tickers)} ticker(s)")
+    return {
+        t: _summarize_insider_sales(t, records, cutoff, min_value)
+        for t, records in by_ticker.items()
+    }
+
+
+# -----------------------------------------------------------------------------
+_FLOAT_DEFAULT = 999999999.0
+
+SHORT_INTEREST_URL = "https://financialmodelingprep.com/api/v4/stock-short-interest?symbol={symbols}&apikey={api_key}"
+SHARES_FLOAT_URL = "https://financialmodelingprep.com/api/v4/shares_float?symbol={symbols}&apikey={api_key}"
+
+
+def _first_float(rows: list, field: str, default: float) -> float:
+    raw = rows[0].get(field) if rows else None
+    return float(raw) if raw is not None else default
+
+
 def get_squeeze_metrics(
     ticker: str,
-    as_of_date: str | None = None
+    as_of_date: str | None = None,
+    timeout: float = SQUEEZE_REQUEST_TIMEOUT
 ) -> tuple[float, float]:
     """
     Fetch short interest % and free float.
@@ -441,31 +553,53 @@ def get_squeeze_metrics(
     if as_of_date:
         return 0.0, 0.0
 
-    short_pct  = 0.0
-    free_float = 999999999.0
-    api_key    = os.environ.get("FMP_API_KEY", "")
+    return get_squeeze_metrics_bulk([ticker], max_workers=1, timeout=timeout)[ticker]
 
-    try:
-        si = requests.get(
-            f"https://financialmodelingprep.com/api/v4/stock-short-interest"
-            f"?symbol={ticker}&apikey={api_key}"
-        ).json() or []
-        if si and isinstance(si, list):
-            raw = si[0].get("shortPercentOfFloat")
-            short_pct = float(raw) if raw is not None else 0.0
 
-        ff = requests.get(
-            f"https://financialmodelingprep.com/api/v4/shares_float"
-            f"?symbol={ticker}&apikey={api_key}"
-        ).json() or []
-        if ff and isinstance(ff, list):
-            raw = ff[0].get("freeFloat")
-            free_float = float(raw) if raw is not None else free_float
+def get_squeeze_metrics_bulk(
+    tickers: List[str],
+    max_workers: int = SQUEEZE_MAX_WORKERS,
+    timeout: float = SQUEEZE_REQUEST_TIMEOUT
+) -> Dict[str, tuple[float, float]]:
+    """
+    Live squeeze metrics for many tickers at once.
 
-    except Exception as e:
-        logging.warning(f"get_squeeze_metrics error: {e}")
+    Both endpoints are requested with comma-separated symbol lists
+    (MAX_SYMBOLS_PER_REQUEST per call), so 50 tickers cost two requests
+    instead of a hundred. The chunk requests run on a bounded thread pool
+    and go through the shared FMP rate limiter; `timeout` is per request.
+    A ticker whose request failed gets the same defaults as before
+    (0.0 short interest, 999999999.0 float).
+
+    Returns {ticker: (short_percent_of_float, free_float)}, keyed as passed in.
+    """
+    api_key = os.environ.get("FMP_API_KEY", "")
+    chunks = chunk_symbols(tickers)
+    short_rows: Dict[str, list] = {}
+    float_rows: Dict[str, list] = {}
+
+    endpoints = [(SHORT_INTEREST_URL, short_rows), (SHARES_FLOAT_URL, float_rows)]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = [
+            (pool.submit(
+                fmp_get_json_by_symbol,
+                url.replace("{api_key}", api_key), chunk, timeout=timeout
+            ), target)
+            for url, target in endpoints
+            for chunk in chunks
+        ]
+        for future, target in futures:
+            target.update(future.result())
 
-    return short_pct, free_float
+    metrics = {}
+    for ticker in tickers:
+        key = ticker.strip().upper()
+        if key not in short_rows or key not in float_rows:
+            logging.warning(f"get_squeeze_metrics error: no FMP response for {ticker}")
+        short_pct = _first_float(short_rows.get(key, []), "shortPercentOfFloat", 0.0)
+        free_float = _first_float(float_rows.get(key, []), "freeFloat", _FLOAT_DEFAULT)
+        metrics[ticker] = (short_pct, free_float)
+    return metrics
 
 
 # -----------------------------------------------------------------------------
@@ -493,7 +627,7 @@ def get_bq_short_candidates(
     # Step 1: Try BigQuery
     # -------------------------------
     try:
-        client = bigquery.Client(project="datascience-projects")
+        client = get_bq_client("datascience-projects")
         sql = """
           SELECT ticker, price, change_pct, short_interest_pct, free_float, is_squeeze_risk
           FROM `datascience-projects.finviz_blacklist.fmp_daily_losers`
@@ -530,6 +664,11 @@ def get_bq_short_candidates(
     # -------------------------------
     # Step 2: Fall back to FMP earning_calendar
     # -------------------------------
+    return _fallback_short_candidates(query_date, limit)
+
+
+def _fallback_short_candidates(query_date: str, limit: int) -> list[dict]:
+    """FMP earning_calendar fallback used when BigQuery has nothing for a date."""
     logging.warning(f"📡 [FALLBACK] No BQ data for {query_date} → falling back to FMP earning_calendar")
     try:
         fmp_losers = _fetch_from_fmp_earning_drop_fallback(query_date, limit)
@@ -561,6 +700,69 @@ def get_bq_short_candidates(
     return []
 
 
+def get_bq_short_candidates_range(
+    dates: List[str],
+    limit: int = 5
+) -> Dict[str, list[dict]]:
+    """
+    Range version of get_bq_short_candidates for backtests.
+
+    One BigQuery job ranks fmp_daily_losers by change_pct within each
+    DATE(scrape_date) and keeps the top `limit` per day. Only dates that come
+    back empty (or all dates, if the query fails) go to the FMP fallback.
+
+    Returns {date: [candidate dicts]} keyed by every requested date, in date order.
+    A date is None instead of [] when the BigQuery query failed and the
+    fallback found nothing either, i.e. no source actually answered for it.
+    """
+    dates = sorted(set(dates))
+    if not dates:
+        return {}
+
+    logging.info(f"🔍 [get_bq_short_candidates_range] {len(dates)} dates {dates[0]} → {dates[-1]}, limit={limit}")
+    by_date: Dict[str, Optional[list[dict]]] = {d: [] for d in dates}
+    bq_answered = False
+
+    try:
+        client = get_bq_client("datascience-projects")
+        sql = """
+          SELECT DATE(scrape_date) AS scan_date,
+                 ticker, price, change_pct, short_interest_pct, free_float, is_squeeze_risk
+          FROM `datascience-projects.finviz_blacklist.fmp_daily_losers`
+          WHERE DATE(scrape_date) BETWEEN @start AND @end
+            AND DATE(scrape_date) IN UNNEST(@dts)
+            AND price >= 5.0
+            AND change_pct IS NOT NULL
+          QUALIFY ROW_NUMBER() OVER (PARTITION BY DATE(scrape_date) ORDER BY change_pct ASC) <= @lim
+          ORDER BY scan_date, change_pct ASC
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter("start", "DATE", dates[0]),
+                bigquery.ScalarQueryParameter("end", "DATE", dates[-1]),
+                bigquery.ArrayQueryParameter("dts", "DATE", dates),
+                bigquery.ScalarQueryParameter("lim", "INT64", limit),
+            ]
+        )
+        for row in client.query(sql, job_config=job_config).result():
+            rec = dict(row)
+            scan_date = rec.pop("scan_date")
+            key = scan_date.strftime("%Y-%m-%d") if hasattr(scan_date, "strftime") else str(scan_date)
+            if key in by_date:
+                by_date[key].append(rec)
+        bq_answered = True
+        logging.info(f"✅ BQ range success: {sum(map(len, by_date.values()))} rows across "
+                     f"{sum(1 for v in by_date.values() if v)}/{len(dates)} dates")
+    except Exception as e:
+        logging.error(f"❌ BQ range query failed: {e}")
+
+    for d in dates:
+        if not by_date[d]:
+            fallback = _fallback_short_candidates(d, limit)
+            by_date[d] = fallback if (fallback or bq_answered) else None
+    return by_date
+
+
 # -----------------------------------------------------------------------------
 def _fetch_from_fmp_earning_drop_fallback(target_date: str, limit: int = 5) -> list[MarketLoser]:
     """
@@ -596,12 +798,12 @@ def _fetch_from_fmp_earning_drop_fallback(target_date: str, limit: int = 5) -> l
     logging.info(f"📡 [FMP Fallback] Scanning 7-day window: from={from_date} to={to_date}")
 
     try:
-        response = requests.get(url, timeout=10)
-        if response.status_code != 200:
-            logging.warning(f"❌ [FMP Fallback] Bad status: {response.status_code}")
+        try:
+            data = fmp_get_json(url, as_of_date=to_date)
+        except FMPResponseError as e:
+            logging.warning(f"❌ [FMP Fallback] Bad status: {e.status_code}")
             return []
 
-        data = response.json()
         if not isinstance(data, list):
             logging.warning(f"⚠️ [FMP Fallback] Expected list, got: {type(data)}")
             return []
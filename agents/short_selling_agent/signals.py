@@ -1,6 +1,7 @@
 import os
 import json
 import logging
+import argparse
 import requests
 from datetime import datetime, timedelta
 from typing import List
@@ -12,9 +13,12 @@ logger = logging.getLogger(__name__)
 # Import your tools safely from your package space
 try:
     import short_selling_agent.tools as tools
-    from short_selling_agent.tools import get_bq_short_candidates
+    from short_selling_agent.tools import get_bq_short_candidates, get_bq_short_candidates_range
 except ImportError:
     get_bq_short_candidates = None
+    get_bq_short_candidates_range = None
+
+from short_selling_agent.signal_store import DEFAULT_SIGNAL_STORE, SignalStore
 
 # -------------------------------
 # 🔧 Config
@@ -41,52 +45,71 @@ def generate_daily_backtest_dates(num_weeks: int = RECENT_WEEKS) -> List[str]:
     return dates
 
 
-def run_signal_pipeline():
+def run_signal_pipeline(store_dir: str = DEFAULT_SIGNAL_STORE, recompute: bool = False):
     """
     Main daily signal generation pipeline.
-    Queries your BigQuery structure day-by-day to capture true daily momentum.
+    Pulls the top daily losers for every not-yet-stored date in one BigQuery
+    range scan and appends one partition per date to the signal store.
+    The FMP fallback only runs for dates BigQuery has nothing for. Dates no
+    source answered for are not written, so an outage is retried next run.
     """
     dates = generate_daily_backtest_dates()
-    logger.info(f"🚀 Starting DAILY short-signal generation across {len(dates)} safe weekdays...")
-    
-    all_extracted_signals = []
+    store = SignalStore(store_dir)
+    pending = dates if recompute else [d for d in dates if not store.has_date(d)]
+    logger.info(f"🚀 Starting DAILY short-signal generation: {len(pending)} new of {len(dates)} safe weekdays...")
 
-    for target_date in dates:
-        logger.info(f"📅 Scanning Date: {target_date}")
+    if not pending:
+        logger.info(f"✅ Signal store '{store_dir}' is already up to date.")
+        return
+
+    if get_bq_short_candidates_range is None:
+        logger.error("❌ short_selling_agent tools are not available in your current environment.")
+        return
 
-        if get_bq_short_candidates is None:
-            logger.error("❌ short_selling_agent tools are not available in your current environment.")
-            return
-
-        try:
-            # Fetch candidates for this specific weekday from BigQuery
-            candidates = get_bq_short_candidates(limit=5, as_of_date=target_date)
-
-            if candidates:
-                tickers = [c["ticker"] for c in candidates]
-                logger.info(f"  ✅ Signals Found: {tickers}")
-                
-                # Format and append to our master list
-                for c in candidates:
-                    all_extracted_signals.append({
-                        "ticker": c["ticker"],
-                        "date": target_date,
-                        "price": c.get("price"),
-                        "conviction_score": c.get("conviction_score", 8)
-                    })
-            else:
-                logger.info(f"  📥 No actionable big drops found on {target_date}")
-
-        except Exception as e:
-            logger.error(f"❌ Error processing data matrix for {target_date}: {e}")
-
-    # Automatically overwrite your target JSON storage file
-    output_file = "signals.json"
-    with open(output_file, "w") as f:
-        json.dump(all_extracted_signals, f, indent=4)
-        
-    logger.info(f"\n🎯 Execution complete. Generated {len(all_extracted_signals)} fresh weekday signals into '{output_file}'.")
+    try:
+        candidates_by_date = get_bq_short_candidates_range(pending, limit=5)
+    except Exception as e:
+        logger.error(f"❌ Error running the range scan for {pending[0]} → {pending[-1]}: {e}")
+        return
+
+    today = datetime.now().strftime(DATE_FORMAT)
+    total_signals = 0
+
+    for target_date in pending:
+        logger.info(f"📅 Scanning Date: {target_date}")
+        candidates = candidates_by_date.get(target_date)
+
+        if candidates is None:
+            # Neither BigQuery nor the fallback answered; an empty partition would
+            # mark the date as computed and it would never be retried
+            logger.warning(f"  ⚠️ No source answered for {target_date}; leaving it for the next run")
+            continue
+        if candidates:
+            tickers = [c["ticker"] for c in candidates]
+            logger.info(f"  ✅ Signals Found: {tickers}")
+        elif target_date >= today:
+            # Today's losers may not be loaded yet; leave the date open for the next run
+            logger.info(f"  ⏭️ No data yet for {target_date}; not marking it as computed")
+            continue
+        else:
+            logger.info(f"  📥 No actionable big drops found on {target_date}")
+
+        total_signals += store.write_date(target_date, (
+            {
+                "ticker": c["ticker"],
+                "date": target_date,
+                "price": c.get("price"),
+                "conviction_score": c.get("conviction_score", 8)
+            }
+            for c in candidates
+        ))
+
+    logger.info(f"\n🎯 Execution complete. Appended {total_signals} fresh weekday signals into '{store_dir}'.")
 
 
 if __name__ == "__main__":
-    run_signal_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate short-signal partitions for the backtester")
+    parser.add_argument("--store", default=DEFAULT_SIGNAL_STORE)
+    parser.add_argument("--recompute", action="store_true", help="Rewrite dates that are already stored")
+    args = parser.parse_args()
+    run_signal_pipeline(store_dir=args.store, recompute=args.recompute)
@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_fmp_cache(monkeypatch, tmp_path):
+    """Give every test its own empty on-disk FMP response cache."""
+    monkeypatch.setenv("FMP_CACHE_PATH", str(tmp_path / "fmp_cache.sqlite"))
+    yield
+
+
+@pytest.fixture(autouse=True)
+def fresh_bq_clients():
+    """Drop pooled BigQuery clients so each test sees its own patched Client."""
+    from short_selling_agent.bq_client import reset_bq_clients
+    reset_bq_clients()
+    yield
+    reset_bq_clients()
@@ -0,0 +1,75 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+import short_selling_agent.audit_sink as audit_sink
+from short_selling_agent.audit_sink import BigQueryAuditSink
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = MagicMock()
+    client.insert_rows_json.return_value = []
+    monkeypatch.setattr(audit_sink, "get_bq_client", lambda project=None: client)
+    return client
+
+
+def _sent_rows(client):
+    return [row for c in client.insert_rows_json.call_args_list for row in c.args[1]]
+
+
+def test_enqueue_does_not_write_inline(fake_client):
+    sink = BigQueryAuditSink("p.d.t", max_batch_rows=100, flush_interval=60)
+    sink.enqueue([{"i": 1}, {"i": 2}])
+
+    fake_client.insert_rows_json.assert_not_called()
+    sink.close()
+    assert _sent_rows(fake_client) == [{"i": 1}, {"i": 2}]
+
+
+def test_size_threshold_wakes_writer(fake_client):
+    sink = BigQueryAuditSink("p.d.t", max_batch_rows=2, flush_interval=60)
+    sink.enqueue([{"i": 1}, {"i": 2}, {"i": 3}])
+
+    deadline = time.monotonic() + 2
+    while len(_sent_rows(fake_client)) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    batches = [len(c.args[1]) for c in fake_client.insert_rows_json.call_args_list]
+    assert batches == [2, 1]
+    sink.close()
+
+
+def test_time_threshold_flushes_small_batches(fake_client):
+    sink = BigQueryAuditSink("p.d.t", max_batch_rows=100, flush_interval=0.05)
+    sink.enqueue([{"i": 1}])
+
+    deadline = time.monotonic() + 2
+    while not fake_client.insert_rows_json.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert _sent_rows(fake_client) == [{"i": 1}]
+    sink.close()
+
+
+def test_load_mode_uses_load_jobs(fake_client):
+    sink = BigQueryAuditSink("p.d.t", write_mode="load", flush_interval=60)
+    sink.enqueue([{"i": 1}])
+    sink.close()
+
+    fake_client.insert_rows_json.assert_not_called()
+    rows, table = fake_client.load_table_from_json.call_args.args
+    assert rows == [{"i": 1}] and table == "p.d.t"
+
+
+def test_write_errors_are_swallowed(fake_client):
+    fake_client.insert_rows_json.side_effect = RuntimeError("quota")
+    sink = BigQueryAuditSink("p.d.t", flush_interval=60)
+    sink.enqueue([{"i": 1}])
+    sink.close()  # must not raise
+
+
+def test_invalid_write_mode_rejected():
+    with pytest.raises(ValueError):
+        BigQueryAuditSink("p.d.t", write_mode="storage")
@@ -0,0 +1,123 @@
+import pandas as pd
+import pytest
+
+import short_selling_agent.backtest_engine as engine
+from short_selling_agent.backtest_engine import (
+    build_trade_windows,
+    preload_price_history,
+    run_engine,
+    simulate_exits,
+)
+
+
+def _history(bars):
+    """bars: list of (date, open, high, low, close)."""
+    df = pd.DataFrame(bars, columns=["date", "open", "high", "low", "close"])
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+# Day 0 close 10, entry at day-1 open 10 → stop 9.5, target 10.8
+PRICES = {
+    "GAP": _history([("2024-01-01", 10, 10, 10, 10), ("2024-01-02", 10, 10.2, 9.9, 10),
+                     ("2024-01-03", 9.0, 9.1, 8.8, 9.0)]),
+    "STOP": _history([("2024-01-01", 10, 10, 10, 10), ("2024-01-02", 10, 10.2, 9.4, 9.6)]),
+    "WIN": _history([("2024-01-01", 10, 10, 10, 10), ("2024-01-02", 10, 10.3, 9.8, 10.1),
+                     ("2024-01-03", 11.0, 11.2, 10.9, 11.1)]),
+    "FLAT": _history([("2024-01-01", 10, 10, 10, 10), ("2024-01-02", 10, 10.2, 9.8, 10.1),
+                      ("2024-01-03", 10.1, 10.3, 9.9, 10.2)]),
+    "PENNY": _history([("2024-01-01", 4, 4, 4, 4), ("2024-01-02", 4, 4.1, 3.9, 4)]),
+}
+
+
+def _signals(*tickers, date="2024-01-01"):
+    return [{"ticker": t, "date": date, "conviction_score": 8} for t in tickers]
+
+
+def test_exit_rules_match_original_loop():
+    windows = build_trade_windows(_signals("GAP", "STOP", "WIN", "FLAT", "PENNY"), PRICES)
+    trades = simulate_exits(windows, stop_loss_pct=5.0, take_profit_pct=8.0).set_index("ticker")
+
+    assert "PENNY" not in trades.index
+    assert trades.loc["GAP", "exit_reason"] == "gap_stop"
+    assert trades.loc["GAP", "pnl_pct"] == pytest.approx(-10.0)
+    assert trades.loc["STOP", "exit_reason"] == "stop"
+    assert trades.loc["STOP", "pnl_pct"] == pytest.approx(-5.0)
+    # Gapped above the 10.8 target → filled at the 11.0 open
+    assert trades.loc["WIN", "exit_reason"] == "target"
+    assert trades.loc["WIN", "pnl_pct"] == pytest.approx(10.0)
+    assert trades.loc["FLAT", "exit_reason"] == "time"
+    assert trades.loc["FLAT", "pnl_pct"] == pytest.approx(2.0)
+    assert trades.loc["FLAT", "exit_date"] == pd.Timestamp("2024-01-08")
+
+
+def test_wider_stop_changes_outcome_without_refetch():
+    windows = build_trade_windows(_signals("STOP"), PRICES)
+    tight = simulate_exits(windows, stop_loss_pct=5.0)
+    wide = simulate_exits(windows, stop_loss_pct=7.0)
+
+    assert tight["exit_reason"].iloc[0] == "stop"
+    assert wide["exit_reason"].iloc[0] == "time"
+
+
+def test_open_position_blocks_same_ticker_and_capital_compounds():
+    signals = _signals("FLAT") + _signals("FLAT", date="2024-01-02")
+    result = run_engine(build_trade_windows(signals, PRICES), initial_capital=10000.0)
+
+    ledger = result["trades"]
+    assert len(ledger) == 1
+    assert ledger["allocated_capital"].iloc[0] == pytest.approx(300.0)
+    assert result["stats"]["final_capital"] == pytest.approx(10006.0)
+    assert result["stats"]["win_rate_pct"] == 100.0
+
+
+def test_preload_fetches_one_range_per_ticker_and_logs_failures(monkeypatch):
+    calls = []
+
+    def fake_fmp(url, as_of_date=None):
+        calls.append(url)
+        if "BAD" in url:
+            raise engine.FMPResponseError(500, "boom")
+        return {"historical": [{"date": "2024-01-02", "open": 1, "high": 1, "low": 1, "close": 1},
+                               {"date": "2024-01-01", "open": 1, "high": 1, "low": 1, "close": 1}]}
+
+    monkeypatch.setattr(engine, "fmp_get_json", fake_fmp)
+    signals = _signals("AAA") + _signals("AAA", date="2024-02-01") + _signals("BAD")
+    prices = preload_price_history(signals, api_key="k", hold_days=7)
+
+    assert sorted(prices) == ["AAA"]
+    assert list(prices["AAA"]["date"]) == [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-02")]
+    aaa_calls = [u for u in calls if "/AAA?" in u]
+    assert len(aaa_calls) == 1
+    assert "from=2024-01-01&to=2024-02-08" in aaa_calls[0]
+
+
+def test_empty_windows():
+    result = run_engine(build_trade_windows([], PRICES))
+    assert result["stats"]["total_trades"] == 0
+
+
+def test_sweep_ranks_every_combination():
+    signals = _signals("GAP", "STOP", "WIN", "FLAT")
+    grid = {"stop_loss_pct": [5.0, 12.0], "take_profit_pct": [8.0, 20.0]}
+    results = engine.sweep_parameters(signals, PRICES, grid, max_workers=1)
+
+    assert len(results) == 4
+    assert list(results["rank"]) == [1, 2, 3, 4]
+    assert results["final_capital"].is_monotonic_decreasing
+    single = run_engine(build_trade_windows(signals, PRICES), stop_loss_pct=12.0, take_profit_pct=8.0)
+    row = results[(results.stop_loss_pct == 12.0) & (results.take_profit_pct == 8.0)].iloc[0]
+    assert row["final_capital"] == pytest.approx(single["stats"]["final_capital"])
+
+
+def test_sweep_process_pool_matches_in_process():
+    signals = _signals("GAP", "STOP", "WIN", "FLAT")
+    grid = {"stop_loss_pct": [5.0, 7.0], "hold_days": [1, 7]}
+    serial = engine.sweep_parameters(signals, PRICES, grid, max_workers=1)
+    pooled = engine.sweep_parameters(signals, PRICES, grid, max_workers=2)
+    pd.testing.assert_frame_equal(serial, pooled)
+
+
+def test_expand_grid_rejects_unknown_parameters():
+    with pytest.raises(ValueError):
+        engine.expand_grid({"trailing_stop": [1]})
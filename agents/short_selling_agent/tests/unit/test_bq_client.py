@@ -0,0 +1,71 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+import short_selling_agent.bq_client as bq_client
+from short_selling_agent.bq_client import get_bq_client, warm_up_bq_clients
+
+
+@pytest.fixture
+def client_factory(monkeypatch):
+    created = []
+
+    def _factory(project=None):
+        client = MagicMock(name=f"Client({project})")
+        client.project = project
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(bq_client.bigquery, "Client", _factory)
+    return created
+
+
+def test_client_is_shared_per_project(client_factory):
+    a1 = get_bq_client("proj-a")
+    a2 = get_bq_client("proj-a")
+    b = get_bq_client("proj-b")
+
+    assert a1 is a2
+    assert a1 is not b
+    assert len(client_factory) == 2
+
+
+def test_connection_pool_is_resized(client_factory, monkeypatch):
+    monkeypatch.setenv("BQ_POOL_SIZE", "32")
+    client = get_bq_client("proj-a")
+
+    scheme, adapter = client._http.mount.call_args.args
+    assert scheme == "https://"
+    assert adapter._pool_maxsize == 32
+
+
+def test_concurrent_first_use_creates_one_client(client_factory):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_bq_client("proj-a")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(client_factory) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_failed_construction_is_not_cached(monkeypatch):
+    def bad_client(*args, **kwargs):
+        raise RuntimeError("no credentials")
+
+    monkeypatch.setattr(bq_client.bigquery, "Client", bad_client)
+    with pytest.raises(RuntimeError):
+        get_bq_client("proj-a")
+    assert bq_client._CLIENTS == {}
+
+
+def test_warm_up_runs_probe_and_swallows_errors(client_factory):
+    warm_up_bq_clients(["proj-a"])
+    client_factory[0].query.assert_called_once_with("SELECT 1")
+
+    client_factory[0].query.side_effect = RuntimeError("denied")
+    warm_up_bq_clients(["proj-a"])  # must not raise
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from catalyst_job import historical_catalyst_backfill as backfill
+from catalyst_job.historical_catalyst_backfill import ShardManifest, split_date_range
+
+
+def test_month_shards_are_inclusive_and_contiguous():
+    assert split_date_range("2024-01-15", "2024-03-10") == [
+        ("2024-01-15", "2024-01-31"),
+        ("2024-02-01", "2024-02-29"),
+        ("2024-03-01", "2024-03-10"),
+    ]
+
+
+def test_week_shards():
+    assert split_date_range("2024-01-01", "2024-01-10", "week") == [
+        ("2024-01-01", "2024-01-07"),
+        ("2024-01-08", "2024-01-10"),
+    ]
+    with pytest.raises(ValueError):
+        split_date_range("2024-01-01", "2024-01-10", "year")
+
+
+def test_failed_shard_is_retried_and_done_shards_skipped(tmp_path, monkeypatch):
+    manifest_path = str(tmp_path / "manifest.json")
+    monkeypatch.setattr(backfill.bigquery, "Client", lambda project=None: object())
+    monkeypatch.setattr(backfill.catalyst_storage, "ensure_catalyst_table", lambda client: None)
+    calls = []
+    attempts = {"feb": 0}
+
+    def flaky_shard(shard, client=None):
+        calls.append(shard)
+        if shard[0] == "2024-02-01":
+            attempts["feb"] += 1
+            if attempts["feb"] == 1:
+                raise RuntimeError("HTTP 503")
+        return 10
+
+    monkeypatch.setattr(backfill, "run_shard", flaky_shard)
+
+    assert backfill.run_historical_pipeline("2024-01-01", "2024-03-31", workers=2,
+                                            manifest_path=manifest_path) is False
+    done = json.load(open(manifest_path))["completed"]
+    assert sorted(done) == ["2024-01-01..2024-01-31", "2024-03-01..2024-03-31"]
+
+    calls.clear()
+    assert backfill.run_historical_pipeline("2024-01-01", "2024-03-31", workers=2,
+                                            manifest_path=manifest_path) is True
+    assert calls == [("2024-02-01", "2024-02-29")]
+    assert ShardManifest(manifest_path).total_rows(split_date_range("2024-01-01", "2024-03-31")) == 30
@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from catalyst_job import catalyst_storage
+
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    client.query.return_value.num_dml_affected_rows = 3
+    return client
+
+
+def _rows(n):
+    return ({"nct_id": f"NCT{i}", "status": "TERMINATED", "last_update": "2024-01-02",
+             "scraped_at": "2024-01-02 00:00:00 UTC"} for i in range(n))
+
+
+def test_stream_stages_then_merges_on_key(client):
+    inserted = catalyst_storage.upsert_catalyst_stream(_rows(5), client=client)
+
+    assert inserted == 3
+    staging_ref = client.create_table.call_args.args[0].reference
+    load_targets = {c.args[1] for c in client.load_table_from_json.call_args_list}
+    assert load_targets == {f"{staging_ref.project}.{staging_ref.dataset_id}.{staging_ref.table_id}"}
+
+    merge_sql = client.query.call_args.args[0]
+    assert "MERGE `datascience-projects.gcp_shareloader.biotech_catalysts` T" in merge_sql
+    assert "PARTITION BY nct_id, status, last_update" in merge_sql
+    assert "WHEN MATCHED" not in merge_sql
+    client.delete_table.assert_called_once()
+
+
+def test_failed_extraction_merges_nothing_and_drops_staging(client):
+    def broken_stream():
+        yield from _rows(2)
+        raise RuntimeError("HTTP 503")
+
+    with pytest.raises(RuntimeError):
+        catalyst_storage.upsert_catalyst_stream(broken_stream(), client=client)
+
+    client.query.assert_not_called()
+    client.delete_table.assert_called_once()
+
+
+def test_new_table_is_partitioned_and_clustered(client):
+    client.get_table.side_effect = catalyst_storage.NotFound("missing")
+    catalyst_storage.ensure_catalyst_table(client)
+
+    table = client.create_table.call_args.args[0]
+    assert table.time_partitioning.field == "scraped_at"
+    assert table.clustering_fields == ["nct_id"]
+
+
+def test_existing_table_gains_last_update_column(client):
+    existing = MagicMock()
+    existing.schema = catalyst_storage.CATALYST_SCHEMA[:-1]
+    client.get_table.return_value = existing
+    client.update_table.return_value = existing
+
+    catalyst_storage.ensure_catalyst_table(client)
+
+    assert [f.name for f in existing.schema][-1] == "last_update"
+    client.update_table.assert_called_once_with(existing, ["schema"])
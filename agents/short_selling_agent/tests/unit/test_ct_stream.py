@@ -0,0 +1,89 @@
+import threading
+from unittest.mock import MagicMock
+
+from catalyst_job import ct_stream
+from catalyst_job.ct_stream import ChunkedBigQueryLoader, iter_parsed_studies, iter_study_pages
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = ""
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Serves three pages keyed by pageToken and records every request."""
+    PAGES = {
+        None: {"studies": [{"id": 1}, {"id": 2}], "nextPageToken": "t2"},
+        "t2": {"studies": [{"id": 3}], "nextPageToken": "t3"},
+        "t3": {"studies": [{"id": 4}]},
+    }
+
+    def __init__(self):
+        self.requests = []
+        self.fetched = {token: threading.Event() for token in self.PAGES}
+
+    def get(self, url, params=None, timeout=None):
+        token = params.get("pageToken")
+        self.requests.append(dict(params))
+        self.fetched[token].set()
+        return FakeResponse(self.PAGES[token])
+
+    def close(self):
+        pass
+
+
+def test_pages_use_page_token_and_stop_on_last_page():
+    session = FakeSession()
+    pages = list(iter_study_pages({"query.term": "x"}, session=session))
+
+    assert [[s["id"] for s in page] for page in pages] == [[1, 2], [3], [4]]
+    assert [r.get("pageToken") for r in session.requests] == [None, "t2", "t3"]
+    assert all(r["pageSize"] == ct_stream.PAGE_SIZE for r in session.requests)
+
+
+def test_next_page_is_prefetched_while_caller_holds_current():
+    session = FakeSession()
+    pages = iter_study_pages({"query.term": "x"}, session=session)
+
+    next(pages)  # caller is now "parsing" page 1
+    assert session.fetched["t2"].wait(timeout=2)
+    pages.close()
+
+
+def test_non_200_stops_the_stream():
+    session = MagicMock()
+    session.get.return_value = FakeResponse({}, status_code=503)
+    assert list(iter_study_pages({"query.term": "x"}, session=session)) == []
+
+
+def test_loader_ships_bounded_chunks_and_waits_on_close():
+    client = MagicMock()
+    loader = ChunkedBigQueryLoader("p.d.t", schema=[], project="p", chunk_rows=2, client=client)
+
+    loader.extend(iter_parsed_studies({"query.term": "x"}, lambda s: {"nct_id": s["id"]},
+                                      session=FakeSession()))
+    # Two full chunks went out while streaming; the tail waits for close()
+    assert [len(c.args[0]) for c in client.load_table_from_json.call_args_list] == [2, 2]
+
+    assert loader.close() == 4
+    assert client.load_table_from_json.return_value.result.call_count == 2
+
+
+def test_failed_load_job_is_reported_not_counted():
+    client = MagicMock()
+    client.load_table_from_json.return_value.result.side_effect = RuntimeError("bad schema")
+    loader = ChunkedBigQueryLoader("p.d.t", schema=[], project="p", chunk_rows=10, client=client)
+    loader.add({"nct_id": "N1"})
+    assert loader.close() == 0
+
+
+def test_parse_ct_date_handles_partial_precision():
+    assert ct_stream.parse_ct_date("2024-05-17") == "2024-05-17"
+    assert ct_stream.parse_ct_date("2024-05") == "2024-05-01"
+    assert ct_stream.parse_ct_date("2024") == "2024-01-01"
+    assert ct_stream.parse_ct_date(None) is None
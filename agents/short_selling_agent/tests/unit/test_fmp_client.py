@@ -0,0 +1,179 @@
+import pytest
+import requests
+
+import short_selling_agent.fmp_client as fmp_client
+from short_selling_agent.fmp_client import (
+    FMPCache,
+    FMPResponseError,
+    chunk_symbols,
+    fmp_get_json,
+    fmp_get_json_by_symbol,
+    normalize_url,
+    ttl_for,
+)
+
+
+class DummyResponse:
+    def __init__(self, payload=None, status_code=200, text=""):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture
+def counting_get(monkeypatch):
+    calls = []
+
+    def _fake(url, *args, **kwargs):
+        calls.append(url)
+        return DummyResponse([{"symbol": "ABC", "n": len(calls)}])
+
+    monkeypatch.setattr(requests, "get", _fake)
+    return calls
+
+
+def test_normalize_url_drops_api_key_and_sorts_params():
+    a = normalize_url("https://FinancialModelingPrep.com/api/v4/x?symbol=ABC&apikey=SECRET&from=1")
+    b = normalize_url("https://financialmodelingprep.com/api/v4/x?from=1&apikey=OTHER&symbol=ABC")
+    assert a == b
+    assert "SECRET" not in a and "apikey" not in a
+
+
+def test_ttl_for_historical_never_expires():
+    assert ttl_for("https://x/api/v4/shares_float?symbol=A", "2020-01-02") is None
+    assert ttl_for("https://x/api/v4/shares_float?symbol=A") == fmp_client.LIVE_TTLS["shares_float"]
+
+
+def test_second_call_is_served_from_cache(counting_get):
+    first = fmp_get_json("https://x/api/v4/insider-trading?symbol=ABC&apikey=K1")
+    second = fmp_get_json("https://x/api/v4/insider-trading?symbol=ABC&apikey=K2")
+
+    assert len(counting_get) == 1
+    assert first == second
+
+
+def test_as_of_window_is_part_of_key(counting_get):
+    fmp_get_json("https://x/api/v3/historical-price-full/ABC?apikey=K", as_of_date="2024-01-02")
+    fmp_get_json("https://x/api/v3/historical-price-full/ABC?apikey=K", as_of_date="2024-01-03")
+    fmp_get_json("https://x/api/v3/historical-price-full/ABC?apikey=K", as_of_date="2024-01-02")
+
+    assert len(counting_get) == 2
+
+
+def test_non_200_raises_and_is_not_cached(monkeypatch):
+    responses = [DummyResponse({"Error": "boom"}, status_code=500, text="Server Error"),
+                 DummyResponse([1, 2, 3])]
+    monkeypatch.setattr(requests, "get", lambda url, *args, **kwargs: responses.pop(0))
+
+    with pytest.raises(FMPResponseError) as exc:
+        fmp_get_json("https://x/api/v4/shares_float?symbol=ABC")
+    assert exc.value.status_code == 500
+
+    assert fmp_get_json("https://x/api/v4/shares_float?symbol=ABC") == [1, 2, 3]
+
+
+def test_cache_can_be_disabled(monkeypatch, counting_get):
+    monkeypatch.setenv("FMP_CACHE_PATH", "")
+    fmp_get_json("https://x/api/v4/shares_float?symbol=ABC")
+    fmp_get_json("https://x/api/v4/shares_float?symbol=ABC")
+    assert len(counting_get) == 2
+
+
+def test_unwritable_cache_path_disables_cache(tmp_path, monkeypatch, counting_get):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    monkeypatch.setenv("FMP_CACHE_PATH", str(blocker / "fmp_cache.sqlite"))
+
+    assert fmp_client.get_fmp_cache() is None
+    assert fmp_get_json("https://x/api/v4/shares_float?symbol=ABC") == [{"symbol": "ABC", "n": 1}]
+    fmp_get_json("https://x/api/v4/shares_float?symbol=ABC")
+    assert len(counting_get) == 2
+
+
+def test_fmp_error_body_is_returned_but_not_cached(monkeypatch):
+    responses = [DummyResponse({"Error Message": "Limit Reach"}), DummyResponse([{"symbol": "ABC"}])]
+    monkeypatch.setattr(requests, "get", lambda url, *args, **kwargs: responses.pop(0))
+    url = "https://x/api/v4/shares_float?symbol=ABC"
+
+    assert fmp_get_json(url, as_of_date="2024-01-02") == {"Error Message": "Limit Reach"}
+    assert fmp_get_json(url, as_of_date="2024-01-02") == [{"symbol": "ABC"}]
+
+
+def test_empty_historical_result_gets_short_ttl(monkeypatch):
+    stored = []
+    monkeypatch.setattr(fmp_client.FMPCache, "set", lambda self, key, value, ttl: stored.append(ttl))
+    bodies = [[], {"symbol": "ABC", "historical": []}, [{"symbol": "ABC"}]]
+    monkeypatch.setattr(requests, "get", lambda url, *args, **kwargs: DummyResponse(bodies.pop(0)))
+
+    for _ in range(3):
+        fmp_get_json("https://x/api/v3/historical-price-full/ABC?apikey=K", as_of_date="2024-01-02")
+
+    assert stored == [fmp_client.EMPTY_RESULT_TTL, fmp_client.EMPTY_RESULT_TTL, None]
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    cache = FMPCache(str(tmp_path / "c.sqlite"))
+    now = [1_000.0]
+    monkeypatch.setattr(fmp_client.time, "time", lambda: now[0])
+
+    cache.set("k", {"v": 1}, ttl=10)
+    assert cache.get("k") == {"v": 1}
+    now[0] += 11
+    assert cache.get("k") is None
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path, monkeypatch):
+    cache = FMPCache(str(tmp_path / "c.sqlite"), max_bytes=60)
+    now = [1_000.0]
+    monkeypatch.setattr(fmp_client.time, "time", lambda: now[0])
+
+    for key in ("a", "b", "c"):
+        cache.set(key, "x" * 15, ttl=None)
+        now[0] += 1
+    cache.get("a")  # refresh "a" so "b" is the oldest
+    now[0] += 1
+    cache.set("d", "x" * 15, ttl=None)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("d") is not None
+
+
+def test_chunk_symbols_dedupes_and_splits():
+    assert chunk_symbols(["abc", "ABC", "def", " ghi ", ""], size=2) == [["ABC", "DEF"], ["GHI"]]
+
+
+def test_by_symbol_groups_rows_and_skips_failed_chunks(monkeypatch):
+    calls = []
+
+    def _fake(url, *args, **kwargs):
+        calls.append(url)
+        if "CCC" in url:
+            return DummyResponse(status_code=500)
+        return DummyResponse([{"symbol": "AAA", "v": 1}, {"symbol": "AAA", "v": 2}])
+
+    monkeypatch.setattr(requests, "get", _fake)
+    rows = fmp_get_json_by_symbol(
+        "https://x/api/v3/quote/{symbols}?apikey=K", ["aaa", "BBB", "CCC"], max_symbols=2
+    )
+
+    assert len(calls) == 2
+    assert "quote/AAA,BBB" in calls[0]
+    assert rows == {"AAA": [{"symbol": "AAA", "v": 1}, {"symbol": "AAA", "v": 2}], "BBB": []}
+
+
+def test_by_symbol_leaves_out_chunks_answered_with_an_error_body(monkeypatch):
+    def _fake(url, *args, **kwargs):
+        if "CCC" in url:
+            return DummyResponse({"Error Message": "Limit Reach. Please upgrade your plan"})
+        return DummyResponse([{"symbol": "AAA", "v": 1}])
+
+    monkeypatch.setattr(requests, "get", _fake)
+    rows = fmp_get_json_by_symbol(
+        "https://x/api/v4/shares_float?symbol={symbols}&apikey=K", ["AAA", "BBB", "CCC", "DDD"], max_symbols=2
+    )
+
+    assert rows == {"AAA": [{"symbol": "AAA", "v": 1}], "BBB": []}
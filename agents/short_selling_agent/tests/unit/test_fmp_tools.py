@@ -0,0 +1,133 @@
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+
+os.environ.setdefault("FMP_API_KEY", "DUMMY")
+
+import short_selling_agent.fmp_tools as fmp_tools
+from short_selling_agent.fmp_tools import (
+    INDICATOR_SPECS,
+    get_all_data_for_ticker,
+    get_technical_indicators,
+)
+
+AS_OF_DATE = "2024-06-28"
+
+
+def make_history(days=300):
+    """Synthetic FMP /historical-price-full payload, newest first like the API."""
+    rng = np.random.default_rng(7)
+    end = datetime.strptime(AS_OF_DATE, "%Y-%m-%d")
+    close = 100 + np.cumsum(rng.normal(0, 1.5, days))
+    rows = []
+    for i in range(days):
+        c = float(close[i])
+        rows.append({
+            "date": (end - timedelta(days=days - 1 - i)).strftime("%Y-%m-%d"),
+            "open": c + 0.3,
+            "high": c + 1.0,
+            "low": c - 1.0,
+            "close": c,
+            "adjClose": c,
+            "volume": 1_000_000 + i,
+        })
+    return {"historical": list(reversed(rows))}
+
+
+@pytest.fixture
+def fake_get(monkeypatch):
+    calls = []
+
+    def _fake(url, *args, **kwargs):
+        calls.append(url)
+        if "/historical-price-full/" in url:
+            return make_history()
+        return []
+
+    monkeypatch.setattr(fmp_tools, "_get", _fake)
+    return calls
+
+
+def test_all_data_downloads_history_once(fake_get):
+    data = get_all_data_for_ticker("ABC", AS_OF_DATE, lookback_days=365)
+
+    history_calls = [u for u in fake_get if "/historical-price-full/" in u]
+    assert len(history_calls) == 1
+    assert set(data["indicators"]) == set(INDICATOR_SPECS)
+    assert data["price"][-1]["date"] == AS_OF_DATE
+
+
+def _reference_indicator(history, indicator_type, period_length):
+    """The pre-change per-indicator implementation, kept as an independent oracle."""
+    df = pd.DataFrame(history)
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.sort_values("date").reset_index(drop=True)
+    df = df[df["date"] <= pd.to_datetime(AS_OF_DATE)]
+
+    if indicator_type == "rsi":
+        df["value"] = ta.momentum.RSIIndicator(df["adjClose"], window=period_length).rsi()
+    elif indicator_type == "adx":
+        df["value"] = ta.trend.ADXIndicator(df["high"], df["low"], df["close"], window=period_length).adx()
+    elif indicator_type == "sma":
+        df["value"] = df["adjClose"].rolling(period_length).mean()
+    elif indicator_type == "bollinger_upper":
+        df["value"] = ta.volatility.BollingerBands(df["adjClose"], window=20, window_dev=2).bollinger_hband()
+    elif indicator_type == "bollinger_lower":
+        df["value"] = ta.volatility.BollingerBands(df["adjClose"], window=20, window_dev=2).bollinger_lband()
+
+    return [
+        {"date": row["date"].strftime("%Y-%m-%d"), "value": float(row["value"]) if pd.notna(row["value"]) else None}
+        for _, row in df.iloc[period_length:].iterrows()
+    ]
+
+
+def test_all_data_matches_per_indicator_reference(fake_get):
+    data = get_all_data_for_ticker("ABC", AS_OF_DATE, lookback_days=365)
+    history = make_history()["historical"]
+
+    for name, (indicator_type, period) in INDICATOR_SPECS.items():
+        expected = _reference_indicator(history, indicator_type, period)
+        got = data["indicators"][name]
+        assert [r["date"] for r in got] == [r["date"] for r in expected], name
+        np.testing.assert_allclose(
+            [np.nan if r["value"] is None else r["value"] for r in got],
+            [np.nan if r["value"] is None else r["value"] for r in expected],
+            rtol=1e-12, equal_nan=True, err_msg=name,
+        )
+        assert expected and expected[-1]["date"] == AS_OF_DATE
+
+
+def test_sma_and_bollinger_match_pandas_rolling(fake_get):
+    data = get_all_data_for_ticker("ABC", AS_OF_DATE, lookback_days=365)
+    closes = pd.Series([r["adjClose"] for r in reversed(make_history()["historical"])])
+
+    sma20 = closes.rolling(20).mean()
+    std20 = closes.rolling(20).std(ddof=0)
+    np.testing.assert_allclose([r["value"] for r in data["indicators"]["sma20"]], sma20.iloc[20:])
+    np.testing.assert_allclose([r["value"] for r in data["indicators"]["sma200"]], closes.rolling(200).mean().iloc[200:])
+    np.testing.assert_allclose([r["value"] for r in data["indicators"]["bollinger_upper"]], (sma20 + 2 * std20).iloc[20:])
+    np.testing.assert_allclose([r["value"] for r in data["indicators"]["bollinger_lower"]], (sma20 - 2 * std20).iloc[20:])
+
+
+def test_single_indicator_path_uses_same_computation(fake_get):
+    expected = _reference_indicator(make_history()["historical"], "rsi", 14)
+
+    got = get_technical_indicators("ABC", "rsi", 14, AS_OF_DATE, 365)
+
+    assert [r["date"] for r in got] == [r["date"] for r in expected]
+    np.testing.assert_allclose(
+        [np.nan if r["value"] is None else r["value"] for r in got],
+        [np.nan if r["value"] is None else r["value"] for r in expected],
+        equal_nan=True,
+    )
+
+
+def test_short_history_returns_empty_indicator(fake_get):
+    data = get_all_data_for_ticker("ABC", AS_OF_DATE, lookback_days=100)
+
+    assert data["indicators"]["sma200"] == []
+    assert data["indicators"]["sma20"]
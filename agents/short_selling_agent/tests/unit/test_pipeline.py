@@ -10,7 +10,8 @@ from short_selling_agent.stage_tools import (
     tool_fetch_bq_candidates,
     tool_stage_news,
     tool_stage_insiders,
-    tool_read_full_dossier
+    tool_read_full_dossier,
+    tool_stage_all_candidates
 )
 
 # 3. Import your Pydantic schemas so we can build fake data
@@ -131,4 +132,129 @@ def test_tool_read_full_dossier():
     assert parsed_data["market_losers"][0]["ticker"] == "MSFT"
     assert len(parsed_data["news_reports"]) == 1
     assert parsed_data["news_reports"][0]["articles"][0]["title"] == "Bad news"
-    assert len(parsed_data["insider_reports"]) == 1
\ No newline at end of file
+    assert len(parsed_data["insider_reports"]) == 1
+# ==========================================
+# TEST 5: Batch staging across all loaded candidates
+# ==========================================
+@patch('short_selling_agent.stage_tools._build_quant_signal')
+@patch('short_selling_agent.stage_tools.get_bearish_insider_sales')
+@patch('short_selling_agent.stage_tools.get_fmp_news')
+def test_tool_stage_all_candidates_deterministic_order(mock_news, mock_insiders, mock_quant):
+    """All sources are staged for every ticker, appended in market_losers order."""
+    import time
+    from short_selling_agent.schemas import MarketLoser, QuantitativeSignal
+
+    for ticker in ["SLOW", "FAST", "MID"]:
+        CURRENT_RUN_STATE.dossier.market_losers.append(
+            MarketLoser(ticker=ticker, price=10.0, change_pct=-0.2)
+        )
+
+    delays = {"SLOW": 0.05, "FAST": 0.0, "MID": 0.02}
+
+    def fake_news(ticker, as_of_date=""):
+        time.sleep(delays[ticker])
+        return StockNewsReport(ticker=ticker, articles=[])
+
+    def fake_insiders(ticker, as_of_date=""):
+        if ticker == "MID":
+            raise RuntimeError("BQ down")
+        return InsiderTradingReport(ticker=ticker, total_dollars_dumped=0.0, significant_sales=[])
+
+    def fake_quant(ticker, as_of_date):
+        return None if ticker == "FAST" else QuantitativeSignal(ticker=ticker, as_of_date=as_of_date)
+
+    mock_news.side_effect = fake_news
+    mock_insiders.side_effect = fake_insiders
+    mock_quant.side_effect = fake_quant
+
+    result_string = tool_stage_all_candidates(as_of_date="")
+
+    dossier = CURRENT_RUN_STATE.dossier
+    assert "SLOW, FAST, MID" in result_string
+    assert [r.ticker for r in dossier.news_reports] == ["SLOW", "FAST", "MID"]
+    assert [r.ticker for r in dossier.insider_reports] == ["SLOW", "FAST", "MID"]
+    assert "BQ down" in dossier.insider_reports[2].error_message
+    assert [q.ticker for q in dossier.quant_reports] == ["SLOW", "MID"]
+
+
+@patch('short_selling_agent.stage_tools._build_quant_signal', return_value=None)
+@patch('short_selling_agent.stage_tools.get_bearish_insider_sales')
+@patch('short_selling_agent.stage_tools.get_bearish_insider_sales_bulk')
+@patch('short_selling_agent.stage_tools.get_fmp_news')
+def test_tool_stage_all_candidates_historical_uses_bulk_insiders(
+    mock_news, mock_bulk, mock_single, mock_quant
+):
+    """Historical runs stage insiders from one bulk query, not one job per ticker."""
+    from short_selling_agent.schemas import MarketLoser
+
+    for ticker in ["AAA", "BBB"]:
+        CURRENT_RUN_STATE.dossier.market_losers.append(
+            MarketLoser(ticker=ticker, price=10.0, change_pct=-0.2)
+        )
+    mock_news.side_effect = lambda ticker, as_of_date="": StockNewsReport(ticker=ticker, articles=[])
+    mock_bulk.return_value = {
+        "BBB": InsiderTradingReport(ticker="BBB", total_dollars_dumped=1.0, significant_sales=[]),
+        "AAA": InsiderTradingReport(ticker="AAA", total_dollars_dumped=2.0, significant_sales=[]),
+    }
+
+    tool_stage_all_candidates(as_of_date="2024-01-02")
+
+    mock_bulk.assert_called_once_with(["AAA", "BBB"], as_of_date="2024-01-02")
+    mock_single.assert_not_called()
+    assert [r.total_dollars_dumped for r in CURRENT_RUN_STATE.dossier.insider_reports] == [2.0, 1.0]
+
+
+def test_tool_stage_all_candidates_without_tickers():
+    assert "No tickers loaded" in tool_stage_all_candidates(as_of_date="2024-01-02")
+
+
+@patch('short_selling_agent.stage_tools._build_quant_signal')
+@patch('short_selling_agent.stage_tools.get_bearish_insider_sales')
+@patch('short_selling_agent.stage_tools.get_fmp_news')
+def test_tool_stage_all_candidates_news_only(mock_news, mock_insiders, mock_quant):
+    """The news agent stages only news; insiders and quant are left to later steps."""
+    from short_selling_agent.schemas import MarketLoser
+
+    for ticker in ["AAA", "BBB"]:
+        CURRENT_RUN_STATE.dossier.market_losers.append(
+            MarketLoser(ticker=ticker, price=10.0, change_pct=-0.2)
+        )
+    mock_news.side_effect = lambda ticker, as_of_date="": StockNewsReport(ticker=ticker, articles=[])
+
+    result_string = tool_stage_all_candidates(as_of_date="2024-01-02", sources="news")
+
+    assert result_string == "Success: Staged news for AAA, BBB"
+    assert [r.ticker for r in CURRENT_RUN_STATE.dossier.news_reports] == ["AAA", "BBB"]
+    assert CURRENT_RUN_STATE.dossier.insider_reports == []
+    mock_insiders.assert_not_called()
+    mock_quant.assert_not_called()
+
+
+@patch('short_selling_agent.stage_tools._build_quant_signal')
+@patch('short_selling_agent.stage_tools.get_bearish_insider_sales')
+@patch('short_selling_agent.stage_tools.get_bearish_insider_sales_bulk')
+@patch('short_selling_agent.stage_tools.get_fmp_news')
+def test_tool_stage_all_candidates_insiders_only_uses_bulk(
+    mock_news, mock_bulk, mock_single, mock_quant
+):
+    """The insider agent's historical staging is one bulk query for all tickers."""
+    from short_selling_agent.schemas import MarketLoser
+
+    for ticker in ["AAA", "BBB"]:
+        CURRENT_RUN_STATE.dossier.market_losers.append(
+            MarketLoser(ticker=ticker, price=10.0, change_pct=-0.2)
+        )
+    mock_bulk.return_value = {
+        "AAA": InsiderTradingReport(ticker="AAA", total_dollars_dumped=2.0, significant_sales=[]),
+    }
+
+    result_string = tool_stage_all_candidates(as_of_date="2024-01-02", sources="insiders")
+
+    assert result_string == "Success: Staged insiders for AAA, BBB"
+    mock_bulk.assert_called_once_with(["AAA", "BBB"], as_of_date="2024-01-02")
+    mock_single.assert_not_called()
+    mock_news.assert_not_called()
+    mock_quant.assert_not_called()
+    reports = CURRENT_RUN_STATE.dossier.insider_reports
+    assert [r.ticker for r in reports] == ["AAA", "BBB"]
+    assert reports[1].error_message == "No bulk insider result"
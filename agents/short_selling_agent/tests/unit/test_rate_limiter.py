@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+import requests
+
+import short_selling_agent.fmp_client as fmp_client
+import short_selling_agent.rate_limiter as rate_limiter
+from short_selling_agent.rate_limiter import TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_burst_until_budget_spent_then_refill_rate(clock):
+    bucket = TokenBucket(calls_per_minute=60)  # 1 token per second, 60 burst
+
+    for _ in range(60):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_penalize_blocks_all_callers(clock):
+    bucket = TokenBucket(calls_per_minute=600)
+    bucket.penalize(30)
+
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(30.0)]
+
+
+def test_acquire_async_waits_without_blocking(clock, monkeypatch):
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(calls_per_minute=60, capacity=1)
+
+    async def run():
+        await bucket.acquire_async()
+        await bucket.acquire_async()
+
+    asyncio.run(run())
+    assert waits == [pytest.approx(1.0)]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after(None, default=5) == 5
+    assert parse_retry_after("garbage", default=7) == 7
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_fmp_get_json_honours_retry_after_on_429(monkeypatch):
+    class Resp:
+        def __init__(self, status_code, payload=None, headers=None):
+            self.status_code = status_code
+            self._payload = payload
+            self.headers = headers or {}
+            self.text = ""
+
+        def json(self):
+            return self._payload
+
+    responses = [Resp(429, headers={"Retry-After": "3"}), Resp(200, [{"ok": True}])]
+    monkeypatch.setattr(requests, "get", lambda url, *args, **kwargs: responses.pop(0))
+
+    penalties = []
+
+    class RecordingLimiter:
+        def acquire(self):
+            pass
+
+        def penalize(self, seconds):
+            penalties.append(seconds)
+
+    monkeypatch.setattr(fmp_client, "get_fmp_limiter", lambda: RecordingLimiter())
+
+    assert fmp_client.fmp_get_json("https://x/api/v4/shares_float?symbol=A") == [{"ok": True}]
+    assert penalties == [3.0]
@@ -0,0 +1,76 @@
+import random
+
+import pandas as pd
+
+from short_selling_agent.scoring import (
+    build_scoring_panel,
+    calculate_short_conviction_score,
+    panel_breakdowns,
+    score_panel,
+)
+
+
+def _payload(symbol, n_days, seed):
+    rng = random.Random(seed)
+    dates = [f"2024-{1 + i // 28:02d}-{1 + i % 28:02d}" for i in range(n_days)]
+    price = [{"date": d, "adjClose": rng.uniform(10, 20), "volume": rng.randint(1, 10) * 1000}
+             for d in dates]
+
+    def series(lo, hi, none_rate=0.15):
+        return [{"date": d, "value": None if rng.random() < none_rate else rng.uniform(lo, hi)}
+                for d in dates]
+
+    return {
+        "symbol": symbol,
+        "as_of_date": dates[-1],
+        "price": price,
+        "indicators": {
+            "sma200": series(10, 20),
+            "sma50": series(10, 20),
+            "rsi": series(10, 60),
+            "adx": series(10, 40),
+            "chop": series(30, 70, none_rate=0.3),
+        },
+        "fundamentals": {
+            "short_interest": {"shortPercent": rng.choice([None, 0.05, 0.2])},
+            "recent_earnings": [{"surprise": rng.choice([None, 0.1, -0.2])} for _ in range(3)],
+        },
+    }
+
+
+def _truncate(data, k):
+    """The payload as it looked on its k-th price date."""
+    return {
+        **data,
+        "as_of_date": data["price"][k - 1]["date"],
+        "price": data["price"][:k],
+        "indicators": {name: recs[:k] for name, recs in data["indicators"].items()},
+    }
+
+
+def test_panel_matches_scalar_scoring_on_every_date():
+    payloads = [_payload(sym, 30, seed) for seed, sym in enumerate(["AAA", "BBB", "CCC"])]
+
+    scored = score_panel(build_scoring_panel(payloads))
+    by_key = {(r["symbol"], r["as_of"]): r for r in panel_breakdowns(scored)}
+
+    assert len(by_key) == 90
+    for data in payloads:
+        for k in range(1, len(data["price"]) + 1):
+            expected = calculate_short_conviction_score(_truncate(data, k))
+            got = by_key[(data["symbol"], data["price"][k - 1]["date"])]
+            assert got == expected
+
+
+def test_panel_scores_are_order_independent():
+    payloads = [_payload("AAA", 10, 1), _payload("BBB", 10, 2)]
+    panel = build_scoring_panel(payloads)
+
+    shuffled = panel.sample(frac=1, random_state=0)
+    pd.testing.assert_frame_equal(score_panel(panel), score_panel(shuffled))
+
+
+def test_empty_panel():
+    scored = score_panel(build_scoring_panel([]))
+    assert scored.empty
+    assert "score" in scored.columns and "verdict" in scored.columns
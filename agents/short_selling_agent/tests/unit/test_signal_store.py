@@ -0,0 +1,61 @@
+import json
+
+from short_selling_agent.backtest_engine import iter_signals
+from short_selling_agent.signal_store import SignalStore
+
+
+def _sig(ticker, date):
+    return {"ticker": ticker, "date": date, "price": 10.0, "conviction_score": 8}
+
+
+def test_write_date_only_touches_its_partition(tmp_path):
+    store = SignalStore(str(tmp_path / "signals"))
+    store.write_date("2024-01-02", [_sig("AAA", "2024-01-02")])
+    first = (tmp_path / "signals" / "date=2024-01-02.jsonl").stat().st_mtime_ns
+
+    store.write_date("2024-01-03", [_sig("BBB", "2024-01-03")])
+
+    assert (tmp_path / "signals" / "date=2024-01-02.jsonl").stat().st_mtime_ns == first
+    assert store.computed_dates() == {"2024-01-02", "2024-01-03"}
+
+
+def test_empty_date_counts_as_computed(tmp_path):
+    store = SignalStore(str(tmp_path / "signals"))
+    assert store.write_date("2024-01-02", []) == 0
+    assert store.has_date("2024-01-02")
+    assert list(store.iter_signals()) == []
+
+
+def test_iter_signals_streams_in_date_order_with_bounds(tmp_path):
+    store = SignalStore(str(tmp_path / "signals"))
+    store.write_date("2024-01-05", [_sig("CCC", "2024-01-05")])
+    store.write_date("2024-01-02", [_sig("AAA", "2024-01-02"), _sig("BBB", "2024-01-02")])
+    store.write_date("2024-01-03", [_sig("DDD", "2024-01-03")])
+
+    assert [s["ticker"] for s in store.iter_signals()] == ["AAA", "BBB", "DDD", "CCC"]
+    assert [s["ticker"] for s in store.iter_signals(start="2024-01-03", end="2024-01-04")] == ["DDD"]
+
+
+def test_backtester_reads_store_and_legacy_json_alike(tmp_path):
+    legacy = tmp_path / "signals.json"
+    legacy.write_text(json.dumps([_sig("BBB", "2024-01-03"), _sig("AAA", "2024-01-02")]))
+
+    store = SignalStore(str(tmp_path / "signals"))
+    assert store.import_json(str(legacy)) == ["2024-01-02", "2024-01-03"]
+
+    assert list(iter_signals(str(legacy))) == list(iter_signals(store.root))
+
+
+def test_pipeline_skips_dates_no_source_answered(tmp_path, monkeypatch):
+    import signals
+
+    monkeypatch.setattr(signals, "generate_daily_backtest_dates", lambda: ["2024-01-02", "2024-01-03"])
+    monkeypatch.setattr(signals, "get_bq_short_candidates_range", lambda dates, limit=5: {
+        "2024-01-02": None,
+        "2024-01-03": [],
+    })
+
+    signals.run_signal_pipeline(store_dir=str(tmp_path / "signals"))
+
+    store = SignalStore(str(tmp_path / "signals"))
+    assert store.computed_dates() == {"2024-01-03"}
@@ -10,6 +10,7 @@ from short_selling_agent.tools import (
     get_fmp_news,
     get_bearish_insider_sales,
     get_squeeze_metrics,
+    get_squeeze_metrics_bulk,
     get_bq_short_candidates
 )
 from short_selling_agent.stage_tools import get_plus500_universe
@@ -159,7 +160,7 @@ def test_get_bearish_insider_sales_filters(monkeypatch):
         make_trade(today, "S-Sale", 10000, 50.0, "CUSTODIAN"),
     ]
     monkeypatch.setenv("FMP_API_KEY", "DUMMY")
-    monkeypatch.setattr(requests, "get", lambda url: DummyResponse(data))
+    monkeypatch.setattr(requests, "get", lambda url, *args, **kwargs: DummyResponse(data))
     report = get_bearish_insider_sales("XYZ", days_back=180, min_value=100.0)
     # only the first trade should count: 10000 * 50.0 = 500k
     assert report.total_dollars_dumped == 500000.0
@@ -167,7 +168,7 @@ def test_get_bearish_insider_sales_filters(monkeypatch):
     assert report.significant_sales[0].title == "CEO"
 
 def test_get_bearish_insider_sales_exception(monkeypatch):
-    monkeypatch.setattr(requests, "get", lambda url: DummyResponse(exc=RuntimeError("fail")))
+    monkeypatch.setattr(requests, "get", lambda url, *args, **kwargs: DummyResponse(exc=RuntimeError("fail")))
     report = get_bearish_insider_sales("XYZ")
     assert report.total_dollars_dumped == 0.0
     assert report.significant_sales == []
@@ -178,7 +179,7 @@ def test_get_bearish_insider_sales_exception(monkeypatch):
 # Tests for get_squeeze_metrics
 #------------------------------------------------------------------------------
 def test_get_squeeze_metrics_success(monkeypatch):
-    def fake_get(url):
+    def fake_get(url, *args, **kwargs):
         if "stock-short-interest" in url:
             return DummyResponse([{"shortPercentOfFloat": 12.34}])
         if "shares_float" in url:
@@ -191,7 +192,7 @@ def test_get_squeeze_metrics_success(monkeypatch):
 
 def test_get_squeeze_metrics_missing(monkeypatch):
     # missing fields => defaults
-    def fake_get2(url):
+    def fake_get2(url, *args, **kwargs):
         if "stock-short-interest" in url:
             return DummyResponse([{"shortPercentOfFloat": None}])
         if "shares_float" in url:
@@ -203,12 +204,36 @@ def test_get_squeeze_metrics_missing(monkeypatch):
     assert ff == tools._FLOAT_DEFAULT if hasattr(tools, "_FLOAT_DEFAULT") else 999999999.0
 
 def test_get_squeeze_metrics_exception(monkeypatch):
-    monkeypatch.setattr(requests, "get", lambda url: (_ for _ in ()).throw(Exception("boom")))
+    monkeypatch.setattr(requests, "get", lambda url, *args, **kwargs: (_ for _ in ()).throw(Exception("boom")))
     sp, ff = get_squeeze_metrics("XYZ")
     assert sp == 0.0
     assert ff == 999999999.0
 
 
+def test_get_squeeze_metrics_bulk_batches_symbols(monkeypatch):
+    seen = []
+    def fake_get(url, *args, **kwargs):
+        seen.append((url, kwargs.get("timeout")))
+        if "stock-short-interest" in url:
+            return DummyResponse([{"symbol": "AAA", "shortPercentOfFloat": 20.0},
+                                  {"symbol": "BBB", "shortPercentOfFloat": 3.0}])
+        if "shares_float" in url:
+            return DummyResponse([{"symbol": "AAA", "freeFloat": 1000.0},
+                                  {"symbol": "BBB", "freeFloat": 2000.0}])
+        return DummyResponse([])
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    metrics = get_squeeze_metrics_bulk(["AAA", "BBB", "CCC", "AAA"], timeout=3)
+
+    assert metrics == {
+        "AAA": (20.0, 1000.0),
+        "BBB": (3.0, 2000.0),
+        "CCC": (0.0, 999999999.0),
+    }
+    assert len(seen) == 2
+    assert all("symbol=AAA,BBB,CCC" in url and timeout == 3 for url, timeout in seen)
+
+
 #------------------------------------------------------------------------------
 # Tests for get_bq_short_candidates
 #------------------------------------------------------------------------------
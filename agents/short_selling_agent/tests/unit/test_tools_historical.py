@@ -9,6 +9,7 @@ from short_selling_agent.tools import (
     get_fmp_news,
     get_bearish_insider_sales,
     get_fmp_bigger_losers,
+    get_bearish_insider_sales_bulk,
 )
 
 # --- Standardized Native Pytest Mocks ---
@@ -88,6 +89,73 @@ def test_get_bq_short_candidates_live(monkeypatch):
     assert out == []
 
 
+def test_get_bq_short_candidates_range_one_job_fallback_only_for_gaps(monkeypatch, mocker):
+    from datetime import date
+
+    class RecordingClient(DummyClient):
+        calls = []
+        def query(self, sql, job_config=None):
+            RecordingClient.calls.append((sql, job_config))
+            return DummyJob(DummyClient._rows)
+
+    DummyClient._rows = [
+        DummyRow(scan_date=date(2023, 6, 5), ticker="AAA", price=10.0, change_pct=-9.0,
+                 short_interest_pct=1.0, free_float=1.0, is_squeeze_risk=False),
+        DummyRow(scan_date=date(2023, 6, 5), ticker="BBB", price=12.0, change_pct=-7.0,
+                 short_interest_pct=1.0, free_float=1.0, is_squeeze_risk=False),
+        DummyRow(scan_date=date(2023, 6, 7), ticker="CCC", price=30.0, change_pct=-8.0,
+                 short_interest_pct=1.0, free_float=1.0, is_squeeze_risk=True),
+    ]
+    RecordingClient.calls = []
+    monkeypatch.setattr(tools.bigquery, "Client", lambda project=None: RecordingClient())
+    fallback = mocker.patch(
+        "short_selling_agent.tools._fetch_from_fmp_earning_drop_fallback",
+        return_value=[tools.MarketLoser(ticker="FMP1", price=50.0, change_pct=-0.2)],
+    )
+
+    out = tools.get_bq_short_candidates_range(["2023-06-07", "2023-06-05", "2023-06-06"], limit=2)
+
+    assert len(RecordingClient.calls) == 1
+    sql, job_config = RecordingClient.calls[0]
+    assert "QUALIFY ROW_NUMBER()" in sql
+    params = {p.name: p for p in job_config.query_parameters}
+    assert params["lim"].value == 2
+
+    assert list(out) == ["2023-06-05", "2023-06-06", "2023-06-07"]
+    assert [c["ticker"] for c in out["2023-06-05"]] == ["AAA", "BBB"]
+    assert "scan_date" not in out["2023-06-05"][0]
+    assert [c["ticker"] for c in out["2023-06-06"]] == ["FMP1"]
+    assert [c["ticker"] for c in out["2023-06-07"]] == ["CCC"]
+    fallback.assert_called_once_with("2023-06-06", 2)
+
+
+def test_get_bq_short_candidates_range_marks_unanswered_dates(monkeypatch, mocker):
+    """BQ down + empty fallback → None, so the caller can tell an outage from a quiet day."""
+    class FailingClient(DummyClient):
+        def query(self, sql, job_config=None):
+            raise RuntimeError("BQ down")
+
+    monkeypatch.setattr(tools.bigquery, "Client", lambda project=None: FailingClient())
+    mocker.patch(
+        "short_selling_agent.tools._fetch_from_fmp_earning_drop_fallback",
+        side_effect=lambda d, limit: [tools.MarketLoser(ticker="FMP1", price=50.0, change_pct=-0.2)]
+        if d == "2023-06-06" else [],
+    )
+
+    out = tools.get_bq_short_candidates_range(["2023-06-05", "2023-06-06"], limit=2)
+
+    assert out["2023-06-05"] is None
+    assert [c["ticker"] for c in out["2023-06-06"]] == ["FMP1"]
+
+
+def test_get_bq_short_candidates_range_empty_answer_is_not_a_failure(monkeypatch, mocker):
+    monkeypatch.setattr(tools.bigquery, "Client", lambda project=None: DummyClient())
+    DummyClient._rows = []
+    mocker.patch("short_selling_agent.tools._fetch_from_fmp_earning_drop_fallback", return_value=[])
+
+    assert tools.get_bq_short_candidates_range(["2023-06-05"], limit=2) == {"2023-06-05": []}
+
+
 # =============================================================================
 # Tests for get_fmp_news (Historical & Live)
 # =============================================================================
@@ -164,6 +232,55 @@ def test_get_bearish_insider_sales_live(monkeypatch):
     assert rpt.total_dollars_dumped == 0.0
 
 
+def test_get_bearish_insider_sales_bulk_one_job(monkeypatch):
+    """All tickers share one UNNEST query; rows fan out into per-ticker reports."""
+    from datetime import date
+
+    class RecordingClient(DummyClient):
+        calls = []
+        def query(self, sql, job_config=None):
+            RecordingClient.calls.append((sql, job_config))
+            return DummyJob(DummyClient._rows)
+
+    DummyClient._rows = [
+        DummyRow(ticker="aaa", filing_date=date(2023, 5, 20), owner_name="Alice",
+                 officer_title="Chief Executive Officer, CEO", transaction_side="S",
+                 shares=1000, price=500.0),
+        DummyRow(ticker="BBB", filing_date=date(2023, 5, 21), owner_name="Bob",
+                 officer_title="Director", transaction_side="S",
+                 shares=2000, price=200.0),
+        DummyRow(ticker="AAA", filing_date=date(2023, 5, 22), owner_name="Carol",
+                 officer_title="CFO", transaction_side="S",
+                 shares=1000, price=300.0),
+    ]
+    RecordingClient.calls = []
+    monkeypatch.setattr(tools.bigquery, "Client", lambda project=None: RecordingClient())
+
+    out = get_bearish_insider_sales_bulk(["AAA", "BBB", "CCC"], as_of_date="2023-06-01")
+
+    assert len(RecordingClient.calls) == 1
+    sql, job_config = RecordingClient.calls[0]
+    assert "UNNEST(@tks)" in sql
+    params = {p.name: p for p in job_config.query_parameters}
+    assert params["tks"].values == ["AAA", "BBB", "CCC"]
+
+    assert set(out) == {"AAA", "BBB", "CCC"}
+    assert out["AAA"].total_dollars_dumped == pytest.approx(800000.0)
+    assert [t.name for t in out["AAA"].significant_sales] == ["Alice", "Carol"]
+    assert out["BBB"].total_dollars_dumped == pytest.approx(400000.0)
+    assert out["CCC"].significant_sales == []
+
+
+def test_get_bearish_insider_sales_bulk_error_marks_every_ticker(monkeypatch):
+    def bad_client(*args, **kwargs):
+        raise RuntimeError("BQ gone")
+    monkeypatch.setattr(tools.bigquery, "Client", bad_client)
+
+    out = get_bearish_insider_sales_bulk(["AAA", "BBB"], as_of_date="2023-06-01")
+
+    assert all("BQ gone" in r.error_message for r in out.values())
+
+
 # =============================================================================
 # Tests for get_fmp_bigger_losers (Historical with Fallback)
 # =============================================================================
@@ -0,0 +1,68 @@
+import os
+import sys
+import types
+import asyncio
+from unittest.mock import MagicMock
+
+# trigger_job only needs sendgrid to send the summary email, which these tests
+# replace; stub it when the package is not installed so the tests still run.
+try:
+    import sendgrid  # noqa: F401
+except ImportError:
+    sendgrid_stub = types.ModuleType("sendgrid")
+    sendgrid_stub.SendGridAPIClient = MagicMock()
+    helpers_stub = types.ModuleType("sendgrid.helpers")
+    mail_stub = types.ModuleType("sendgrid.helpers.mail")
+    for name in ("Mail", "HtmlContent", "Subject", "To", "From"):
+        setattr(mail_stub, name, MagicMock())
+    sendgrid_stub.helpers = helpers_stub
+    helpers_stub.mail = mail_stub
+    sys.modules.update({
+        "sendgrid": sendgrid_stub,
+        "sendgrid.helpers": helpers_stub,
+        "sendgrid.helpers.mail": mail_stub,
+    })
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "daily_schedule"))
+import trigger_job  # noqa: E402  (flat module, copied alone into the job image)
+
+
+def test_expand_dates_merges_list_and_weekday_range():
+    dates = trigger_job.expand_dates("2024-01-05,2024-01-02", "2024-01-05", "2024-01-09")
+    # 6th/7th are a weekend; duplicates collapse
+    assert dates == ["2024-01-02", "2024-01-05", "2024-01-08", "2024-01-09"]
+
+
+def test_batch_runs_sessions_concurrently_and_persists_once(monkeypatch):
+    state = {"active": 0, "peak": 0}
+    inserted, emailed = [], []
+
+    async def fake_request(client, method, endpoint, data=None):
+        return None
+
+    async def fake_run(client, session_id, message):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        if "2024-01-03" in message:
+            raise RuntimeError("agent crashed")
+        run_date = message.rsplit(" ", 1)[-1].rstrip(".")
+        return f'{{"final_decisions": [{{"ticker": "t{run_date[-1]}", "action": "short"}}]}}'
+
+    monkeypatch.setattr(trigger_job, "make_request", fake_request)
+    monkeypatch.setattr(trigger_job, "run_agent_request", fake_run)
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(trigger_job.asyncio, "sleep", lambda seconds: real_sleep(0))
+    monkeypatch.setattr(trigger_job, "fetch_plus500_tickers", lambda tickers: set())
+    monkeypatch.setattr(trigger_job, "insert_recommendations", inserted.append)
+    monkeypatch.setattr(trigger_job, "send_summary_email", emailed.append)
+
+    dates = ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    asyncio.run(trigger_job.amain(dates, max_concurrency=2))
+
+    assert state["peak"] == 2
+    assert len(inserted) == 1 and len(emailed) == 1
+    assert [(r["evaluation_date"], r["ticker"], r["action"]) for r in inserted[0]] == [
+        ("2024-01-02", "T2", "SHORT"), ("2024-01-04", "T4", "SHORT"), ("2024-01-05", "T5", "SHORT"),
+    ]
@@ -41,6 +41,14 @@ echo "📡 Target Region:     ${REGION}"
 echo "📡 Agent Target URL:  ${AGENT_SERVICE_URL}"
 echo "🔨 Submitting source to Google Cloud Build and deploying job..."
 
+# Copy the shared helpers into the build context; removed again on exit
+SHARED_FILES="oidc_token.py"
+cleanup() {
+    for f in $SHARED_FILES; do rm -f "$f"; done
+}
+trap cleanup EXIT
+for f in $SHARED_FILES; do cp "../../shared/$f" .; done
+
 # 4. Execute single source-deploy command
 gcloud run jobs deploy "${JOB_NAME}" \
     --source . \
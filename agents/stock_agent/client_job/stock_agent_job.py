@@ -10,6 +10,11 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from google.cloud import bigquery
 
+# Shared helpers have a single source in agents/shared; the deploy script copies
+# them into the job image, this path only matters when running from the repo.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from oidc_token import get_token_provider
+
 # --- Configuration (Stock Agent & BigQuery Target) ---
 APP_URL = os.environ.get("AGENT_SERVICE_URL", "https://stock-agent-service-682143946483.us-central1.run.app")
 USER_ID = "automated_cron_job"
@@ -139,37 +144,8 @@ def build_summary_email_and_send(rows_inserted: List[Dict[str, Any]], target_dat
 # --- AUTHENTICATION LAYER (ASYNC) ---
 
 async def get_auth_token() -> str:
-    """Retrieves an OIDC Identity Token for authenticating against Cloud Run."""
-    print("🔑 [AUTH] Attempting to acquire OIDC token...")
-    try:
-        async with httpx.AsyncClient() as client:
-            metadata_url = "http://metadata.google.internal/computeMetadata/v1/instance/service-accounts/default/identity"
-            headers = {"Metadata-Flavor": "Google"}
-            params = {"audience": APP_URL}
-            
-            response = await client.get(metadata_url, headers=headers, params=params, timeout=5.0)
-            if response.status_code == 200:
-                print("✅ [AUTH] Token successfully acquired via GCP Metadata Server.")
-                return response.text.strip()
-    except Exception as e:
-        print(f"ℹ️ [AUTH] Metadata Server approach skipped: {e}")
-
-    try:
-        print("ℹ️ [AUTH] Falling back to local gcloud CLI token extraction...")
-        proc = await asyncio.create_subprocess_exec(
-            "gcloud", "auth", "print-identity-token",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
-        
-        if proc.returncode != 0:
-            raise RuntimeError(f"gcloud command failed: {stderr.decode().strip()}")
-            
-        print("✅ [AUTH] Token successfully acquired via gcloud CLI fallback.")
-        return stdout.decode().strip()
-    except FileNotFoundError:
-        raise RuntimeError("gcloud command not found. Please ensure Google Cloud CLI is installed.")
+    """Returns the OIDC Identity Token, cached in memory and refreshed shortly before it expires."""
+    return await get_token_provider(APP_URL).get_token()
 
 
 # --- API INTERACTION LAYER (ASYNC) ---
@@ -196,6 +172,8 @@ async def make_request(client: httpx.AsyncClient, method: str, endpoint: str, da
         response.raise_for_status() 
         return response
     except httpx.HTTPStatusError as errh:
+        if errh.response.status_code == 401:
+            get_token_provider(APP_URL).invalidate()
         print(f"\n❌ HTTP ERROR Status {errh.response.status_code} for {url}")
         print(f"❌ Server Response:\n{errh.response.text}")
         raise
@@ -7,6 +7,11 @@ from datetime import datetime
 import httpx 
 import sys # ⬅️ ADDED: sys module for version check
 
+# Shared helpers (e.g. oidc_token) have a single source in agents/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "shared"))
+from oidc_token import get_token_provider
+from sse_stream import stream_agent_run
+
 # --- Configuration (Dynamic) ---
 APP_URL = os.environ['STOCK_AGENT_URL']
 USER_ID = "user_123"
@@ -18,22 +23,10 @@ APP_NAME = "stock_agent"
 
 async def get_auth_token() -> str:
     """
-    Executes 'gcloud auth print-identity-token' asynchronously to get the token.
+    Returns the 'gcloud auth print-identity-token' token, cached in memory and
+    refreshed shortly before it expires instead of forking gcloud per request.
     """
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            "gcloud", "auth", "print-identity-token",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
-        
-        if proc.returncode != 0:
-            raise RuntimeError(f"gcloud command failed: {stderr.decode().strip()}")
-            
-        return stdout.decode().strip()
-    except FileNotFoundError:
-        raise RuntimeError("gcloud command not found. Please ensure Google Cloud CLI is installed.")
+    return await get_token_provider(APP_URL, use_metadata_server=False).get_token()
 
 # --- API Interaction Functions (ASYNC) ---
 
@@ -65,7 +58,7 @@ async def make_request(client: httpx.AsyncClient, method: str, endpoint: str, da
         raise
 
 async def run_agent_request(client: httpx.AsyncClient, session_id: str, message: str):
-    """Executes a single POST request to the /run_sse endpoint."""
+    """Streams the /run_sse endpoint, printing tool calls and partial text as they arrive."""
     
     print(f"\n[User] -> Sending message: '{message}'")
     
@@ -74,42 +67,22 @@ async def run_agent_request(client: httpx.AsyncClient, session_id: str, message:
         "user_id": USER_ID,
         "session_id": session_id,
         "new_message": {"role": "user", "parts": [{"text": message}]},
-        "streaming": False 
+        "streaming": True 
     }
     
     try:
-        response = await make_request(client, "POST", "/run_sse", data=run_data)
-        current_status = response.status_code
-        # print(f"**Request Status Code:** {current_status}") 
-
-        raw_text = response.text.strip()
-        
-        # Multi-line SSE parsing logic
-        data_lines = [
-            line.strip() 
-            for line in raw_text.split('\n') 
-            if line.strip().startswith("data:")
-        ]
+        token = await get_auth_token()
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+        final_text = await stream_agent_run(client, f"{APP_URL}/run_sse", run_data, headers=headers)
         
-        if not data_lines:
-             raise json.JSONDecodeError("No 'data:' lines found in 200 response.", raw_text, 0)
-        
-        last_data_line = data_lines[-1]
-        json_payload = last_data_line[len("data:"):].strip()
-        agent_response = json.loads(json_payload)
-        
-        # Extract the final text 
-        final_text = agent_response.get('content', {}).get('parts', [{}])[0].get('text', 'Agent response structure not recognized.')
-        
-        print(f"[Agent] -> {final_text}")
+        print(f"\n[Agent] -> {final_text or 'Agent response structure not recognized.'}")
     
-    except json.JSONDecodeError as e:
-        print(f"\n🚨 **JSON PARSING FAILED**!")
-        print(f"   Error: {e}")
-        print("   --- RAW SERVER CONTENT ---")
-        print(raw_text)
-        print("   --------------------------")
-        
+    except httpx.HTTPStatusError as errh:
+        print(f"\n❌ **HTTP ERROR:** Status {errh.response.status_code} for {errh.request.url}")
+        print(f"❌ **Server Response (Raw):**\n{errh.response.text}")
     except Exception as e:
         print(f"❌ Agent request failed: {e}")
 
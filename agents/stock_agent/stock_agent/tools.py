@@ -8,9 +8,11 @@ import os
 from google.cloud import bigquery
 import google.auth
 
+from stock_agent.bq_client import get_bq_client
+
 def get_bigquery_client():
-    credentials, project = google.auth.default()
-    return bigquery.Client(credentials=credentials, project=project)
+    # Pooled, process-wide client for the ADC default project
+    return get_bq_client()
 
 def _get_table_schema():
     client = get_bigquery_client()
@@ -43,7 +45,7 @@ def fetch_technical_snapshot_tool(target_date: str = "today") -> str:
     Args:
         target_date: The date to query. Can be 'today', 'yesterday', or a date string 'YYYY-MM-DD'.
     """
-    client = bigquery.Client()
+    client = get_bq_client()
     project = 'datascience-projects'
     dataset_id = 'gcp_shareloader'
     table_id = 'finviz-premarket'